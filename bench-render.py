@@ -0,0 +1,244 @@
+"""
+Benchmark the terminal video renderers.
+Each renderer runs in its own process on its usual scenes (plus one long
+synthetic scene file), writing video into a temp directory, and reports
+frames/second, per-frame render latency percentiles, peak RSS and encode
+time as JSON. Results can be saved as a baseline and later runs compared
+against it with a regression threshold.
+
+    python bench-render.py --save-baseline bench-baseline.json
+    python bench-render.py --baseline bench-baseline.json --threshold 0.1
+"""
+import os, sys, json, time, shutil, socket, platform, argparse, tempfile, subprocess, contextlib, io
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (script, extra args, needs the mock API); the recorders get an
+# empty CLI cache in the temp dir instead of .cache/hermes, so every command
+# runs (and the CLI is measured too) without touching the developer's cache
+BENCHES = {
+    'render-terminal': ('render-terminal.py', ['--no-cache'], False),
+    'render-skill-terminal': ('render-skill-terminal.py', [], False),
+    'record-session': ('record-session.py', [], True),
+    'record-skill': ('record-skill.py', [], True),
+    'synthetic': (None, [], False),
+}
+# Scripts that take --backend, and --cli/--cache-dir
+BACKEND_SCRIPTS = {'render-terminal.py', 'record-session.py', 'render-skill-terminal.py', 'record-skill.py'}
+CLI_SCRIPTS = {'record-session.py', 'record-skill.py'}
+
+# metric -> True if higher is better
+METRICS = {
+    'fps': True,
+    'wall_s': False,
+    'latency_p50_ms': False,
+    'latency_p95_ms': False,
+    'latency_p99_ms': False,
+    'encode_s': False,
+    'peak_rss_mb': False,
+}
+MOCK_PORT = 4020
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def synthetic_spec(outfile):
+    """A long scene file where nearly every frame differs: 30 typed commands with output"""
+    from termvideo import scenefile
+    actions = []
+    for i in range(30):
+        actions.append({'type': f'hermes browse --tag research-{i} --limit 25 --sort rating', 'after_ms': 100})
+        actions.append({'line': '  ↳ scanning marketplace...', 'color': 'faint'})
+        actions.append({'line': [['  code-auditor  ', 'muted'], ['4.9/5  0.12 SOL/task', 'faint']], 'after_ms': 200})
+        if i % 6 == 5:
+            actions.append({'clear': True})
+    return dict(scenefile.DEFAULTS, scenes=[{'title': 'synthetic', 'actions': actions}],
+                output=outfile, path=outfile)
+
+
+def run_child(name, backend, encoder='auto', cli='python'):
+    """Run one benchmark in this process and return its metrics"""
+    sys.path.insert(0, HERE)
+    from termvideo.instrument import Profiler
+
+    profiler = Profiler(stages=['render', 'encode', 'encode_flush']).install()
+
+    script, args, _ = BENCHES[name]
+    tmp = tempfile.mkdtemp(prefix='termvideo-bench-')
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            if script is None:
+                from termvideo.render import BatchRenderer
+                BatchRenderer(encoder).render(synthetic_spec(os.path.join(tmp, 'synthetic.mp4')))
+            else:
+                # Run a copy from the temp dir so the video lands there, not over the real one
+                path = shutil.copy(os.path.join(HERE, script), tmp)
+                if backend and script in BACKEND_SCRIPTS:
+                    args = args + ['--backend', backend]
+                if script in CLI_SCRIPTS:
+                    args = args + ['--cli', cli, '--cache-dir', os.path.join(tmp, 'hermes')]
+                args = args + ['--encoder', encoder]
+                import runpy
+                sys.argv = [path] + args
+                runpy.run_path(path, run_name='__main__')
+        wall = time.perf_counter() - started
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    report = profiler.report()
+    render = report['stages'].get('render', {})
+    return {
+        'frames': report['counts']['frames'],
+        'rendered': report['counts']['rendered'],
+        'wall_s': round(wall, 3),
+        'fps': round(report['counts']['frames'] / wall, 1) if wall else None,
+        'latency_p50_ms': render.get('p50_ms'),
+        'latency_p95_ms': render.get('p95_ms'),
+        'latency_p99_ms': render.get('p99_ms'),
+        'latency_max_ms': render.get('max_ms'),
+        'encode_s': round(sum(report['stages'].get(s, {}).get('total_s', 0) for s in ('encode', 'encode_flush')), 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1) if peak_rss_mb() is not None else None,
+    }
+
+
+def mock_running():
+    with socket.socket() as s:
+        s.settimeout(0.2)
+        return s.connect_ex(('127.0.0.1', MOCK_PORT)) == 0
+
+
+@contextlib.contextmanager
+def mock_api():
+    """Start mock-api.js for the recorders unless one is already listening"""
+    if mock_running():
+        yield
+        return
+    proc = subprocess.Popen(['node', os.path.join(HERE, 'mock-api.js')], cwd=HERE,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        for _ in range(50):
+            if mock_running():
+                break
+            time.sleep(0.1)
+        yield
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def run(names, backend, repeat, encoder='auto', cli='python'):
+    """Each benchmark in a fresh process, so peak RSS is its own; keeps the fastest of `repeat` runs"""
+    results = {}
+    needs_mock = any(BENCHES[n][2] for n in names)
+    with mock_api() if needs_mock else contextlib.nullcontext():
+        for name in names:
+            best = None
+            for _ in range(repeat):
+                cmd = [sys.executable, os.path.abspath(__file__), '--child', name, '--encoder', encoder,
+                       '--cli', cli]
+                if backend:
+                    cmd += ['--backend', backend]
+                proc = subprocess.run(cmd, cwd=HERE, capture_output=True, text=True)
+                if proc.returncode != 0:
+                    best = {'error': (proc.stderr.strip().splitlines() or ['failed'])[-1]}
+                    break
+                res = json.loads(proc.stdout.strip().splitlines()[-1])
+                if best is None or res['wall_s'] < best['wall_s']:
+                    best = res
+            results[name] = best
+            print(f"{name}: " + ', '.join(f"{k}={v}" for k, v in best.items()), file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Regressions worse than threshold (a fraction) against the baseline, as
+    strings. A benchmark that failed, or a metric it no longer reports,
+    counts as one too.
+    """
+    regressions = []
+    for name, res in results.items():
+        if res is None or 'error' in res:
+            regressions.append(f"{name}: failed ({(res or {}).get('error', 'no result')})")
+            continue
+        base = baseline.get('results', {}).get(name)
+        if not base or 'error' in base:
+            continue
+        for metric, higher_better in METRICS.items():
+            old, new = base.get(metric), res.get(metric)
+            if not old:
+                continue
+            if new is None:
+                regressions.append(f'{name} {metric}: {old} -> missing')
+                continue
+            change = (new - old) / old
+            if (-change if higher_better else change) > threshold:
+                regressions.append(f'{name} {metric}: {old} -> {new} ({change:+.1%})')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the terminal video renderers.')
+    parser.add_argument('names', nargs='*', metavar='NAME',
+        help=f'benchmarks to run (default: all of {", ".join(BENCHES)})')
+    parser.add_argument('--backend', choices=['pillow', 'numpy', 'palette'],
+        help='framebuffer backend for the scripts that support one')
+    parser.add_argument('--encoder', choices=['auto', 'pyav', 'ffmpeg'], default='auto',
+        help='in-process PyAV or an ffmpeg subprocess (default: PyAV if installed)')
+    parser.add_argument('--cli', choices=['python', 'node'], default='python',
+        help='how the recorders run hermes commands (default: in process)')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per benchmark; the fastest is kept')
+    parser.add_argument('--out', help='write the JSON results here instead of stdout')
+    parser.add_argument('--save-baseline', metavar='PATH', help='also store the results as a baseline')
+    parser.add_argument('--baseline', metavar='PATH', help='compare against a stored baseline')
+    parser.add_argument('--threshold', type=float, default=0.10,
+        help='allowed slowdown before a metric counts as a regression (default 0.10 = 10%%)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    opts = parser.parse_args()
+
+    if opts.child:
+        print(json.dumps(run_child(opts.child, opts.backend, opts.encoder, opts.cli)))
+        return
+    unknown = set(opts.names) - set(BENCHES)
+    if unknown:
+        parser.error(f'unknown benchmark: {", ".join(sorted(unknown))}')
+
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'backend': opts.backend or 'pillow',
+        'encoder': opts.encoder,
+        'cli': opts.cli,
+        'results': run(opts.names or list(BENCHES), opts.backend, opts.repeat, opts.encoder, opts.cli),
+    }
+    report = json.dumps(results, indent=2)
+    if opts.out:
+        with open(opts.out, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+    if opts.save_baseline:
+        with open(opts.save_baseline, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+
+    if opts.baseline:
+        with open(opts.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results['results'], baseline, opts.threshold)
+        for line in regressions:
+            print(f'REGRESSION {line}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions beyond {opts.threshold:.0%} against {opts.baseline}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -156,6 +156,11 @@ const server = http.createServer((req, res) => {
 });
 
 const PORT = 4020;
-server.listen(PORT, () => {
-    console.log(`hermesx402 mock API running on http://localhost:${PORT}`);
-});
+// Required as a module (termvideo/agents.py reads the listing), it only exports
+if (require.main === module) {
+    server.listen(PORT, () => {
+        console.log(`hermesx402 mock API running on http://localhost:${PORT}`);
+    });
+}
+
+module.exports = { agents, server, PORT };
@@ -2,130 +2,105 @@
 Record a real terminal session as MP4.
 Runs actual hermes.js commands against the mock API and captures output.
 """
-import os, subprocess, shutil, time
-from PIL import Image, ImageDraw, ImageFont
+import os, argparse
+
+from termvideo import asciicast, encode, hermes, instrument
+from termvideo.chrome import ACCENT, BAR_H, FAINT, MUTED, PADDING, TEXT_COLOR, ChromeCache
+from termvideo.encode import QueuedWriter, open_writer
+from termvideo.fonts import get_font
+from termvideo.frames import FrameRuns
+from termvideo.glyphs import GlyphAtlas
+from termvideo.hermes import prefetch
+from termvideo.live import LiveSession
+from termvideo.npraster import NumpyFrameRenderer
+from termvideo.palette import PaletteFrameRenderer
+from termvideo.parallel import render_parallel
+from termvideo.preview import PREVIEW_FPS, ContactSheet, open_preview, preview_path
+from termvideo.raster import FrameRenderer
+from termvideo.scrollback import Scrollback, viewport_rows
+from termvideo.scenefile import compile_scene
+from termvideo.vt import Grid, Parser, styled
 
 WIDTH, HEIGHT = 720, 420
 FPS = 30
-BG = (8, 8, 10)
-BORDER = (30, 30, 32)
-TEXT_COLOR = (232, 232, 232)
-MUTED = (136, 136, 136)
-FAINT = (68, 68, 68)
-ACCENT = (52, 211, 153)
-RED = (255, 95, 87)
-YELLOW = (255, 189, 46)
-GREEN_ = (40, 200, 64)
-BAR_BG = (14, 14, 18)
-BAR_H = 36
-PADDING = 20
 LINE_H = 20
 FONT_SIZE = 13
-
-HERMES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts', 'hermes.js')
-
-def get_font(size):
-    for name in ['consola.ttf', 'Consolas', 'cour.ttf']:
-        try:
-            return ImageFont.truetype(name, size)
-        except: pass
-    return ImageFont.load_default()
+ROWS = viewport_rows(HEIGHT, LINE_H, BAR_H + PADDING, PADDING)
 
 font = get_font(FONT_SIZE)
 font_small = get_font(10)
+COLS = int((WIDTH - 2 * PADDING) // font.getlength('M'))
+chrome = ChromeCache(font_small, bar_h=BAR_H)
+atlas = GlyphAtlas(font)
+BACKENDS = {'pillow': FrameRenderer, 'numpy': NumpyFrameRenderer, 'palette': PaletteFrameRenderer}
 
-def run_cmd(args):
-    """Run a real hermes.js command and return output lines."""
-    result = subprocess.run(
-        ['node', HERMES] + args + ['--local'],
-        capture_output=True, text=True, timeout=15
-    )
-    output = result.stdout.strip()
-    if result.stderr.strip():
-        output += '\n' + result.stderr.strip()
-    return output.split('\n') if output else []
-
-def colorize_line(line):
-    """Determine color for an output line."""
-    stripped = line.strip()
-    if stripped.startswith('✓') or stripped.startswith('●'):
-        return ACCENT
-    elif stripped.startswith('↳'):
-        return FAINT
-    elif stripped.startswith('balance') or stripped.startswith('pending') or stripped.startswith('total'):
-        return FAINT
-    elif '/5' in stripped and 'SOL/task' in stripped:
-        return FAINT
-    else:
-        return MUTED
+def make_renderer(backend='pillow'):
+    return BACKENDS[backend]((WIDTH, HEIGHT), chrome, atlas, top=BAR_H + PADDING, left=PADDING,
+        line_h=LINE_H, cursor_size=(8, FONT_SIZE + 2), cursor_color=ACCENT)
+
+renderer = make_renderer()
+
+def use_backend(backend):
+    """Switch the module renderer (also called in pool workers)"""
+    global renderer
+    if type(renderer) is not BACKENDS[backend]:
+        renderer = make_renderer(backend)
 
 def render_frame(title, lines, cursor_visible=False, cursor_line=0, cursor_text='', frame_num=0):
-    """Render a terminal frame."""
-    img = Image.new('RGB', (WIDTH, HEIGHT), BG)
-    draw = ImageDraw.Draw(img)
-    draw.rectangle([0, 0, WIDTH-1, HEIGHT-1], outline=BORDER)
-    draw.rectangle([1, 1, WIDTH-2, BAR_H], fill=BAR_BG)
-    draw.line([1, BAR_H, WIDTH-2, BAR_H], fill=BORDER)
-    draw.ellipse([12, 12, 22, 22], fill=RED)
-    draw.ellipse([28, 12, 38, 22], fill=YELLOW)
-    draw.ellipse([44, 12, 54, 22], fill=GREEN_)
-    draw.text((64, 13), title.upper(), fill=MUTED, font=font_small)
-
-    y = BAR_H + PADDING
-    for i, (text, color) in enumerate(lines):
-        draw.text((PADDING, y), text, fill=color, font=font)
-        y += LINE_H
-
-    # Cursor
+    """Render a terminal frame, repainting only what changed since the last one."""
+    cursor = None
     if cursor_visible and (frame_num // (FPS // 2)) % 2 == 0:
-        cy = BAR_H + PADDING + cursor_line * LINE_H
-        bbox = font.getbbox(cursor_text)
-        cx = PADDING + (bbox[2] - bbox[0])
-        draw.rectangle([cx, cy, cx + 7, cy + FONT_SIZE + 1], fill=ACCENT)
-
-    return img
+        cursor = (cursor_line, PADDING + round(atlas.text_width(cursor_text)))
+    return renderer.render(title, lines, cursor)
 
 
-def record_scene(title, commands):
+def record_scene(title, commands, run=None, sink=None):
     """
     Record a scene. commands is a list of:
-      ('cmd', 'hermes browse --tag code')  — type and run
+      ('cmd', 'hermes browse --tag code', ['browse', ...])  — type and run
+      ('cmd', text, args, output_lines)  — type and show pre-captured output
       ('pause', 500)  — pause in ms
-    Returns list of PIL frames.
+    run(args) supplies command output (default: hermes.run_hermes).
+    Returns FrameRuns of (frame, count); with a sink(frame, count) each run
+    is streamed to it as soon as it is complete instead.
     """
-    frames = []
-    displayed_lines = []  # list of (text, color)
+    run = run or hermes.run_hermes
+    frames = FrameRuns(sink)
+    displayed_lines = Scrollback(ROWS)  # (text, color) segments per line; only the last ROWS are on screen
 
     def add_frames(n):
-        for i in range(n):
-            frames.append(render_frame(title, displayed_lines, frame_num=len(frames)))
+        # No cursor while holding, so the whole pause is one rendered frame
+        frames.add((tuple(displayed_lines.view()), None),
+            lambda: render_frame(title, displayed_lines.view(), frame_num=frames.total), n)
 
-    def type_and_run(cmd_text, args):
-        nonlocal displayed_lines
+    def type_and_run(cmd_text, args, output_lines=None):
         line_idx = len(displayed_lines)
         
         # Type the command character by character
         for i in range(len(cmd_text)):
             partial = '$ ' + cmd_text[:i+1]
             if line_idx < len(displayed_lines):
-                displayed_lines[line_idx] = (partial, TEXT_COLOR)
+                displayed_lines[line_idx] = ((partial, TEXT_COLOR),)
             else:
-                displayed_lines.append((partial, TEXT_COLOR))
-            frames.append(render_frame(title, displayed_lines, 
-                cursor_visible=True, cursor_line=line_idx, 
-                cursor_text=partial, frame_num=len(frames)))
+                displayed_lines.append(((partial, TEXT_COLOR),))
+            frame_num = frames.total
+            frames.add((tuple(displayed_lines.view()), frame_num),
+                lambda: render_frame(title, displayed_lines.view(),
+                    cursor_visible=True, cursor_line=displayed_lines.screen_row(line_idx),
+                    cursor_text=partial, frame_num=frame_num))
         
         # Finish typing
-        displayed_lines[line_idx] = ('$ ' + cmd_text, TEXT_COLOR)
+        displayed_lines[line_idx] = (('$ ' + cmd_text, TEXT_COLOR),)
         add_frames(8)  # brief pause after typing
         
-        # Run the actual command
-        output_lines = run_cmd(args)
+        # Run the actual command (unless its output was captured up front)
+        if output_lines is None:
+            output_lines = run(args)
         
-        # Display output line by line with slight delay
-        for out_line in output_lines:
-            if out_line.strip():
-                displayed_lines.append((out_line, colorize_line(out_line)))
+        # Display output line by line with slight delay, colored by its own ANSI styling
+        for segments in styled(output_lines, MUTED, FAINT):
+            if any(text.strip() for text, _ in segments):
+                displayed_lines.append(segments)
                 add_frames(4)  # ~130ms between lines
 
     # Initial pause
@@ -135,40 +110,142 @@ def record_scene(title, commands):
         if action[0] == 'cmd':
             cmd_text = action[1]
             args = action[2]
-            type_and_run(cmd_text, args)
+            type_and_run(cmd_text, args, action[3] if len(action) > 3 else None)
         elif action[0] == 'pause':
             add_frames(int(action[1] / 1000 * FPS))
         elif action[0] == 'blank':
-            displayed_lines.append(('', FAINT))
+            displayed_lines.append(())
             add_frames(3)
         elif action[0] == 'clear':
-            displayed_lines = []
+            displayed_lines.clear()
             add_frames(5)
 
     # End pause
     add_frames(int(2.5 * FPS))
+    frames.flush()
     return frames
 
 
-def main():
-    print("Recording real terminal sessions...")
-    
-    all_frames = []
+def play_live(session, scenes):
+    """LiveSession producer: the scenes on the wall clock, paced like record_scene()"""
+    frame_ms = 1000 / FPS
+    for title, commands in scenes:
+        session.title(title)
+        session.wait(15 * frame_ms)
+        for action in commands:
+            if action[0] == 'cmd':
+                session.type(action[1], TEXT_COLOR, prompt='$ ')
+                session.wait(8 * frame_ms)
+                session.hermes(action[2])
+            elif action[0] == 'pause':
+                session.wait(action[1])
+            elif action[0] == 'blank':
+                session.newline()
+                session.wait(3 * frame_ms)
+            elif action[0] == 'clear':
+                session.clear()
+                session.wait(5 * frame_ms)
+        session.wait(2500)
+
+
+def record_live(scenes, sink, record=None):
+    """
+    Record the scenes live: each command runs on a pty and its output is
+    drawn as it arrives, while earlier frames render and encode. Real
+    command timing is kept; record(ms, data) gets the raw terminal output.
+    """
+    grid = Grid(COLS, ROWS, MUTED)
+    term = Parser(grid, FAINT)
+    session = LiveSession(COLS, ROWS, FPS)
+    frames = FrameRuns(sink)
+
+    def draw(cursor):
+        if cursor is not None:
+            row, col = cursor
+            text = ''.join(t for t, _ in grid.segments(row))[:col].ljust(col)
+            cursor = (row, PADDING + round(atlas.text_width(text)))
+        return renderer.render(term.title, grid.lines(), cursor)
+
+    session.start(lambda s: play_live(s, scenes))
+    for n in session.frames(term, record):
+        cursor = term.cursor() if (n // (FPS // 2)) % 2 == 0 else None
+        frames.add((term.title, tuple(grid.lines()), cursor), lambda: draw(cursor))
+    frames.flush()
+    return frames
+
+
+def scene_commands(scenes):
+    """[(args, settle_ms), ...] for every command, settle_ms being the pause after it"""
+    out = []
+    for title, commands in scenes:
+        for i, action in enumerate(commands):
+            if action[0] != 'cmd':
+                continue
+            settle = 0
+            for after in commands[i+1:]:
+                if after[0] != 'pause':
+                    break
+                settle += after[1]
+            out.append((action[2], settle))
+    return out
+
+
+def session_spec(scenes):
+    """SCENES as a scene-file spec, timed exactly like record_scene()"""
+    frame_ms = 1000 / FPS
+    spec = {'width': WIDTH, 'height': HEIGHT, 'fps': FPS, 'font_size': FONT_SIZE, 'title_size': 10,
+            'line_height': LINE_H, 'cursor': [8, FONT_SIZE + 2], 'prompt_color': 'text', 'scenes': []}
+    for title, commands in scenes:
+        actions = [{'pause': 15 * frame_ms}]
+        for action in commands:
+            if action[0] == 'cmd':
+                actions.append({'run': action[2], 'text': action[1]})
+            elif action[0] == 'pause':
+                actions.append({'pause': int(action[1] / 1000 * FPS) * frame_ms})
+            elif action[0] == 'blank':
+                actions.append({'blank': True, 'after_ms': 3 * frame_ms})
+            elif action[0] == 'clear':
+                actions.append({'clear': True, 'after_ms': 5 * frame_ms})
+        actions.append({'pause': int(2.5 * FPS) * frame_ms})
+        spec['scenes'].append({'title': title, 'actions': actions})
+    return spec
+
+
+def write_cast(path, outputs):
+    """Write the session as an asciicast v2 transcript for render-scenes.py"""
+    spec = session_spec(SCENES)
+    run = outputs.runner()
+    scenes = [compile_scene(spec, scene, run=run) for scene in spec['scenes']]
+    asciicast.save(path, spec, scenes)
 
+
+def capture_outputs(commands, run=None):
+    """Attach each command's output to its action."""
+    run = run or hermes.run_hermes
+    return [action + (run(action[2]),) if action[0] == 'cmd' else action
+            for action in commands]
+
+
+def render_segment(task, path):
+    """Pool worker: render one scene with pre-captured output into its own segment"""
+    (title, commands), encoder, backend = task
+    use_backend(backend)
+    with QueuedWriter(open_writer(path, (WIDTH, HEIGHT), FPS, pix_fmt=renderer.pix_fmt, **encoder)) as writer:
+        record_scene(title, commands, sink=writer.write)
+    return writer.frames
+
+
+SCENES = [
     # Scene 1: Install + Browse
-    print("Scene 1: Browse agents...")
-    scene1 = record_scene('hermes — browse', [
+    ('hermes — browse', [
         ('cmd', 'hermes browse --tag code', ['browse', '--tag', 'code']),
         ('pause', 800),
         ('blank',),
         ('cmd', 'hermes browse --tag research', ['browse', '--tag', 'research']),
         ('pause', 1500),
-    ])
-    all_frames.extend(scene1)
-
+    ]),
     # Scene 2: Hire flow
-    print("Scene 2: Hire agent...")
-    scene2 = record_scene('hermes — hire', [
+    ('hermes — hire', [
         ('cmd', 'hermes hire code-auditor --task "review contracts"', 
             ['hire', 'code-auditor', '--task', 'review contracts']),
         ('pause', 3500),  # wait for task to complete
@@ -178,49 +255,113 @@ def main():
         ('blank',),
         ('cmd', 'hermes confirm task-0x0002 --rating 5', ['confirm', 'task-0x0002', '--rating', '5']),
         ('pause', 1000),
-    ])
-    all_frames.extend(scene2)
-
+    ]),
     # Scene 3: Earnings + Withdraw
-    print("Scene 3: Earnings...")
-    scene3 = record_scene('hermes — earnings', [
+    ('hermes — earnings', [
         ('cmd', 'hermes earnings', ['earnings']),
         ('pause', 1000),
         ('blank',),
         ('cmd', 'hermes withdraw --amount 0.12 --to phantom', ['withdraw', '--amount', '0.12', '--to', 'phantom']),
         ('pause', 1500),
-    ])
-    all_frames.extend(scene3)
-
-    # Render
-    outdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rec-frames')
-    if os.path.exists(outdir):
-        shutil.rmtree(outdir)
-    os.makedirs(outdir)
-
-    print(f"Saving {len(all_frames)} frames...")
-    for i, frame in enumerate(all_frames):
-        frame.save(os.path.join(outdir, f'frame_{i:05d}.png'))
-        if i % 100 == 0:
-            print(f"  {i}/{len(all_frames)}")
-
-    print("Encoding video...")
+    ]),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record a real terminal session as MP4.')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+        help='render scenes in N worker processes and stitch the segments')
+    parser.add_argument('--refresh', action='store_true',
+        help='re-run every command instead of using cached CLI output')
+    parser.add_argument('--cast', action='store_true',
+        help='also save the session as terminal-real.cast (always written with --live)')
+    parser.add_argument('--cast-only', action='store_true',
+        help='only capture the session as terminal-real.cast; render it later with render-scenes.py')
+    parser.add_argument('--live', action='store_true',
+        help='run the commands on a pty while recording, keeping their real timing (needs the mock API)')
+    parser.add_argument('--preview', action='store_true',
+        help=f'quick look: frames are drawn full size as usual, then resampled to {PREVIEW_FPS} fps '
+             'at half size for the fastest encode, as terminal-real-preview.mp4 (one pass, no --jobs)')
+    parser.add_argument('--sheet', nargs='?', const='', metavar='PNG',
+        help='also write a contact sheet of each scene\'s key moments (default: the video\'s name as .png)')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='pillow',
+        help='framebuffer: Pillow images, a reused NumPy buffer handed to the encoder as YUV420, '
+             'or 8-bit palette images')
+    hermes.add_arguments(parser)
+    encode.add_arguments(parser)
+    instrument.add_arguments(parser)
+    opts = parser.parse_args()
+    if opts.live and (opts.jobs > 1 or opts.cast_only):
+        parser.error('--live records and renders in one pass, without --jobs or --cast-only')
+    if opts.backend == 'numpy' and (opts.preview or opts.sheet is not None):
+        parser.error('--preview and --sheet need Pillow frames (--backend pillow or palette)')
+    use_backend(opts.backend)
+    instrument.start(opts)
+
     outfile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'terminal-real.mp4')
-    ffmpeg = r'C:\Users\Noe Mondragon\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_Microsoft.Winget.Source_8wekyb3d8bbwe\ffmpeg-8.0.1-full_build\bin\ffmpeg.exe'
-
-    subprocess.run([
-        ffmpeg, '-y',
-        '-framerate', str(FPS),
-        '-i', os.path.join(outdir, 'frame_%05d.png'),
-        '-c:v', 'libx264',
-        '-pix_fmt', 'yuv420p',
-        '-crf', '23',
-        '-preset', 'medium',
-        '-movflags', '+faststart',
-        outfile
-    ], check=True)
-
-    shutil.rmtree(outdir)
+    castfile = os.path.splitext(outfile)[0] + '.cast'
+    if opts.preview:
+        outfile = preview_path(outfile)
+    encoder = encode.encoder_options(opts)
+    opener = open_preview if opts.preview else open_writer
+    sheet = ContactSheet(FPS) if opts.sheet is not None else None
+
+    def save_sheet():
+        if sheet:
+            sheetfile = opts.sheet or os.path.splitext(outfile)[0] + '.png'
+            rows, shots = sheet.save(sheetfile)
+            print(f"Contact sheet: {sheetfile} ({shots} key moments in {rows} scenes)")
+
+    if opts.live:
+        print("Recording live (commands run while frames encode)...")
+        with asciicast.Recorder(castfile, session_spec(SCENES), SCENES[0][0]) as cast, \
+                QueuedWriter(opener(outfile, (WIDTH, HEIGHT), FPS, pix_fmt=renderer.pix_fmt,
+                                    **encoder)) as writer:
+            # One continuous take, so the sheet gets a single row
+            record_live(SCENES, sheet.sink(writer.write) if sheet else writer.write, cast.write)
+        print(f"Transcript: {castfile}")
+        save_sheet()
+        print(f"Done! {outfile} ({writer.frames} frames, {writer.unique} rendered, "
+              f"{os.path.getsize(outfile) / 1024:.0f} KB)")
+        return
+
+    print("Recording real terminal sessions...")
+    # Every command is fetched up front (from .cache/ or concurrently through
+    # Node) while the first scenes render
+    outputs = prefetch(scene_commands(SCENES), refresh=opts.refresh, cache_dir=opts.cache_dir, cli=opts.cli)
+
+    if opts.cast or opts.cast_only:
+        write_cast(castfile, outputs)
+        print(f"Transcript: {castfile}")
+    if opts.cast_only:
+        return
+
+    if opts.jobs > 1 and not opts.preview and sheet is None:
+        # Outputs are gathered here; only rasterizing + encoding is farmed out
+        tasks = []
+        run = outputs.runner()
+        for i, (title, commands) in enumerate(SCENES):
+            print(f"Scene {i+1}: capturing {title}...")
+            tasks.append(((title, capture_outputs(commands, run)), encoder, opts.backend))
+        print(f"Rendering {len(tasks)} scenes on {opts.jobs} workers...")
+        total = render_parallel(render_segment, tasks, outfile, opts.jobs, **encoder)
+        print(f"Done! {outfile} ({total} frames, {os.path.getsize(outfile) / 1024:.0f} KB)")
+        return
+
+    # Frames stream through a bounded queue into the encoder as they are recorded
+    with QueuedWriter(opener(outfile, (WIDTH, HEIGHT), FPS, pix_fmt=renderer.pix_fmt, **encoder)) as writer:
+        write = sheet.sink(writer.write) if sheet else writer.write
+        run = outputs.runner()
+        for i, (title, commands) in enumerate(SCENES):
+            print(f"Scene {i+1}: {title}...")
+            if sheet:
+                sheet.scene()
+            record_scene(title, commands, run, sink=write)
+
+        print(f"CLI output: {outputs.hits} cached, {outputs.runs} run")
+        print(f"Encoding {writer.frames} frames ({writer.unique} rendered)...")
+    save_sheet()
+
     size = os.path.getsize(outfile) / 1024
     print(f"Done! {outfile} ({size:.0f} KB)")
 
@@ -1,183 +1,202 @@
 """
 Record the OpenClaw skill install scene — real CLI output.
 """
-import os, subprocess, shutil
-from PIL import Image, ImageDraw, ImageFont
+import os, argparse
+
+from termvideo import encode, hermes, instrument
+from termvideo.chrome import ACCENT, BAR_H, FAINT, MUTED, PADDING, TEXT_COLOR, ChromeCache
+from termvideo.encode import QueuedWriter, open_writer
+from termvideo.fonts import get_font
+from termvideo.frames import FrameRuns
+from termvideo.glyphs import GlyphAtlas
+from termvideo.hermes import prefetch
+from termvideo.npraster import NumpyFrameRenderer
+from termvideo.palette import PaletteFrameRenderer
+from termvideo.preview import PREVIEW_FPS, ContactSheet, open_preview, preview_path
+from termvideo.raster import FrameRenderer
+from termvideo.scrollback import Scrollback, viewport_rows
+from termvideo.vt import styled
 
 WIDTH, HEIGHT = 640, 360
 FPS = 30
-BG = (8, 8, 10)
-BORDER = (30, 30, 32)
-TEXT_COLOR = (232, 232, 232)
-MUTED = (136, 136, 136)
-FAINT = (68, 68, 68)
-ACCENT = (52, 211, 153)
-RED = (255, 95, 87)
-YELLOW = (255, 189, 46)
-GREEN_ = (40, 200, 64)
-BAR_BG = (14, 14, 18)
-BAR_H = 36
-PADDING = 20
 LINE_H = 20
 FONT_SIZE = 13
-
-HERMES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts', 'hermes.js')
-
-def get_font(size):
-    for name in ['consola.ttf', 'Consolas', 'cour.ttf']:
-        try: return ImageFont.truetype(name, size)
-        except: pass
-    return ImageFont.load_default()
+ROWS = viewport_rows(HEIGHT, LINE_H, BAR_H + PADDING, PADDING)
 
 font = get_font(FONT_SIZE)
 font_small = get_font(10)
+chrome = ChromeCache(font_small, bar_h=BAR_H)
+atlas = GlyphAtlas(font)
+BACKENDS = {'pillow': FrameRenderer, 'numpy': NumpyFrameRenderer, 'palette': PaletteFrameRenderer}
 
-def run_cmd(args):
-    result = subprocess.run(['node', HERMES] + args + ['--local'],
-        capture_output=True, text=True, timeout=15)
-    output = result.stdout.strip()
-    return output.split('\n') if output else []
+def make_renderer(backend='pillow'):
+    return BACKENDS[backend]((WIDTH, HEIGHT), chrome, atlas, top=BAR_H + PADDING, left=PADDING,
+        line_h=LINE_H, cursor_size=(8, FONT_SIZE + 2), cursor_color=ACCENT)
 
-def colorize(line):
-    s = line.strip()
-    if s.startswith('✓') or s.startswith('●'): return ACCENT
-    elif s.startswith('↳'): return FAINT
-    elif '/5' in s and 'SOL' in s: return FAINT
-    elif 'balance' in s or 'status' in s or 'pending' in s: return FAINT
-    return MUTED
+renderer = make_renderer()
+
+def use_backend(backend):
+    """Switch the module renderer"""
+    global renderer
+    if type(renderer) is not BACKENDS[backend]:
+        renderer = make_renderer(backend)
 
 def render(title, lines, cursor_vis=False, cursor_line=0, cursor_text='', fnum=0):
-    img = Image.new('RGB', (WIDTH, HEIGHT), BG)
-    d = ImageDraw.Draw(img)
-    d.rectangle([0,0,WIDTH-1,HEIGHT-1], outline=BORDER)
-    d.rectangle([1,1,WIDTH-2,BAR_H], fill=BAR_BG)
-    d.line([1,BAR_H,WIDTH-2,BAR_H], fill=BORDER)
-    d.ellipse([12,12,22,22], fill=RED)
-    d.ellipse([28,12,38,22], fill=YELLOW)
-    d.ellipse([44,12,54,22], fill=GREEN_)
-    d.text((64,13), title.upper(), fill=MUTED, font=font_small)
-    y = BAR_H + PADDING
-    for text, color in lines:
-        d.text((PADDING, y), text, fill=color, font=font)
-        y += LINE_H
-    if cursor_vis and (fnum // (FPS//2)) % 2 == 0:
-        cy = BAR_H + PADDING + cursor_line * LINE_H
-        bbox = font.getbbox(cursor_text)
-        cx = PADDING + (bbox[2]-bbox[0])
-        d.rectangle([cx,cy,cx+7,cy+FONT_SIZE+1], fill=ACCENT)
-    return img
+    """lines: a Scrollback; only its visible rows are drawn"""
+    cursor = None
+    row = lines.screen_row(cursor_line)
+    if cursor_vis and row is not None and (fnum // (FPS//2)) % 2 == 0:
+        cursor = (row, PADDING + round(atlas.text_width(cursor_text)))
+    return renderer.render(title, lines.view(), cursor)
+
+# Real commands in the recording, with the pause that follows each
+COMMANDS = [
+    (['browse', '--tag', 'code'], 1500),
+    (['earnings'], 2500),
+]
 
 def main():
-    frames = []
-    lines = []
-
-    def add(n):
-        for _ in range(n):
-            frames.append(render(title, lines, fnum=len(frames)))
-
-    def type_cmd(cmd, args):
-        line_idx = len(lines)
-        for i in range(len(cmd)):
-            partial = '$ ' + cmd[:i+1]
-            if line_idx < len(lines): lines[line_idx] = (partial, TEXT_COLOR)
-            else: lines.append((partial, TEXT_COLOR))
-            frames.append(render(title, lines, True, line_idx, partial, len(frames)))
-        lines[line_idx] = ('$ ' + cmd, TEXT_COLOR)
+    parser = argparse.ArgumentParser(description='Record the OpenClaw skill scene as MP4.')
+    parser.add_argument('--refresh', action='store_true',
+        help='re-run every command instead of using cached CLI output')
+    parser.add_argument('--preview', action='store_true',
+        help=f'quick look: frames are drawn full size as usual, then resampled to {PREVIEW_FPS} fps '
+             'at half size for the fastest encode, as skill-terminal-preview.mp4')
+    parser.add_argument('--sheet', nargs='?', const='', metavar='PNG',
+        help='also write a contact sheet of each scene\'s key moments (default: the video\'s name as .png)')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='pillow',
+        help='framebuffer: Pillow images, a reused NumPy buffer handed to the encoder as YUV420, '
+             'or 8-bit palette images')
+    hermes.add_arguments(parser)
+    encode.add_arguments(parser)
+    instrument.add_arguments(parser)
+    opts = parser.parse_args()
+    if opts.backend == 'numpy' and (opts.preview or opts.sheet is not None):
+        parser.error('--preview and --sheet need Pillow frames (--backend pillow or palette)')
+    use_backend(opts.backend)
+    instrument.start(opts)
+
+    outputs = prefetch(COMMANDS, refresh=opts.refresh, cache_dir=opts.cache_dir, cli=opts.cli)
+    run = outputs.runner()
+    outfile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill-terminal.mp4')
+    if opts.preview:
+        outfile = preview_path(outfile)
+    sheet = ContactSheet(FPS) if opts.sheet is not None else None
+    opener = open_preview if opts.preview else open_writer
+
+    # Runs stream through a bounded queue into the encoder as they complete
+    with QueuedWriter(opener(outfile, (WIDTH, HEIGHT), FPS, pix_fmt=renderer.pix_fmt,
+                             **encode.encoder_options(opts))) as writer:
+        frames = FrameRuns(sheet.sink(writer.write) if sheet else writer.write)
+        lines = Scrollback(ROWS)  # scrolls once the window is full
+
+        def new_scene():
+            # The last scene's final run goes out before the sheet starts a new row
+            frames.flush()
+            if sheet:
+                sheet.scene()
+            lines.clear()
+
+        def add(n):
+            # Held frames have no cursor, so each pause renders once
+            frames.add((title, tuple(lines.view()), None), lambda: render(title, lines, fnum=frames.total), n)
+
+        def add_typed(line_idx, partial):
+            fnum = frames.total
+            frames.add((title, tuple(lines.view()), lines.top, fnum), lambda: render(title, lines, True, line_idx, partial, fnum))
+
+        def type_cmd(cmd, args):
+            line_idx = len(lines)
+            for i in range(len(cmd)):
+                partial = '$ ' + cmd[:i+1]
+                if line_idx < len(lines): lines[line_idx] = ((partial, TEXT_COLOR),)
+                else: lines.append(((partial, TEXT_COLOR),))
+                add_typed(line_idx, partial)
+            lines[line_idx] = (('$ ' + cmd, TEXT_COLOR),)
+            add(8)
+            out = run(args)
+            for segs in styled(out, MUTED, FAINT):
+                if any(t.strip() for t, _ in segs):
+                    lines.append(segs)
+                    add(4)
+
+        # Scene 1: Install + first use
+        title = 'openclaw — install'
+        new_scene()
+        add(15)
+
+        # Simulate install (can't run real openclaw skills add)
+        line_idx = 0
+        install_cmd = 'openclaw skills add hermesx402'
+        for i in range(len(install_cmd)):
+            partial = '$ ' + install_cmd[:i+1]
+            if len(lines) == 0: lines.append(((partial, TEXT_COLOR),))
+            else: lines[0] = ((partial, TEXT_COLOR),)
+            add_typed(0, partial)
+        lines[0] = (('$ ' + install_cmd, TEXT_COLOR),)
         add(8)
-        out = run_cmd(args)
-        for ol in out:
-            if ol.strip():
-                lines.append((ol, colorize(ol)))
-                add(4)
-
-    # Scene 1: Install + first use
-    title = 'openclaw — install'
-    lines = []
-    add(15)
-
-    # Simulate install (can't run real openclaw skills add)
-    line_idx = 0
-    install_cmd = 'openclaw skills add hermesx402'
-    for i in range(len(install_cmd)):
-        partial = '$ ' + install_cmd[:i+1]
-        lines = [(partial, TEXT_COLOR)] if line_idx == 0 else lines[:1]
-        lines[0] = (partial, TEXT_COLOR)
-        frames.append(render(title, lines, True, 0, partial, len(frames)))
-    lines[0] = ('$ ' + install_cmd, TEXT_COLOR)
-    add(8)
     
-    # Simulated install output
-    for msg, delay in [
-        ('  ↳ downloading hermesx402@latest...', 12),
-        ('  ↳ installing dependencies...', 10),
-        ('  ↳ validating skill manifest...', 8),
-        ('  ✓ hermesx402 installed successfully', 4),
-    ]:
-        lines.append((msg, ACCENT if '✓' in msg else FAINT))
-        add(delay)
-
-    add(int(0.6 * FPS))
-    lines.append(('', FAINT))
-    add(3)
-
-    # Real browse command
-    type_cmd('hermes browse --tag code', ['browse', '--tag', 'code'])
-    add(int(1.5 * FPS))
-
-    # Scene 2: Publish
-    title = 'openclaw — publish'
-    lines = []
-    add(15)
-
-    # Simulate publish
-    pub_cmd = 'openclaw hermes publish my-agent'
-    for i in range(len(pub_cmd)):
-        partial = '$ ' + pub_cmd[:i+1]
-        if len(lines) == 0: lines.append((partial, TEXT_COLOR))
-        else: lines[0] = (partial, TEXT_COLOR)
-        frames.append(render(title, lines, True, 0, partial, len(frames)))
-    lines[0] = ('$ ' + pub_cmd, TEXT_COLOR)
-    add(8)
+        # Simulated install output
+        for msg, delay in [
+            ('  ↳ downloading hermesx402@latest...', 12),
+            ('  ↳ installing dependencies...', 10),
+            ('  ↳ validating skill manifest...', 8),
+            ('  ✓ hermesx402 installed successfully', 4),
+        ]:
+            lines.append(((msg, ACCENT if '✓' in msg else FAINT),))
+            add(delay)
+
+        add(int(0.6 * FPS))
+        lines.append(())
+        add(3)
+
+        # Real browse command
+        type_cmd('hermes browse --tag code', ['browse', '--tag', 'code'])
+        add(int(1.5 * FPS))
+
+        # Scene 2: Publish
+        title = 'openclaw — publish'
+        new_scene()
+        add(15)
+
+        # Simulate publish
+        pub_cmd = 'openclaw hermes publish my-agent'
+        for i in range(len(pub_cmd)):
+            partial = '$ ' + pub_cmd[:i+1]
+            if len(lines) == 0: lines.append(((partial, TEXT_COLOR),))
+            else: lines[0] = ((partial, TEXT_COLOR),)
+            add_typed(0, partial)
+        lines[0] = (('$ ' + pub_cmd, TEXT_COLOR),)
+        add(8)
     
-    for msg, delay in [
-        ('  ↳ detecting agent config...', 10),
-        ('  ↳ name: my-agent', 5),
-        ('  ↳ tags: research, analysis', 5),
-        ('  ↳ rate: 0.1 SOL/task', 5),
-        ('  ✓ published to hermesx402', 10),
-        ('  ✓ now accepting tasks', 4),
-    ]:
-        lines.append((msg, ACCENT if '✓' in msg else FAINT))
-        add(delay)
-
-    add(int(0.5 * FPS))
-    lines.append(('', FAINT))
-    add(3)
-
-    # Real earnings command
-    type_cmd('hermes earnings', ['earnings'])
-    add(int(2.5 * FPS))
-
-    # Save
-    outdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill-rec-frames')
-    if os.path.exists(outdir): shutil.rmtree(outdir)
-    os.makedirs(outdir)
-
-    print(f"Saving {len(frames)} frames...")
-    for i, f in enumerate(frames):
-        f.save(os.path.join(outdir, f'frame_{i:05d}.png'))
-        if i % 100 == 0: print(f"  {i}/{len(frames)}")
-
-    outfile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill-terminal.mp4')
-    ffmpeg = r'C:\Users\Noe Mondragon\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_Microsoft.Winget.Source_8wekyb3d8bbwe\ffmpeg-8.0.1-full_build\bin\ffmpeg.exe'
-
-    print("Encoding...")
-    subprocess.run([ffmpeg, '-y', '-framerate', str(FPS),
-        '-i', os.path.join(outdir, 'frame_%05d.png'),
-        '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-crf', '23',
-        '-preset', 'medium', '-movflags', '+faststart', outfile], check=True)
+        for msg, delay in [
+            ('  ↳ detecting agent config...', 10),
+            ('  ↳ name: my-agent', 5),
+            ('  ↳ tags: research, analysis', 5),
+            ('  ↳ rate: 0.1 SOL/task', 5),
+            ('  ✓ published to hermesx402', 10),
+            ('  ✓ now accepting tasks', 4),
+        ]:
+            lines.append(((msg, ACCENT if '✓' in msg else FAINT),))
+            add(delay)
+
+        add(int(0.5 * FPS))
+        lines.append(())
+        add(3)
+
+        # Real earnings command
+        type_cmd('hermes earnings', ['earnings'])
+        add(int(2.5 * FPS))
+        frames.flush()
+
+        print(f"CLI output: {outputs.hits} cached, {outputs.runs} run")
+        print(f"Encoding {frames.total} frames ({len(frames)} rendered)...")
+
+    if sheet:
+        sheetfile = opts.sheet or os.path.splitext(outfile)[0] + '.png'
+        rows, shots = sheet.save(sheetfile)
+        print(f"Contact sheet: {sheetfile} ({shots} key moments in {rows} scenes)")
 
-    shutil.rmtree(outdir)
     print(f"Done! {outfile} ({os.path.getsize(outfile)/1024:.0f} KB)")
 
 if __name__ == '__main__':
@@ -0,0 +1,120 @@
+"""
+Render a personalized demo video for every agent listing from one scene
+template (scenes/templates/agent.json), through a pool of worker processes.
+Each worker keeps one BatchRenderer for its whole share of the batch, so
+fonts, window chrome and glyph caches are loaded once per worker, not once
+per video; scenes that are the same for every agent come from the segment
+cache after the first video, so only the parts that differ are rendered.
+"""
+import os, sys, time, argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from termvideo import agents, encode, hermes, instrument, scenefile
+from termvideo.encode import FORMATS
+from termvideo.hermes import prefetch_all
+from termvideo.render import BatchRenderer
+from termvideo.segcache import SegmentCache
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE = os.path.join(HERE, 'scenes', 'templates', 'agent.json')
+
+_batch = None  # each worker's renderer, shared by every video it renders
+
+
+def start_worker(options):
+    global _batch
+    _batch = BatchRenderer(**options)
+
+
+def render_video(spec, cached):
+    """Pool worker: one agent's video; returns (output, frames, rendered, scenes cached, seconds)"""
+    t0 = time.perf_counter()
+    cache = SegmentCache() if cached else None
+    frames, rendered = _batch.render(spec, cache=cache)
+    return spec['output'], frames, rendered, cache.hits if cache else 0, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render a demo video for every agent listing.')
+    parser.add_argument('--agents', metavar='PATH',
+        help='agents as a JSON list or GET /agents response, or the server\'s SQLite db '
+             '(default: the agents in mock-api.js)')
+    parser.add_argument('--template', default=TEMPLATE, help='scene template with {field} placeholders')
+    parser.add_argument('--variants', type=int,
+        help='render this many videos, cycling through the agents (for throughput runs)')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+        help='worker processes (default: one per CPU)')
+    parser.add_argument('--format', choices=FORMATS, default='mp4', help='output format')
+    parser.add_argument('--refresh', action='store_true',
+        help='re-run every command instead of using cached CLI output')
+    parser.add_argument('--no-cache', action='store_true',
+        help='render every scene of every video instead of reusing unchanged scene segments')
+    hermes.add_arguments(parser)
+    encode.add_arguments(parser)
+    instrument.add_arguments(parser)
+    opts = parser.parse_args()
+    instrument.start(opts)
+
+    listing = agents.load_agents(opts.agents)
+    if opts.variants:
+        listing = agents.variants(listing, opts.variants)
+    if not listing:
+        parser.error('no agents to render')
+    template = agents.load_template(opts.template)
+    specs = [agents.agent_spec(template, opts.template, agent, n) for n, agent in enumerate(listing, 1)]
+    for spec in specs:
+        spec['output'] = os.path.splitext(spec['output'])[0] + '.' + opts.format
+        os.makedirs(os.path.dirname(spec['output']), exist_ok=True)
+
+    # Any CLI output is gathered here; workers only rasterize and encode
+    # Each video is its own chain of commands against the stateful mock API
+    outputs = prefetch_all([scenefile.commands(spec) for spec in specs], refresh=opts.refresh,
+                           cache_dir=opts.cache_dir, cli=opts.cli)
+    paletted = opts.format in ('gif', 'apng')
+    options = dict(paletted=paletted, **encode.encoder_options(opts))
+    batch = BatchRenderer(**options)
+    for spec, fetched in zip(specs, outputs):
+        spec['compiled'] = batch.compile(spec, run=fetched.runner())
+
+    # Cached segments are MP4s joined without re-encoding
+    cached = not opts.no_cache and opts.format == 'mp4'
+    started = time.perf_counter()
+    stats = {'frames': 0, 'rendered': 0, 'cached': 0, 'uncached': 0}
+
+    def report(output, frames, rendered, hits, seconds):
+        stats['frames'] += frames
+        stats['rendered'] += rendered
+        stats['cached'] += hits
+        if output != specs[0]['output'] and not hits:
+            stats['uncached'] += 1
+        print(f"{os.path.relpath(output, HERE)}: {frames} frames ({rendered} rendered, "
+              f"{hits} scenes cached) in {seconds:.1f}s")
+
+    # The first video renders here, so the scenes every agent shares are in
+    # the cache before the workers start and none of them renders those twice
+    global _batch
+    _batch = batch
+    report(*render_video(specs[0], cached))
+    rest = specs[1:]
+    if opts.jobs > 1 and len(rest) > 1:
+        print(f"Rendering {len(rest)} more on {opts.jobs} workers...")
+        with ProcessPoolExecutor(max_workers=opts.jobs, initializer=start_worker, initargs=(options,)) as pool:
+            for done in as_completed([pool.submit(render_video, spec, cached) for spec in rest]):
+                report(*done.result())
+    else:
+        for spec in rest:
+            report(*render_video(spec, cached))
+
+    elapsed = time.perf_counter() - started
+    print(f"CLI output: {sum(o.hits for o in outputs)} cached, {sum(o.runs for o in outputs)} run")
+    print(f"Done! {len(specs)} videos, {stats['frames']} frames ({stats['rendered']} rendered, "
+          f"{stats['cached']} scenes cached) in {elapsed:.1f}s — {len(specs) / elapsed * 60:.0f} videos/min")
+    # Every video after the first should take the scenes all agents share
+    # from the cache; if not, segment keys aren't stable (fonts, paths...)
+    if cached and stats['uncached']:
+        print(f"Warning: {stats['uncached']} videos reused no cached scenes; shared scenes "
+              f"were rendered again", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Render declarative scene files (scenes/*.json) or asciicast v2 recordings
+(*.cast) as MP4 videos, or WebM, GIF or APNG with --format. --format timeline
+skips rasterizing altogether and writes a JSON timeline for termplayer.js.
+Every file is rendered in this one process, sharing fonts, window chrome and
+glyph caches, so regenerating all the videos together is much cheaper than
+running each script cold.
+"""
+import os, glob, time, argparse
+
+from termvideo import asciicast, encode, hermes, instrument, scenefile, web
+from termvideo.encode import FORMATS
+from termvideo.hermes import prefetch_all
+from termvideo.preview import PREVIEW_FPS, ContactSheet, preview_path
+from termvideo.render import BatchRenderer
+from termvideo.segcache import SegmentCache
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render scene files as MP4 videos.')
+    parser.add_argument('files', nargs='*', help='scene or .cast files (default: scenes/*.json)')
+    parser.add_argument('--cast', action='store_true',
+        help='also write each video\'s terminal session as an asciicast next to it')
+    parser.add_argument('--refresh', action='store_true',
+        help='re-run every command instead of using cached CLI output')
+    parser.add_argument('--no-cache', action='store_true',
+        help='encode each video in one pass instead of reusing unchanged scene segments')
+    parser.add_argument('--format', choices=FORMATS + ('timeline',), default='mp4',
+        help='output format: H.264 MP4, VP9 WebM, GIF/APNG, or a JSON timeline that '
+             'termplayer.js replays as text on a web page')
+    parser.add_argument('--preview', action='store_true',
+        help=f'quick look: frames are drawn full size as usual, then resampled to {PREVIEW_FPS} fps '
+             'at half size for the fastest encode, as NAME-preview.mp4 (one pass, no cache)')
+    parser.add_argument('--sheet', action='store_true',
+        help='also write a contact sheet of each scene\'s key moments next to each video, as .png')
+    parser.add_argument('--palette', action=argparse.BooleanOptionalAction, default=None,
+        help='draw 8-bit palette frames (default: on for GIF and APNG)')
+    hermes.add_arguments(parser)
+    encode.add_arguments(parser)
+    instrument.add_arguments(parser)
+    opts = parser.parse_args()
+    if opts.format == 'timeline' and (opts.preview or opts.sheet):
+        parser.error('--preview and --sheet need rendered frames, not --format timeline')
+    instrument.start(opts)
+
+    files = opts.files or sorted(glob.glob(os.path.join(HERE, 'scenes', '*.json')))
+    specs = [asciicast.load(path) if path.endswith('.cast') else scenefile.load(path) for path in files]
+    ext = '.timeline.json' if opts.format == 'timeline' else '.' + opts.format
+    for spec in specs:
+        spec['output'] = os.path.splitext(spec['output'])[0] + ext
+        if opts.preview:
+            spec['output'] = preview_path(spec['output'])
+
+    # One chain of commands per video, run in the order the videos render
+    outputs = prefetch_all([scenefile.commands(spec) for spec in specs], refresh=opts.refresh,
+                           cache_dir=opts.cache_dir, cli=opts.cli)
+    paletted = opts.format in ('gif', 'apng') if opts.palette is None else opts.palette
+    batch = BatchRenderer(paletted=paletted, preview=opts.preview, **encode.encoder_options(opts))
+    # Cached segments are MP4s joined without re-encoding
+    cache = None if opts.no_cache or opts.preview or opts.sheet or opts.format != 'mp4' else SegmentCache()
+    started = time.perf_counter()
+    for spec, fetched in zip(specs, outputs):
+        t0 = time.perf_counter()
+        spec['compiled'] = batch.compile(spec, run=fetched.runner())
+        if opts.format == 'timeline':
+            scenes = spec['compiled']
+            web.save(spec['output'], spec, scenes)
+            summary = f"{sum(len(events) for _, events, _ in scenes)} events"
+        else:
+            sheet = ContactSheet(spec['fps']) if opts.sheet else None
+            frames, rendered = batch.render(spec, cache=cache, sheet=sheet)
+            summary = f"{frames} frames ({rendered} rendered)"
+            if sheet:
+                rows, shots = sheet.save(os.path.splitext(spec['output'])[0] + '.png')
+                summary += f", {shots} key moments"
+        if opts.cast and not spec['path'].endswith('.cast'):
+            castfile = spec['output'][:-len(ext)] + '.cast'
+            asciicast.save(castfile, spec, spec['compiled'])
+        size = os.path.getsize(spec['output']) / 1024
+        print(f"{os.path.relpath(spec['output'], HERE)}: {summary}, "
+              f"{size:.0f} KB in {time.perf_counter() - t0:.1f}s")
+    print(f"CLI output: {sum(o.hits for o in outputs)} cached, {sum(o.runs for o in outputs)} run")
+    if cache is not None:
+        print(f"Scenes: {cache.hits} cached, {cache.misses} rendered")
+    print(f"Done! {len(specs)} videos in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,90 +1,105 @@
 """
 Render the skill install terminal video for the OpenClaw section.
 """
-import os, subprocess, shutil
-from PIL import Image, ImageDraw, ImageFont
+import os, argparse
+
+from termvideo import encode, instrument
+from termvideo.chrome import ACCENT, BAR_H, FAINT, PADDING, TEXT_COLOR, ChromeCache
+from termvideo.encode import QueuedWriter, open_writer
+from termvideo.fonts import get_font
+from termvideo.frames import FrameRuns
+from termvideo.glyphs import GlyphAtlas
+from termvideo.npraster import NumpyFrameRenderer
+from termvideo.palette import PaletteFrameRenderer
+from termvideo.preview import PREVIEW_FPS, ContactSheet, open_preview, preview_path
+from termvideo.raster import FrameRenderer
+from termvideo.scrollback import Scrollback, viewport_rows
 
 WIDTH, HEIGHT = 640, 360
 FPS = 30
-BG = (8, 8, 10)
-BORDER = (30, 30, 32)
-TEXT_COLOR = (232, 232, 232)
-MUTED = (136, 136, 136)
-FAINT = (68, 68, 68)
-ACCENT = (52, 211, 153)
-RED = (255, 95, 87)
-YELLOW = (255, 189, 46)
-GREEN = (40, 200, 64)
-BAR_BG = (14, 14, 18)
-BAR_H = 36
-PADDING = 20
 LINE_H = 22
 FONT_SIZE = 14
 TITLE_SIZE = 10
-
-def get_font(size):
-    for name in ['consola.ttf', 'Consolas', 'cour.ttf']:
-        try:
-            return ImageFont.truetype(name, size)
-        except:
-            pass
-    return ImageFont.load_default()
+ROWS = viewport_rows(HEIGHT, LINE_H, BAR_H + PADDING, PADDING)
 
 font = get_font(FONT_SIZE)
 font_small = get_font(TITLE_SIZE)
+chrome = ChromeCache(font_small, bar_h=BAR_H)
+atlas = GlyphAtlas(font)
+BACKENDS = {'pillow': FrameRenderer, 'numpy': NumpyFrameRenderer, 'palette': PaletteFrameRenderer}
+
+def make_renderer(backend='pillow'):
+    return BACKENDS[backend]((WIDTH, HEIGHT), chrome, atlas, top=BAR_H + PADDING, left=PADDING,
+        line_h=LINE_H, cursor_size=(9, FONT_SIZE + 3), cursor_color=ACCENT)
+
+renderer = make_renderer()
+
+def use_backend(backend):
+    """Switch the module renderer"""
+    global renderer
+    if type(renderer) is not BACKENDS[backend]:
+        renderer = make_renderer(backend)
 
 class Terminal:
     def __init__(self):
-        self.lines = []
+        self.lines = Scrollback(ROWS)  # [(text, color), ...] per line; scrolls once the window is full
         self.title = ""
         self.cursor_visible = False
         self.cursor_col = 0
         self.cursor_line = 0
 
     def clear(self):
-        self.lines = []
+        self.lines.clear()
 
-    def render(self, frame_num):
-        img = Image.new('RGB', (WIDTH, HEIGHT), BG)
-        draw = ImageDraw.Draw(img)
-        draw.rectangle([0, 0, WIDTH-1, HEIGHT-1], outline=BORDER)
-        draw.rectangle([1, 1, WIDTH-2, BAR_H], fill=BAR_BG)
-        draw.line([1, BAR_H, WIDTH-2, BAR_H], fill=BORDER)
-        draw.ellipse([12, 12, 22, 22], fill=RED)
-        draw.ellipse([28, 12, 38, 22], fill=YELLOW)
-        draw.ellipse([44, 12, 54, 22], fill=GREEN)
-        draw.text((64, 13), self.title.upper(), fill=MUTED, font=font_small)
-
-        y = BAR_H + PADDING
-        for i, segments in enumerate(self.lines):
-            x = PADDING
-            for text, color in segments:
-                draw.text((x, y), text, fill=color, font=font)
-                bbox = font.getbbox(text)
-                x += bbox[2] - bbox[0]
-            y += LINE_H
+    def cursor_on(self, frame_num):
+        return self.cursor_visible and (frame_num // (FPS // 2)) % 2 == 0
 
+    def state(self, frame_num):
+        """Hashable snapshot of everything render() draws"""
+        return (self.title, tuple(map(tuple, self.lines.view())), self.cursor_on(frame_num),
+                self.lines.screen_row(self.cursor_line))
+
+    def render(self, frame_num):
         # Cursor blink
-        if self.cursor_visible and (frame_num // (FPS // 2)) % 2 == 0:
+        cursor = None
+        row = self.lines.screen_row(self.cursor_line) if self.cursor_on(frame_num) else None
+        if row is not None:
             # Calculate cursor x position
             cx = PADDING
             if self.cursor_line < len(self.lines):
                 for text, _ in self.lines[self.cursor_line]:
-                    bbox = font.getbbox(text)
-                    cx += bbox[2] - bbox[0]
-            cy = BAR_H + PADDING + self.cursor_line * LINE_H
-            draw.rectangle([cx, cy, cx + 8, cy + FONT_SIZE + 2], fill=ACCENT)
+                    cx += atlas.text_width(text)
+            cursor = (row, round(cx))
 
-        return img
+        # Only rows and the cursor cell that changed since the last frame are redrawn
+        return renderer.render(self.title, self.lines.view(), cursor)
 
 
-def build_frames():
+def build_frames(sink=None, on_scene=None):
+    """
+    Render the whole video; runs go to sink(frame, count) as they complete,
+    and on_scene() is called as each scene starts
+    """
     term = Terminal()
-    frames = []
+    frames = FrameRuns(sink)
+
+    def start_scene(title):
+        # The last scene's final run goes out before the next one starts
+        frames.flush()
+        if on_scene:
+            on_scene()
+        term.clear()
+        term.title = title
 
     def add_frames(n):
-        for i in range(n):
-            frames.append(term.render(len(frames)))
+        # Unchanged state is rendered once and held; only the cursor blink splits a run
+        if not term.cursor_visible:
+            frame_num = frames.total
+            frames.add(term.state(frame_num), lambda: term.render(frame_num), n)
+            return
+        for _ in range(n):
+            frame_num = frames.total
+            frames.add(term.state(frame_num), lambda: term.render(frame_num))
 
     def type_cmd(text, line_idx):
         term.cursor_visible = True
@@ -105,8 +120,7 @@ def build_frames():
         add_frames(int(ms / 1000 * FPS))
 
     # === Scene 1: Install skill ===
-    term.clear()
-    term.title = "openclaw — install"
+    start_scene("openclaw — install")
     add_frames(15)  # initial pause
 
     type_cmd('openclaw skills add hermesx402', 0)
@@ -133,8 +147,7 @@ def build_frames():
     pause(2500)
 
     # === Scene 2: Publish agent ===
-    term.clear()
-    term.title = "openclaw — publish"
+    start_scene("openclaw — publish")
     add_frames(15)
 
     type_cmd('openclaw hermes publish my-agent', 0)
@@ -160,39 +173,46 @@ def build_frames():
     add_line([('  status: ', FAINT), ('● online', ACCENT)], 4)
     pause(2500)
 
+    frames.flush()
     return frames
 
 
 def main():
-    outdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill-frames')
-    if os.path.exists(outdir):
-        shutil.rmtree(outdir)
-    os.makedirs(outdir)
-
-    frames = build_frames()
-    print(f"Rendering {len(frames)} frames...")
-    for i, frame in enumerate(frames):
-        frame.save(os.path.join(outdir, f'frame_{i:05d}.png'))
-        if i % 50 == 0:
-            print(f"  {i}/{len(frames)}")
-
-    print("Encoding video...")
+    parser = argparse.ArgumentParser(description='Render the skill install terminal video as MP4.')
+    parser.add_argument('--preview', action='store_true',
+        help=f'quick look: frames are drawn full size as usual, then resampled to {PREVIEW_FPS} fps '
+             'at half size for the fastest encode, as skill-terminal-preview.mp4')
+    parser.add_argument('--sheet', nargs='?', const='', metavar='PNG',
+        help='also write a contact sheet of each scene\'s key moments (default: the video\'s name as .png)')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='pillow',
+        help='framebuffer: Pillow images, a reused NumPy buffer handed to the encoder as YUV420, '
+             'or 8-bit palette images')
+    encode.add_arguments(parser)
+    instrument.add_arguments(parser)
+    opts = parser.parse_args()
+    if opts.backend == 'numpy' and (opts.preview or opts.sheet is not None):
+        parser.error('--preview and --sheet need Pillow frames (--backend pillow or palette)')
+    use_backend(opts.backend)
+    instrument.start(opts)
+
     outfile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill-terminal.mp4')
-    ffmpeg = r'C:\Users\Noe Mondragon\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_Microsoft.Winget.Source_8wekyb3d8bbwe\ffmpeg-8.0.1-full_build\bin\ffmpeg.exe'
-
-    subprocess.run([
-        ffmpeg, '-y',
-        '-framerate', str(FPS),
-        '-i', os.path.join(outdir, 'frame_%05d.png'),
-        '-c:v', 'libx264',
-        '-pix_fmt', 'yuv420p',
-        '-crf', '23',
-        '-preset', 'medium',
-        '-movflags', '+faststart',
-        outfile
-    ], check=True)
-
-    shutil.rmtree(outdir)
+    if opts.preview:
+        outfile = preview_path(outfile)
+    sheet = ContactSheet(FPS) if opts.sheet is not None else None
+    opener = open_preview if opts.preview else open_writer
+
+    print("Rendering + encoding preview..." if opts.preview else "Rendering + encoding video...")
+    with QueuedWriter(opener(outfile, (WIDTH, HEIGHT), FPS, pix_fmt=renderer.pix_fmt,
+                             **encode.encoder_options(opts))) as writer:
+        frames = build_frames(sink=sheet.sink(writer.write) if sheet else writer.write,
+                              on_scene=sheet.scene if sheet else None)
+    print(f"Encoded {frames.total} frames ({len(frames)} rendered)")
+
+    if sheet:
+        sheetfile = opts.sheet or os.path.splitext(outfile)[0] + '.png'
+        rows, shots = sheet.save(sheetfile)
+        print(f"Contact sheet: {sheetfile} ({shots} key moments in {rows} scenes)")
+
     size = os.path.getsize(outfile) / 1024
     print(f"Done! {outfile} ({size:.0f} KB)")
 
@@ -1,87 +1,88 @@
 """
 Render a terminal session as an MP4 video.
-Uses Pillow for frame generation, ffmpeg for encoding.
+Uses Pillow for frame generation, PyAV or ffmpeg for encoding.
 """
-import os, sys, subprocess, shutil
-from PIL import Image, ImageDraw, ImageFont
+import os, sys, math, inspect, argparse
+
+from termvideo import instrument
+from termvideo.chrome import (ACCENT, BAR_BG, BAR_H, BG, BORDER, FAINT, GREEN, MUTED, PADDING, RED,
+                              TEXT_COLOR, YELLOW, ChromeCache)
+from termvideo import encode
+from termvideo.encode import QueuedWriter, open_writer
+from termvideo.fonts import get_font
+from termvideo.frames import coalesce
+from termvideo.glyphs import GlyphAtlas
+from termvideo.npraster import NumpyFrameRenderer
+from termvideo.palette import PaletteFrameRenderer
+from termvideo.parallel import render_parallel
+from termvideo.preview import PREVIEW_FPS, ContactSheet, open_preview, preview_path
+from termvideo.raster import FrameRenderer
+from termvideo.scrollback import Scrollback, viewport_rows
+from termvideo.segcache import SegmentCache, font_id, segment_key
+from termvideo.timeline import Timeline
 
 # Config
 WIDTH, HEIGHT = 720, 420
 FPS = 30
-BG = (8, 8, 10)
-BORDER = (30, 30, 32)
-TEXT_COLOR = (232, 232, 232)
-MUTED = (136, 136, 136)
-FAINT = (68, 68, 68)
-ACCENT = (52, 211, 153)
-RED = (255, 95, 87)
-YELLOW = (255, 189, 46)
-GREEN = (40, 200, 64)
-BAR_BG = (14, 14, 18)
-BAR_H = 36
-PADDING = 20
 LINE_H = 22
 FONT_SIZE = 14
 TITLE_SIZE = 10
-
-# Find a monospace font
-def get_font(size):
-    for name in ['consola.ttf', 'Consolas', 'JetBrainsMono-Regular.ttf', 'cour.ttf']:
-        try:
-            return ImageFont.truetype(name, size)
-        except:
-            pass
-    return ImageFont.load_default()
+ROWS = viewport_rows(HEIGHT, LINE_H, BAR_H + PADDING, PADDING)
 
 font = get_font(FONT_SIZE)
 font_small = get_font(TITLE_SIZE)
+chrome = ChromeCache(font_small, bar_h=BAR_H)
+atlas = GlyphAtlas(font)
+BACKENDS = {'pillow': FrameRenderer, 'numpy': NumpyFrameRenderer, 'palette': PaletteFrameRenderer}
+
+def make_renderer(backend='pillow'):
+    """Keeps the previous frame and repaints only changed rows + the cursor cell"""
+    return BACKENDS[backend]((WIDTH, HEIGHT), chrome, atlas, top=BAR_H + PADDING, left=PADDING,
+        line_h=LINE_H, cursor_size=(9, FONT_SIZE + 3), cursor_color=ACCENT)
+
+renderer = make_renderer()
+
+def use_backend(backend):
+    """Switch the module renderer (also called in pool workers)"""
+    global renderer
+    if type(renderer) is not BACKENDS[backend]:
+        renderer = make_renderer(backend)
 
 # Terminal state
 class Terminal:
     def __init__(self):
-        self.lines = []  # list of [(text, color), ...]
+        self.lines = Scrollback(ROWS)  # [(text, color), ...] per line; scrolls once the window is full
         self.title = "hermes — browse"
         self.cursor_visible = False
         self.cursor_pos = None  # (line_idx, char_offset)
+        self.cmd2_line_idx = None  # line being typed by type_cmd2
     
     def clear(self):
-        self.lines = []
+        self.lines.clear()
+    
+    def copy(self):
+        """Independent snapshot — rows are replaced, never mutated, so a shallow copy is enough"""
+        other = Terminal()
+        other.lines = self.lines.copy()
+        other.title = self.title
+        other.cursor_visible = self.cursor_visible
+        other.cursor_pos = self.cursor_pos
+        other.cmd2_line_idx = self.cmd2_line_idx
+        return other
     
     def add_line(self, segments):
         """segments: list of (text, color) tuples"""
         self.lines.append(segments)
     
+    def cursor_on(self, frame_num):
+        """Cursor drawn this frame (blinks every half second)"""
+        return bool(self.cursor_visible and self.cursor_pos and (frame_num // (FPS // 2)) % 2 == 0)
+    
     def render(self, frame_num):
-        img = Image.new('RGB', (WIDTH, HEIGHT), BG)
-        draw = ImageDraw.Draw(img)
-        
-        # Terminal border (subtle rounded rect effect)
-        draw.rectangle([0, 0, WIDTH-1, HEIGHT-1], outline=BORDER)
-        
-        # Title bar
-        draw.rectangle([1, 1, WIDTH-2, BAR_H], fill=BAR_BG)
-        draw.line([1, BAR_H, WIDTH-2, BAR_H], fill=BORDER)
-        
-        # Traffic lights
-        draw.ellipse([12, 12, 22, 22], fill=RED)
-        draw.ellipse([28, 12, 38, 22], fill=YELLOW)
-        draw.ellipse([44, 12, 54, 22], fill=GREEN)
-        
-        # Title
-        draw.text((64, 13), self.title.upper(), fill=MUTED, font=font_small)
-        
-        # Lines
-        y = BAR_H + PADDING
-        for i, segments in enumerate(self.lines):
-            x = PADDING
-            for text, color in segments:
-                draw.text((x, y), text, fill=color, font=font)
-                bbox = font.getbbox(text)
-                x += bbox[2] - bbox[0]
-            y += LINE_H
-        
         # Cursor
-        if self.cursor_visible and self.cursor_pos and (frame_num // (FPS // 2)) % 2 == 0:
+        cursor = None
+        row = self.lines.screen_row(self.cursor_pos[0]) if self.cursor_on(frame_num) else None
+        if row is not None:
             cl, co = self.cursor_pos
             cx = PADDING
             if cl < len(self.lines):
@@ -89,13 +90,12 @@ class Terminal:
                     if co <= 0:
                         break
                     chunk = text[:co]
-                    bbox = font.getbbox(chunk)
-                    cx += bbox[2] - bbox[0]
+                    cx += atlas.text_width(chunk)
                     co -= len(chunk)
-            cy = BAR_H + PADDING + cl * LINE_H
-            draw.rectangle([cx, cy, cx + 8, cy + FONT_SIZE + 2], fill=ACCENT)
+            cursor = (row, round(cx))
         
-        return img
+        # Chrome is cached; only the visible rows that changed, and the cursor cell, get redrawn
+        return renderer.render(self.title, self.lines.view(), cursor)
 
 
 # Scene definitions — each is a sequence of actions with timing
@@ -218,102 +218,202 @@ def make_scenes():
     return scenes
 
 
-def render_scene(term, title, actions, duration_ms):
-    """Render a single scene to frames"""
-    frames = []
-    total_frames = int(duration_ms / 1000 * FPS)
-    term.clear()
+def apply_action(term, action):
+    """Apply one scene action to the terminal state"""
+    _, atype, data = action
+    
+    if atype == 'clear':
+        term.clear()
+        term.cursor_visible = False
+    elif atype == 'type_char':
+        line_idx, text, char_pos = data
+        if line_idx < len(term.lines):
+            term.lines[line_idx] = [('$ ', ACCENT), (text[2:], TEXT_COLOR)]
+        else:
+            term.lines.append([('$ ', ACCENT), (text[2:], TEXT_COLOR)])
+        term.cursor_visible = True
+        term.cursor_pos = (line_idx, len(text))
+    elif atype == 'finish_cmd':
+        term.cursor_visible = False
+    elif atype == 'type_cmd2':
+        text, char_pos = data
+        if term.cmd2_line_idx is None:
+            term.cmd2_line_idx = len(term.lines)
+            term.lines.append([('$ ', ACCENT), (text, TEXT_COLOR)])
+        else:
+            term.lines[term.cmd2_line_idx] = [('$ ', ACCENT), (text, TEXT_COLOR)]
+        term.cursor_visible = True
+        term.cursor_pos = (term.cmd2_line_idx, len('$ ' + text))
+    elif atype == 'finish_cmd2':
+        term.cursor_visible = False
+        term.cmd2_line_idx = None
+    elif atype == 'add_line':
+        if not data:
+            term.lines.append([(' ', FAINT)])
+        else:
+            term.lines.append(data)
+
+
+def compile_scene(title, actions):
+    """Timeline with keyframes, for jumping straight to any point of a scene"""
+    term = Terminal()
     term.title = title
+    return Timeline(actions, term, apply_action, Terminal.copy)
+
+
+def render_scene(title, actions, duration_ms, start_ms=0, end_ms=None):
+    """Lazily render a scene (or its [start_ms, end_ms) slice) as (frame, count) runs of identical frames"""
+    return coalesce(scene_states(title, actions, duration_ms, start_ms, end_ms))
+
+
+def scene_states(title, actions, duration_ms, start_ms=0, end_ms=None):
+    """Per-frame (state key, render, 1) for coalesce()"""
+    total_frames = int(duration_ms / 1000 * FPS)
+    first = math.ceil(start_ms * FPS / 1000)
+    last = total_frames if end_ms is None else min(total_frames, math.ceil(end_ms * FPS / 1000))
+    if first >= last:
+        return
     
-    action_idx = 0
-    cmd2_line_idx = None
+    # Seek to the first frame from the nearest keyframe, then play forward
+    term, action_idx = compile_scene(title, actions).state_at(first * 1000 / FPS)
     
-    for frame in range(total_frames):
+    for frame in range(first, last):
         current_ms = frame * 1000 / FPS
         
         # Process actions up to current time
         while action_idx < len(actions) and actions[action_idx][0] <= current_ms:
-            _, atype, data = actions[action_idx]
-            
-            if atype == 'clear':
-                term.clear()
-                term.cursor_visible = False
-            elif atype == 'type_char':
-                line_idx, text, char_pos = data
-                if line_idx < len(term.lines):
-                    term.lines[line_idx] = [('$ ', ACCENT), (text[2:], TEXT_COLOR)]
-                else:
-                    term.lines.append([('$ ', ACCENT), (text[2:], TEXT_COLOR)])
-                term.cursor_visible = True
-                term.cursor_pos = (line_idx, len(text))
-            elif atype == 'finish_cmd':
-                term.cursor_visible = False
-            elif atype == 'type_cmd2':
-                text, char_pos = data
-                if cmd2_line_idx is None:
-                    cmd2_line_idx = len(term.lines)
-                    term.lines.append([('$ ', ACCENT), (text, TEXT_COLOR)])
-                else:
-                    term.lines[cmd2_line_idx] = [('$ ', ACCENT), (text, TEXT_COLOR)]
-                term.cursor_visible = True
-                term.cursor_pos = (cmd2_line_idx, len('$ ' + text))
-            elif atype == 'finish_cmd2':
-                term.cursor_visible = False
-                cmd2_line_idx = None
-            elif atype == 'add_line':
-                if not data:
-                    term.lines.append([(' ', FAINT)])
-                else:
-                    term.lines.append(data)
-            
+            apply_action(term, actions[action_idx])
             action_idx += 1
         
-        frames.append(term.render(frame))
+        # State only changes through actions and the cursor blink
+        yield (action_idx, term.cursor_on(frame)), lambda: term.render(frame), 1
+
+
+def select_clips(scenes, scene=None, start=None, end=None):
+    """
+    Pick what to render: every scene or just one (1-based), optionally cut to
+    [start, end) seconds — relative to that scene, or to the whole video when
+    no scene is picked. Returns (title, actions, duration, start_ms, end_ms) clips.
+    """
+    if scene is not None:
+        scenes = [scenes[scene - 1]]
+    start_ms = 0 if start is None else start * 1000
+    end_ms = math.inf if end is None else end * 1000
     
-    return frames
+    clips = []
+    offset = 0
+    for title, actions, duration in scenes:
+        lo, hi = max(0, start_ms - offset), min(duration, end_ms - offset)
+        if lo < hi:
+            clips.append((title, actions, duration, lo, hi))
+        offset += int(duration / 1000 * FPS) * 1000 / FPS
+    return clips
+
+
+def render_segment(task, path):
+    """Pool worker: render one clip into its own encoded segment"""
+    (title, actions, duration, start_ms, end_ms), encoder, backend = task
+    use_backend(backend)
+    with QueuedWriter(open_writer(path, (WIDTH, HEIGHT), FPS, pix_fmt=renderer.pix_fmt, **encoder)) as writer:
+        for frame, count in render_scene(title, actions, duration, start_ms, end_ms):
+            writer.write(frame, count)
+    return writer.frames
+
+
+def clip_key(clip, backend='pillow', encoder='auto'):
+    """Content hash of one clip: its actions plus everything else that shapes its pixels"""
+    code = ''.join(inspect.getsource(obj) for obj in (Terminal, apply_action, scene_states))
+    palette = (BG, BORDER, TEXT_COLOR, MUTED, FAINT, ACCENT, RED, YELLOW, GREEN, BAR_BG)
+    geometry = (WIDTH, HEIGHT, FPS, BAR_H, PADDING, LINE_H, FONT_SIZE, TITLE_SIZE)
+    return segment_key(clip, geometry, palette, font_id(font), font_id(font_small), code, backend,
+                       encode.resolve_encoder(encoder))
 
 
 def main():
-    outdir = os.path.join(os.path.dirname(__file__), 'frames')
-    if os.path.exists(outdir):
-        shutil.rmtree(outdir)
-    os.makedirs(outdir)
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+        help='render scenes in N worker processes and stitch the segments')
+    parser.add_argument('--scene', type=int,
+        help='render only this scene (1-based)')
+    parser.add_argument('--from', dest='start', type=float,
+        help='start time in seconds (within --scene, else within the whole video)')
+    parser.add_argument('--to', dest='end', type=float,
+        help='end time in seconds')
+    parser.add_argument('--out', help='output file (default terminal.mp4, or terminal-clip.mp4 for partial renders)')
+    parser.add_argument('--no-cache', action='store_true',
+        help='encode in one pass instead of reusing unchanged scene segments from .cache/segments')
+    parser.add_argument('--preview', action='store_true',
+        help=f'quick look: frames are drawn full size as usual, then resampled to {PREVIEW_FPS} fps '
+             'at half size for the fastest encode, as terminal-preview.mp4 (one pass, no cache)')
+    parser.add_argument('--sheet', nargs='?', const='', metavar='PNG',
+        help='also write a contact sheet of each scene\'s key moments (default: the video\'s name as .png)')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='pillow',
+        help='framebuffer: Pillow images, a reused NumPy buffer handed to the encoder as YUV420, '
+             'or 8-bit palette images')
+    encode.add_arguments(parser)
+    instrument.add_arguments(parser)
+    opts = parser.parse_args()
+    if opts.backend == 'numpy' and (opts.preview or opts.sheet is not None):
+        parser.error('--preview and --sheet need Pillow frames (--backend pillow or palette)')
+    use_backend(opts.backend)
+    instrument.start(opts)
     
-    term = Terminal()
     scenes = make_scenes()
+    if opts.scene is not None and not 1 <= opts.scene <= len(scenes):
+        parser.error(f'--scene must be between 1 and {len(scenes)}')
+    clips = select_clips(scenes, opts.scene, opts.start, opts.end)
+    if not clips:
+        parser.error('nothing to render in that range')
     
-    all_frames = []
-    for title, actions, duration in scenes:
-        frames = render_scene(term, title, actions, duration)
-        all_frames.extend(frames)
-    
-    print(f"Rendering {len(all_frames)} frames...")
-    for i, frame in enumerate(all_frames):
-        frame.save(os.path.join(outdir, f'frame_{i:05d}.png'))
-        if i % 50 == 0:
-            print(f"  {i}/{len(all_frames)}")
+    partial = opts.scene is not None or opts.start is not None or opts.end is not None
+    outfile = opts.out or os.path.join(os.path.dirname(__file__), 'terminal-clip.mp4' if partial else 'terminal.mp4')
+    if opts.preview and not opts.out:
+        outfile = preview_path(outfile)
+    encoder = encode.encoder_options(opts)
+    # Previews and contact sheets see every frame, so they take the one-pass path
+    one_pass = opts.no_cache or opts.preview or opts.sheet is not None
     
-    print("Encoding video...")
-    outfile = os.path.join(os.path.dirname(__file__), 'terminal.mp4')
-    ffmpeg = r'C:\Users\Noe Mondragon\AppData\Local\Microsoft\WinGet\Packages\Gyan.FFmpeg_Microsoft.Winget.Source_8wekyb3d8bbwe\ffmpeg-8.0.1-full_build\bin\ffmpeg.exe'
+    if not one_pass:
+        # Each clip is its own segment, keyed by content; only changed ones
+        # are rendered (in parallel with --jobs), the rest come from the cache
+        cache = SegmentCache()
+        keys = [clip_key(clip, opts.backend, opts.encoder) for clip in clips]
+        print(f"Rendering {len(clips)} scenes on {opts.jobs} worker(s)...")
+        total = render_parallel(render_segment, [(clip, encoder, opts.backend) for clip in clips],
+            outfile, opts.jobs, cache=cache, keys=keys, **encoder)
+        size = os.path.getsize(outfile) / 1024
+        print(f"Done! {outfile} ({total} frames, {cache.hits} scenes cached, "
+              f"{cache.misses} rendered, {size:.0f} KB)")
+        return
     
-    subprocess.run([
-        ffmpeg, '-y',
-        '-framerate', str(FPS),
-        '-i', os.path.join(outdir, 'frame_%05d.png'),
-        '-c:v', 'libx264',
-        '-pix_fmt', 'yuv420p',
-        '-crf', '23',
-        '-preset', 'medium',
-        '-movflags', '+faststart',
-        outfile
-    ], check=True)
+    if opts.jobs > 1 and len(clips) > 1:
+        # Every scene starts with a clear, so scenes render independently
+        print(f"Rendering {len(clips)} scenes on {opts.jobs} workers...")
+        total = render_parallel(render_segment, [(clip, encoder, opts.backend) for clip in clips],
+            outfile, opts.jobs, **encoder)
+        size = os.path.getsize(outfile) / 1024
+        print(f"Done! {outfile} ({total} frames, {size:.0f} KB)")
+        return
     
-    # Cleanup
-    shutil.rmtree(outdir)
+    # Frames go straight to the encoder as each scene is rendered
+    print("Rendering + encoding preview..." if opts.preview else "Rendering + encoding video...")
+    sheet = ContactSheet(FPS) if opts.sheet is not None else None
+    opener = open_preview if opts.preview else open_writer
+    with QueuedWriter(opener(outfile, (WIDTH, HEIGHT), FPS, pix_fmt=renderer.pix_fmt, **encoder)) as writer:
+        write = sheet.sink(writer.write) if sheet else writer.write
+        for title, actions, duration, start_ms, end_ms in clips:
+            if sheet:
+                sheet.scene()
+            for frame, count in render_scene(title, actions, duration, start_ms, end_ms):
+                write(frame, count)
+            print(f"  {title}: {writer.frames} frames ({writer.unique} rendered)")
     
+    if sheet:
+        sheetfile = opts.sheet or os.path.splitext(outfile)[0] + '.png'
+        rows, shots = sheet.save(sheetfile)
+        print(f"Contact sheet: {sheetfile} ({shots} key moments in {rows} scenes)")
     size = os.path.getsize(outfile) / 1024
-    print(f"Done! {outfile} ({size:.0f} KB)")
+    print(f"Done! {outfile} ({writer.frames} frames, {writer.unique} rendered, {size:.0f} KB)")
 
 
 if __name__ == '__main__':
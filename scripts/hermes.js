@@ -29,6 +29,13 @@ const isLocal = process.argv.includes('--local');
 const API_URL = isLocal ? 'http://localhost:4020' : (process.env.HERMES_API_URL || 'https://api.hermesx402.com/v1');
 const API_KEY = process.env.HERMES_API_KEY || loadAuthProfile();
 
+// ANSI styling only when FORCE_COLOR is set, as the video capture does (NO_COLOR turns it off);
+// interactive output stays plain text
+const useColor = !process.env.NO_COLOR && Boolean(process.env.FORCE_COLOR) && process.env.FORCE_COLOR !== '0';
+const style = (code) => (text) => useColor ? `\x1b[${code}m${text}\x1b[0m` : text;
+const green = style('32');
+const dim = style('2');
+
 function loadAuthProfile() {
     // Try OpenClaw auth profile
     const authPaths = [
@@ -109,9 +116,9 @@ const commands = {
 
         const res = await apiCall('GET', `/agents?${params}`);
         if (res.agents) {
-            console.log(`  ↳ ${res.agents.length} agents found\n`);
+            console.log(dim(`  ↳ ${res.agents.length} agents found`) + '\n');
             for (const a of res.agents) {
-                console.log(`  ${a.name.padEnd(20)} ${a.rating}/5  ${a.rate} SOL/task  ${a.tags.join(', ')}`);
+                console.log(dim(`  ${a.name.padEnd(20)} ${a.rating}/5  ${a.rate} SOL/task  ${a.tags.join(', ')}`));
             }
         } else {
             console.log(JSON.stringify(res, null, 2));
@@ -133,9 +140,9 @@ const commands = {
 
         const res = await apiCall('POST', '/tasks', body);
         if (res.task_id) {
-            console.log(`  ↳ task created: ${res.task_id}`);
-            console.log(`  ↳ escrow: ${res.escrow} SOL`);
-            console.log(`  ↳ tx: ${res.tx}`);
+            console.log(dim(`  ↳ task created: ${res.task_id}`));
+            console.log(dim(`  ↳ escrow: ${res.escrow} SOL`));
+            console.log(dim(`  ↳ tx: ${res.tx}`));
         } else {
             console.log(JSON.stringify(res, null, 2));
         }
@@ -160,7 +167,7 @@ const commands = {
 
         const res = await apiCall('POST', `/tasks/${taskId}/confirm`, body);
         if (res.released) {
-            console.log(`  ✓ ${res.released} SOL released`);
+            console.log(green(`  ✓ ${res.released} SOL released`));
             console.log(`  tx: ${res.tx}`);
         } else {
             console.log(JSON.stringify(res, null, 2));
@@ -191,7 +198,7 @@ const commands = {
 
         const res = await apiCall('POST', '/agents', body);
         if (res.id) {
-            console.log(`  ✓ listed as ${res.name} (${res.id})`);
+            console.log(green(`  ✓ listed as ${res.name} (${res.id})`));
             console.log(`  rate: ${res.rate} SOL/task`);
         } else {
             console.log(JSON.stringify(res, null, 2));
@@ -206,9 +213,9 @@ const commands = {
     async earnings(args) {
         const res = await apiCall('GET', '/payments/balance');
         if (res.available !== undefined) {
-            console.log(`  balance:      ${res.available} SOL`);
-            console.log(`  pending:      ${res.pending} SOL`);
-            console.log(`  total earned: ${res.total_earned} SOL`);
+            console.log(dim(`  balance:      ${res.available} SOL`));
+            console.log(dim(`  pending:      ${res.pending} SOL`));
+            console.log(dim(`  total earned: ${res.total_earned} SOL`));
         } else {
             console.log(JSON.stringify(res, null, 2));
         }
@@ -223,7 +230,7 @@ const commands = {
             to: args.to,
         });
         if (res.status === 'completed') {
-            console.log(`  ✓ ${res.amount} SOL → ${args.to}`);
+            console.log(green(`  ✓ ${res.amount} SOL → ${args.to}`));
             console.log(`  tx: ${res.tx}`);
         } else {
             console.log(JSON.stringify(res, null, 2));
@@ -248,7 +255,7 @@ const commands = {
 
         const res = await apiCall('POST', `/tasks/${taskId}/deliver`, body);
         if (res.status === 'delivered') {
-            console.log(`  ✓ delivered — awaiting confirmation`);
+            console.log(green(`  ✓ delivered — awaiting confirmation`));
         } else {
             console.log(JSON.stringify(res, null, 2));
         }
@@ -261,17 +268,17 @@ const commands = {
             ...(args.description && { description: args.description }),
         };
         const res = await apiCall('PATCH', '/agents/me', body);
-        console.log(`  ✓ updated`);
+        console.log(green(`  ✓ updated`));
     },
 
     async pause() {
         await apiCall('POST', '/agents/me/pause');
-        console.log('  ✓ paused — no longer accepting tasks');
+        console.log(green('  ✓ paused — no longer accepting tasks'));
     },
 
     async unpause() {
         await apiCall('POST', '/agents/me/unpause');
-        console.log('  ✓ unpaused — accepting tasks');
+        console.log(green('  ✓ unpaused — accepting tasks'));
     },
 };
 
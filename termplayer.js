@@ -0,0 +1,164 @@
+/**
+ * termplayer — replays a terminal timeline as live text.
+ *
+ * Timelines come from `python render-scenes.py --format timeline`, so a page
+ * can show the terminal videos as a few KB of JSON instead of an MP4:
+ *
+ *   <div data-timeline="skill-terminal.timeline.json">
+ *     <noscript><video ...>fallback</video></noscript>
+ *   </div>
+ *   <script src="termplayer.js"></script>
+ *
+ * Every element with data-timeline is filled with a player once its timeline
+ * has loaded. If it fails to load, a <noscript> fallback inside is put on the
+ * page instead, so the MP4 is only downloaded when it is actually needed.
+ */
+(function () {
+    const BLINK_MS = 500;
+
+    function css(el, styles) {
+        Object.assign(el.style, styles);
+        return el;
+    }
+
+    function build(host, tl) {
+        const c = (i) => tl.colors[i];
+        const scale = (px) => `${px / tl.width * 100}cqw`;
+        const root = css(document.createElement('div'), {
+            containerType: 'inline-size', width: '100%', maxWidth: `${tl.width}px`,
+            aspectRatio: `${tl.width} / ${tl.height}`, background: c(tl.chrome.bg),
+            border: `1px solid ${c(tl.chrome.border)}`, borderRadius: '10px',
+            overflow: 'hidden', position: 'relative', boxSizing: 'border-box',
+        });
+        const bar = css(document.createElement('div'), {
+            height: scale(tl.bar_h), background: c(tl.chrome.bar), display: 'flex',
+            alignItems: 'center', gap: scale(6), padding: `0 ${scale(12)}`,
+            borderBottom: `1px solid ${c(tl.chrome.border)}`, boxSizing: 'border-box',
+        });
+        for (const light of tl.chrome.lights) {
+            bar.appendChild(css(document.createElement('span'), {
+                width: scale(10), height: scale(10), borderRadius: '50%', background: c(light),
+            }));
+        }
+        const title = css(document.createElement('span'), {
+            marginLeft: scale(4), color: c(tl.chrome.title), fontSize: scale(tl.title_size),
+            fontFamily: 'monospace', letterSpacing: '.05em', textTransform: 'uppercase',
+        });
+        bar.appendChild(title);
+        const body = css(document.createElement('div'), {
+            position: 'relative', padding: `${scale(tl.padding)} ${scale(tl.padding)} 0`,
+            fontFamily: 'Consolas, "JetBrains Mono", Menlo, monospace', fontSize: scale(tl.font_size),
+            lineHeight: scale(tl.line_height), whiteSpace: 'pre',
+        });
+        const rows = [];
+        for (let i = 0; i < tl.rows; i++) {
+            const row = css(document.createElement('div'), { height: scale(tl.line_height), position: 'relative' });
+            rows.push(row);
+            body.appendChild(row);
+        }
+        const cursor = css(document.createElement('span'), {
+            position: 'absolute', display: 'none', width: scale(tl.cursor[0]), height: scale(tl.cursor[1]),
+            top: `calc((${scale(tl.line_height)} - ${scale(tl.cursor[1])}) / 2)`, background: c(tl.chrome.cursor),
+        });
+        root.append(bar, body);
+        host.replaceChildren(root);
+        return { title, rows, cursor, c };
+    }
+
+    function play(host, tl) {
+        const view = build(host, tl);
+        let lines = [], cursor = null, scene = 0, event = 0, timer = null, blink = null;
+
+        function draw() {
+            const top = Math.max(lines.length - tl.rows, 0);
+            view.rows.forEach((row, i) => {
+                const segs = lines[top + i] || [];
+                row.replaceChildren(...segs.map(([text, color]) => {
+                    const span = document.createElement('span');
+                    span.textContent = text;
+                    span.style.color = view.c(color);
+                    return span;
+                }));
+            });
+            clearInterval(blink);
+            view.cursor.style.visibility = '';
+            const r = cursor && cursor[0] - top;
+            if (cursor && r >= 0 && r < tl.rows) {
+                view.cursor.style.left = `${cursor[1]}ch`;
+                view.cursor.style.display = '';
+                view.rows[r].appendChild(view.cursor);
+                blink = setInterval(() => {
+                    view.cursor.style.visibility = view.cursor.style.visibility ? '' : 'hidden';
+                }, BLINK_MS);
+            } else {
+                view.cursor.style.display = 'none';
+            }
+        }
+
+        function apply(ev) {
+            const [, op, a, b] = ev;
+            if (op === 'c') { lines = []; cursor = null; }
+            else if (op === 'a') lines.push(a);
+            else if (op === 's') lines[a] = b;
+            else if (op === 'x') {
+                const line = (lines[a] || []).slice();
+                for (const [text, color] of b) {
+                    const last = line[line.length - 1];
+                    if (last && last[1] === color) line[line.length - 1] = [last[0] + text, color];
+                    else line.push([text, color]);
+                }
+                lines[a] = line;
+            }
+            else if (op === 'k') cursor = ev.length > 2 ? [a, b] : null;
+        }
+
+        function startScene() {
+            view.title.textContent = tl.scenes[scene].title;
+            lines = [];
+            cursor = null;
+            event = 0;
+            draw();
+            next();
+        }
+
+        function next() {
+            const s = tl.scenes[scene];
+            if (event < s.events.length) {
+                timer = setTimeout(step, s.events[event][0]);
+                return;
+            }
+            const elapsed = s.events.reduce((t, ev) => t + ev[0], 0);
+            timer = setTimeout(() => {
+                scene = (scene + 1) % tl.scenes.length;
+                startScene();
+            }, Math.max(s.duration - elapsed, 0));
+        }
+
+        function step() {
+            const s = tl.scenes[scene];
+            // Everything due at the same time lands in one redraw
+            do apply(s.events[event++]);
+            while (event < s.events.length && s.events[event][0] === 0);
+            draw();
+            next();
+        }
+
+        startScene();
+        return () => { clearTimeout(timer); clearInterval(blink); };
+    }
+
+    function load(host, url) {
+        return fetch(url)
+            .then((res) => { if (!res.ok) throw new Error(`${url}: ${res.status}`); return res.json(); })
+            .then((tl) => play(host, tl));
+    }
+
+    window.TermPlayer = { load, play };
+    for (const host of document.querySelectorAll('[data-timeline]')) {
+        load(host, host.dataset.timeline).catch((err) => {
+            console.warn('termplayer:', err.message);
+            const fallback = host.querySelector('noscript');
+            if (fallback) fallback.outerHTML = fallback.textContent;
+        });
+    }
+})();
@@ -0,0 +1,4 @@
+"""
+Shared helpers for the terminal video scripts
+(render-terminal.py, render-skill-terminal.py, record-session.py, record-skill.py).
+"""
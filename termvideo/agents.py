@@ -0,0 +1,120 @@
+"""
+Per-agent demo videos from one scene-file template.
+
+A template is a scene file whose strings name agent fields with str.format
+syntax — "hermes hire {name}", "{rate} SOL/task", "{name:<20}" — and whose
+output names one file per agent, e.g. "../../agents/{id}.mp4". Literal
+braces are doubled. Besides the listing's own fields there are `tag` (the
+first tag), `summary` (the description's first sentence), `task` (a short
+task for it), `task_id` and `n` (the agent's place in the batch).
+
+Agents are listings as the API returns them (the mock API's `agents`,
+`GET /agents`), or rows of the server's agents table. Scenes that use no
+agent fields come out the same for every agent, so the segment cache
+renders them once for the whole batch.
+"""
+import os, json, sqlite3, subprocess
+
+from . import scenefile
+from .hermes import ROOT
+
+MOCK_API = os.path.join(ROOT, 'mock-api.js')
+
+# Prints the agents mock-api.js exports; required as a module, it starts no server
+_READ_MOCK = 'console.log(JSON.stringify(require(process.argv[1]).agents))'
+
+
+def mock_agents(path=MOCK_API):
+    """The agents listed in mock-api.js"""
+    result = subprocess.run(['node', '-e', _READ_MOCK, os.path.abspath(path)],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def db_agents(path):
+    """Rows of the server's agents table (server/db.js), as listings"""
+    with sqlite3.connect(path) as db:
+        db.row_factory = sqlite3.Row
+        return [dict(row) for row in db.execute('SELECT * FROM agents ORDER BY id')]
+
+
+def load_agents(path=None):
+    """Agents from a JSON list (or a {"agents": [...]} API response), a SQLite db, or the mock API"""
+    if path is None:
+        return mock_agents()
+    if path.endswith('.db'):
+        return db_agents(path)
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return data['agents'] if isinstance(data, dict) else data
+
+
+_DANGLING = {'and', 'or', 'of', 'on', 'to', 'for', 'with', 'the', 'a', '—', '-'}
+
+
+def _words(text, width):
+    """text cut to at most width characters, at a word boundary"""
+    if len(text) <= width:
+        return text
+    words = text[:width + 1].split(' ')[:-1]
+    while words and words[-1] in _DANGLING:
+        words.pop()
+    return ' '.join(words).rstrip(',;:')
+
+
+def fields(agent, n=1):
+    """Template fields for one agent; n is its 1-based place in the batch"""
+    tags = agent.get('tags') or []
+    if isinstance(tags, str):  # the db stores them as a JSON list
+        tags = json.loads(tags)
+    summary = (agent.get('description') or '').split('. ')[0].rstrip('.')
+    out = dict(tasks_completed=0, success_rate=100)
+    out.update(agent)
+    out.update(
+        id=str(agent.get('id', n)),
+        name=agent['name'],
+        tags=', '.join(tags),
+        tag=tags[0] if tags else 'agents',
+        rate=agent.get('rate', agent.get('price_sol')),
+        rating=agent.get('rating', 'new'),
+        summary=_words(summary, 64),
+        task=agent.get('task') or _words(summary.lower(), 40) or 'a task',
+        task_id=f'task-0x{n:04x}',
+        n=n,
+    )
+    return out
+
+
+def _fill(value, values, where):
+    if isinstance(value, str):
+        try:
+            return value.format_map(values)
+        except KeyError as e:
+            raise ValueError(f'{where}: unknown agent field {e.args[0]!r}') from None
+    if isinstance(value, list):
+        return [_fill(v, values, where) for v in value]
+    if isinstance(value, dict):
+        return {k: _fill(v, values, where) for k, v in value.items()}
+    return value
+
+
+def load_template(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def agent_spec(template, path, agent, n=1):
+    """The scene-file spec for one agent, from template data read from path"""
+    return scenefile.parse(_fill(template, fields(agent, n), path), path)
+
+
+def variants(agents, count):
+    """`count` agents, cycling through the list with numbered names past the first pass (for load runs)"""
+    out = []
+    for i in range(count):
+        agent = dict(agents[i % len(agents)])
+        if i >= len(agents):
+            suffix = i // len(agents) + 1
+            agent.update(id=f"{agent.get('id', i)}-{suffix}", name=f"{agent['name']}-{suffix}")
+        out.append(agent)
+    return out
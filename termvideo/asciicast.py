@@ -0,0 +1,248 @@
+"""
+asciicast v2 transcripts (https://docs.asciinema.org/manual/asciicast/v2/).
+
+save() writes compiled scenes as a cast: a JSON header line, then one
+[time, "o", data] line per screen change, with colors as 24-bit SGR codes
+and each scene starting with an OSC 2 window title and a cleared screen.
+Recorder writes a live session's raw terminal output the same way.
+load() reads any asciicast back — ours or one recorded elsewhere — through a
+terminal emulator (vt.py) into the same screen events, so the BatchRenderer can
+re-render a session without Node or the mock API in the loop.
+"""
+import json, math, os
+
+from .chrome import BAR_H, PADDING
+from .fonts import get_font
+from .scenefile import DEFAULTS
+from .screen import Screen
+from .scrollback import viewport_rows
+from .vt import Grid, Parser, sgr
+
+# Window geometry kept in our own header key; other players ignore it
+GEOMETRY = ('width', 'height', 'fps', 'font_size', 'title_size', 'line_height', 'cursor', 'prompt_color')
+
+
+def _cells(segments):
+    return [(ch, color) for text, color in segments for ch in text]
+
+
+def _group(cells):
+    """[(ch, color), ...] -> tuple of (text, color) runs"""
+    segs = []
+    for ch, color in cells:
+        if segs and segs[-1][1] == color:
+            segs[-1][0] += ch
+        else:
+            segs.append([ch, color])
+    return tuple((text, color) for text, color in segs)
+
+
+class _Writer:
+    """Turns successive Screen states into minimal ANSI output."""
+
+    def __init__(self):
+        self.rows = []
+        self.pos = (0, 0)
+        self.visible = True
+
+    def reset(self, title):
+        self.rows = []
+        self.pos = (0, 0)
+        self.visible = False
+        return f'\x1b]2;{title}\x07\x1b[0m\x1b[2J\x1b[H\x1b[?25l'
+
+    def clear(self):
+        """A cleared screen mid-scene; rows that go away are never written over otherwise"""
+        if not self.rows:
+            return ''
+        self.rows = []
+        self.pos = (0, 0)
+        return '\x1b[2J\x1b[H'
+
+    def _move(self, row, col):
+        if (row, col) == self.pos:
+            return ''
+        self.pos = (row, col)
+        return f'\x1b[{row + 1};{col + 1}H'
+
+    def _print(self, segments):
+        out = ''.join(sgr(color) + text for text, color in _group(_cells(segments)))
+        return out + '\x1b[0m' if out else ''
+
+    def update(self, lines, cursor, scroll=0):
+        """lines: the window's rows; scroll: how many lines the window moved up since the last update"""
+        out = []
+        if scroll > 0 and self.rows:
+            # Let the terminal scroll from its bottom row instead of repainting every row
+            last = len(self.rows) - 1
+            out.append(('\r' if self.pos[0] == last else self._move(last, 0)) + '\n' * scroll)
+            self.rows = self.rows[scroll:] + [[] for _ in range(min(scroll, len(self.rows)))]
+            self.pos = (last, 0)
+        for i, segs in enumerate(lines):
+            cells = _cells(segs)
+            old = self.rows[i] if i < len(self.rows) else None
+            if cells == old:
+                continue
+            if old is not None and self.pos == (i, len(old)) and cells[:len(old)] == old:
+                # Typing: the row grew at the cursor, print just the new tail
+                out.append(self._print(_group(cells[len(old):])))
+            elif old is None and i == len(self.rows) and i > 0 and self.pos[0] == i - 1:
+                out.append('\r\n' + self._print(segs))
+            else:
+                out.append(self._move(i, 0) + '\x1b[2K' + self._print(segs))
+            self.pos = (i, len(cells))
+            if i < len(self.rows):
+                self.rows[i] = cells
+            else:
+                self.rows.extend([[]] * (i - len(self.rows)) + [cells])
+        if cursor is not None:
+            out.append(self._move(*cursor))
+            if not self.visible:
+                out.append('\x1b[?25h')
+                self.visible = True
+        elif self.visible:
+            out.append('\x1b[?25l')
+            self.visible = False
+        return ''.join(out)
+
+
+def header(spec, title=None):
+    """asciicast header for a scene-file spec"""
+    font = get_font(spec['font_size'])
+    cols = int((spec['width'] - 2 * PADDING) // font.getlength('M'))
+    rows = screen_rows(spec)
+    head = {'version': 2, 'width': cols, 'height': rows,
+            'env': {'TERM': 'xterm-256color'},
+            'termvideo': {k: spec[k] for k in GEOMETRY}}
+    if title:
+        head['title'] = title
+    return head
+
+
+def screen_rows(spec):
+    return viewport_rows(spec['height'], spec['line_height'], BAR_H + PADDING, PADDING)
+
+
+def save(path, spec, scenes):
+    """Write compiled scenes [(title, events, duration_ms), ...] as an asciicast"""
+    writer = _Writer()
+    offset = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(header(spec, scenes[0][0] if scenes else None), ensure_ascii=False) + '\n')
+
+        def emit(ms, data):
+            if data:
+                f.write(json.dumps([round((offset + ms) / 1000, 6), 'o', data], ensure_ascii=False) + '\n')
+
+        for title, events, duration in scenes:
+            screen = Screen(title, screen_rows(spec))
+            emit(0, writer.reset(title))
+            top = i = 0
+            while i < len(events):
+                t = events[i][0]
+                cleared = False
+                while i < len(events) and events[i][0] == t:
+                    cleared = cleared or events[i][1] == 'clear'
+                    screen.apply(events[i])
+                    i += 1
+                data = ''
+                if cleared:
+                    data, top = writer.clear(), 0
+                emit(t, data + writer.update(*screen.view(), scroll=screen.lines.top - top))
+                top = screen.lines.top
+            offset += duration
+        # An empty event marks where the last scene's final hold ends
+        f.write(json.dumps([round(offset / 1000, 6), 'o', '']) + '\n')
+
+
+class Recorder:
+    """Raw terminal output written to an asciicast as it arrives"""
+
+    def __init__(self, path, spec, title=None):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write(json.dumps(header(spec, title), ensure_ascii=False) + '\n')
+
+    def write(self, ms, data):
+        self.file.write(json.dumps([round(ms / 1000, 6), 'o', data], ensure_ascii=False) + '\n')
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load(path):
+    """
+    Read an asciicast v2 file into a renderable spec: scene-file geometry plus
+    'compiled', a list of (title, events, duration_ms) split at title changes.
+    """
+    with open(path, encoding='utf-8') as f:
+        head = json.loads(f.readline())
+        if head.get('version') != 2:
+            raise ValueError(f'{path}: not an asciicast v2 file')
+        records = [json.loads(line) for line in f if line.strip()]
+
+    spec = dict(DEFAULTS)
+    spec.update(head.get('termvideo', {}))
+    if 'termvideo' not in head:
+        # Size the window to the recorded terminal
+        font = get_font(spec['font_size'])
+        spec['width'] = 2 * PADDING + math.ceil(head['width'] * font.getlength('M'))
+        spec['height'] = BAR_H + 2 * PADDING + head['height'] * spec['line_height']
+    spec['path'] = os.path.abspath(path)
+    spec['output'] = os.path.splitext(spec['path'])[0] + '.mp4'
+    spec['scenes'] = []
+
+    title = head.get('title') or os.path.splitext(os.path.basename(path))[0]
+    scrolled_off = []
+    grid = Grid(head['width'], head['height'], scrollback=scrolled_off)
+    term = Parser(grid, title=title)
+    scenes, events, rows, cursor, start = [], [], [], None, 0
+    clears = 0
+    for t, kind, data in records:
+        if kind != 'o':
+            continue
+        new_title = term.feed(data)
+        if new_title is not None and new_title != title:
+            # A window title change starts the next scene
+            if events:
+                scenes.append((title, events, (t - start) * 1000))
+                start, events, rows, cursor = t, [], [], None
+            title = new_title
+        ms = (t - start) * 1000
+        if grid.clears != clears:
+            clears = grid.clears
+            if rows:
+                events.append((ms, 'clear', None))
+                rows, cursor = [], None
+        # Lines are numbered from the last clear; ones that scrolled off since
+        # the previous record still get their final contents
+        base = grid.scrolled - len(scrolled_off)
+        lines = scrolled_off + grid.lines()
+        scrolled_off.clear()
+        if base > len(rows):
+            # A scene that starts scrolled: what is above the window is gone, pad it
+            lines = [()] * (base - len(rows)) + lines
+            base = len(rows)
+        # Rows erased below the output (ED 0) stay on screen as blank lines
+        lines += [()] * (len(rows) - base - len(lines))
+        for i, segs in enumerate(lines, base):
+            if i >= len(rows):
+                events.append((ms, 'append', segs))
+            elif segs != rows[i]:
+                events.append((ms, 'set', (i, segs)))
+        rows[base:] = lines
+        at = term.cursor()
+        at = at and (grid.scrolled + at[0], at[1])
+        if at != cursor:
+            cursor = at
+            events.append((ms, 'cursor', cursor))
+    end = records[-1][0] if records else 0
+    if events or not scenes:
+        scenes.append((title, events, (end - start) * 1000))
+    spec['compiled'] = scenes
+    return spec
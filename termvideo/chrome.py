@@ -0,0 +1,70 @@
+"""
+Window chrome for terminal frames: border, title bar, separator,
+traffic lights and title. The chrome only changes between scenes, so it is
+drawn once per (size, title) and every frame starts as a copy of it.
+"""
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw
+
+# Palette and window layout shared by the video scripts and renderers
+BG = (8, 8, 10)
+BORDER = (30, 30, 32)
+TEXT_COLOR = (232, 232, 232)
+MUTED = (136, 136, 136)
+FAINT = (68, 68, 68)
+ACCENT = (52, 211, 153)
+RED = (255, 95, 87)
+YELLOW = (255, 189, 46)
+GREEN = (40, 200, 64)
+BAR_BG = (14, 14, 18)
+BAR_H = 36
+PADDING = 20
+
+
+class ChromeCache:
+    """Pre-rendered window backgrounds keyed by (size, title)."""
+
+    def __init__(self, font, bar_h=BAR_H, maxsize=32):
+        self.font = font
+        self.bar_h = bar_h
+        self.maxsize = maxsize
+        self._layers = OrderedDict()
+
+    def layer(self, size, title):
+        """Shared background image — copy it before drawing on it."""
+        key = (size, title)
+        img = self._layers.get(key)
+        if img is None:
+            img = self._draw(size, title)
+            self._layers[key] = img
+            if len(self._layers) > self.maxsize:
+                self._layers.popitem(last=False)
+        else:
+            self._layers.move_to_end(key)
+        return img
+
+    def frame(self, size, title):
+        """A fresh frame with the chrome already drawn."""
+        return self.layer(size, title).copy()
+
+    def _draw(self, size, title):
+        width, height = size
+        img = Image.new('RGB', size, BG)
+        draw = ImageDraw.Draw(img)
+
+        # Terminal border
+        draw.rectangle([0, 0, width-1, height-1], outline=BORDER)
+
+        # Title bar
+        draw.rectangle([1, 1, width-2, self.bar_h], fill=BAR_BG)
+        draw.line([1, self.bar_h, width-2, self.bar_h], fill=BORDER)
+
+        # Traffic lights
+        draw.ellipse([12, 12, 22, 22], fill=RED)
+        draw.ellipse([28, 12, 38, 22], fill=YELLOW)
+        draw.ellipse([44, 12, 54, 22], fill=GREEN)
+
+        # Title
+        draw.text((64, 13), title.upper(), fill=MUTED, font=self.font)
+        return img
@@ -0,0 +1,437 @@
+"""
+Frame output for the terminal video scripts.
+Frames (RGB or palette images, or planar YUV420 buffers from the NumPy
+backend) are encoded as they are rendered — in-process through PyAV (libav)
+when it is installed, otherwise by streaming them into an ffmpeg subprocess
+found on PATH — so there is no PNG spool directory and no PNG encode/decode
+round trip. The output file's extension picks the format: H.264 MP4, VP9
+WebM, GIF or APNG. open_writer() chooses the encoder.
+"""
+import os, queue, shutil, struct, threading, subprocess
+from fractions import Fraction
+
+try:
+    import av
+except ImportError:  # optional: without PyAV, encoding goes through the ffmpeg binary
+    av = None
+
+FORMATS = ('mp4', 'webm', 'gif', 'apng')
+ENCODERS = ('auto', 'pyav', 'ffmpeg')
+
+
+def find_ffmpeg(ffmpeg=None):
+    """Path of the ffmpeg binary — the one given, $FFMPEG, or ffmpeg on PATH — or None"""
+    for candidate in (ffmpeg, os.environ.get('FFMPEG'), 'ffmpeg'):
+        path = candidate and shutil.which(candidate)
+        if path:
+            return path
+    return None
+
+
+def codec_args(outfile, pix_fmt, fps, crf=None, preset='medium'):
+    """ffmpeg output options for the format named by outfile's extension"""
+    ext = os.path.splitext(outfile)[1].lower()
+    if ext == '.webm':
+        return ['-c:v', 'libvpx-vp9', '-pix_fmt', 'yuv420p', '-crf', str(32 if crf is None else crf),
+                '-b:v', '0', '-row-mt', '1', '-cpu-used', '4']
+    if ext == '.gif':
+        # Palette frames are written as they are; anything else gets a palette made for it
+        args = ['-c:v', 'gif', '-loop', '0']
+        if pix_fmt != 'pal8':
+            args = ['-vf', 'split[a][b];[a]palettegen=stats_mode=full[p];[b][p]paletteuse=dither=none'] + args
+        return args
+    if ext in ('.apng', '.png'):
+        # The muxer gives the last frame the previous one's delay unless told otherwise
+        return ['-c:v', 'apng', '-plays', '0', '-final_delay', str(1 / Fraction(fps)), '-f', 'apng']
+    # No B-frames, as in av_codec(): held frames arrive as VFR
+    return ['-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-crf', str(23 if crf is None else crf),
+            '-preset', preset, '-bf', '0', '-movflags', '+faststart']
+
+
+def av_codec(outfile, pix_fmt, fps, crf=None, preset='medium'):
+    """codec_args() for PyAV: (container format, container options, codec, codec options, pix_fmt)"""
+    ext = os.path.splitext(outfile)[1].lower()
+    if ext == '.webm':
+        return 'webm', {}, 'libvpx-vp9', {'crf': str(32 if crf is None else crf), 'b': '0',
+                                          'row-mt': '1', 'cpu-used': '4'}, 'yuv420p'
+    if ext == '.gif':
+        return 'gif', {'loop': '0'}, 'gif', {}, 'pal8'
+    if ext in ('.apng', '.png'):
+        # The muxer gives the last frame the previous one's delay unless told otherwise
+        return 'apng', {'plays': '0', 'final_delay': f'1/{fps}'}, 'apng', {}, \
+            'pal8' if pix_fmt == 'pal8' else 'rgb24'
+    # No B-frames: x264 derives DTS from the input order, which for held (VFR) frames
+    # would leave the MP4 track ending at the last frame's DTS, far before its PTS
+    return 'mp4', {'movflags': '+faststart'}, 'libx264', {'crf': str(23 if crf is None else crf),
+                                                           'preset': preset, 'bf': '0'}, 'yuv420p'
+
+
+# Just enough Matroska to hand ffmpeg timestamped raw frames over a pipe
+_UNKNOWN_SIZE = b'\x01\xff\xff\xff\xff\xff\xff\xff'
+_FOURCC = {'rgb24': b'RGB\x18', 'yuv420p': b'I420', 'pal8': b'PAL\x08'}
+
+
+def _ebml_size(n):
+    return b'\x01' + n.to_bytes(7, 'big')
+
+
+def _ebml(element_id, data):
+    return element_id + _ebml_size(len(data)) + data
+
+
+def _ebml_uint(element_id, n):
+    return _ebml(element_id, n.to_bytes(max(1, (n.bit_length() + 7) // 8), 'big'))
+
+
+def _mkv_header(size, pix_fmt):
+    """EBML header, a Segment of unknown length, millisecond timestamps and one raw video track"""
+    width, height = size
+    ebml = (_ebml_uint(b'\x42\x86', 1) + _ebml_uint(b'\x42\xf7', 1) + _ebml_uint(b'\x42\xf2', 4) +
+            _ebml_uint(b'\x42\xf3', 8) + _ebml(b'\x42\x82', b'matroska') + _ebml_uint(b'\x42\x87', 4) +
+            _ebml_uint(b'\x42\x85', 2))
+    video = _ebml_uint(b'\xb0', width) + _ebml_uint(b'\xba', height) + _ebml(b'\x2e\xb5\x24', _FOURCC[pix_fmt])
+    track = (_ebml_uint(b'\xd7', 1) + _ebml_uint(b'\x73\xc5', 1) + _ebml_uint(b'\x83', 1) +
+             _ebml(b'\x86', b'V_UNCOMPRESSED') + _ebml(b'\xe0', video))
+    return (_ebml(b'\x1a\x45\xdf\xa3', ebml) + b'\x18\x53\x80\x67' + _UNKNOWN_SIZE +
+            _ebml(b'\x15\x49\xa9\x66', _ebml_uint(b'\x2a\xd7\xb1', 1000000)) +
+            _ebml(b'\x16\x54\xae\x6b', _ebml(b'\xae', track)))
+
+
+def _mkv_frame(ms, nbytes):
+    """Everything before a frame's bytes: a Cluster at `ms` holding one keyframe SimpleBlock"""
+    block = b'\xa3' + _ebml_size(nbytes + 4) + b'\x81\x00\x00\x80'
+    timestamp = _ebml_uint(b'\xe7', ms)
+    return b'\x1f\x43\xb6\x75' + _ebml_size(len(timestamp) + len(block) + nbytes) + timestamp + block
+
+
+class FFmpegWriter:
+    """
+    Encode frames to a video file as they are produced, through an ffmpeg
+    subprocess. Frames go down the pipe as timestamped raw video in a bare
+    Matroska stream, each held frame once, and ffmpeg encodes them as VFR.
+    """
+
+    def __init__(self, outfile, size, fps, ffmpeg='ffmpeg', crf=None, preset='medium', pix_fmt='rgb24'):
+        if pix_fmt not in ('rgb24', 'yuv420p', 'pal8'):
+            raise ValueError(f'unsupported input pix_fmt {pix_fmt!r}')
+        self.outfile = outfile
+        self.size = size
+        self.pix_fmt = pix_fmt
+        self.frames = 0
+        self.unique = 0
+        width, height = size
+        self.frame_bytes = {'rgb24': width * height * 3, 'yuv420p': width * height * 3 // 2,
+                            'pal8': width * height}[pix_fmt]
+        self.fps = Fraction(fps)
+        self._palettes = {}
+        self._held = None  # the last frame's bytes while its run is longer than one frame
+        self.proc = subprocess.Popen([
+            ffmpeg, '-y', '-hide_banner', '-loglevel', 'error',
+            '-f', 'matroska', '-i', '-',
+            '-fps_mode', 'vfr', '-enc_time_base', str(1 / self.fps),
+        ] + codec_args(outfile, pix_fmt, fps, crf, preset) + [outfile], stdin=subprocess.PIPE)
+        self.proc.stdin.write(_mkv_header(size, pix_fmt))
+
+    def _palette(self, frame):
+        """A 'P' frame's palette as the 1024 bytes ffmpeg expects after each pal8 frame"""
+        raw = frame.palette.tobytes()
+        data = self._palettes.get(raw)
+        if data is None:
+            rgb = frame.getpalette('RGB') or []
+            rgb += [0] * (768 - len(rgb))
+            data = self._palettes[raw] = b''.join(
+                struct.pack('=I', 0xff000000 | rgb[i] << 16 | rgb[i + 1] << 8 | rgb[i + 2])
+                for i in range(0, 768, 3))
+        return data
+
+    def write(self, frame, count=1):
+        """
+        frame: PIL RGB image of exactly `size` (rgb24), a 'P' image (pal8),
+        or a buffer holding the I420 planes (yuv420p), shown for `count` frames.
+        A held frame is sent and encoded once, at its first frame's timestamp.
+        """
+        if self.pix_fmt in ('rgb24', 'pal8'):
+            mode = 'RGB' if self.pix_fmt == 'rgb24' else 'P'
+            if frame.size != self.size or frame.mode != mode:
+                raise ValueError(f'expected {mode} frame of {self.size}, got {frame.mode} {frame.size}')
+            data = frame.tobytes()
+            if mode == 'P':
+                data += self._palette(frame)
+        else:
+            data = memoryview(frame).cast('B')
+            if data.nbytes != self.frame_bytes:
+                raise ValueError(f'expected {self.frame_bytes} bytes of yuv420p, got {data.nbytes}')
+        self._send(self.frames, data)
+        # The yuv420p buffer is reused for the next frame
+        self._held = bytes(data) if count > 1 else None
+        self.frames += count
+        self.unique += 1
+
+    def _send(self, frame_num, data):
+        self.proc.stdin.write(_mkv_frame(round(frame_num * 1000 / self.fps), len(data)))
+        self.proc.stdin.write(data)
+
+    def close(self):
+        # A VFR stream ends at its last frame's timestamp; show that frame
+        # again on the last tick so the final run keeps its full length
+        if self._held is not None:
+            self._send(self.frames - 1, self._held)
+        self.proc.stdin.close()
+        if self.proc.wait() != 0:
+            raise subprocess.CalledProcessError(self.proc.returncode, self.proc.args)
+
+    def abort(self):
+        self.proc.kill()
+        self.proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class PyAVWriter:
+    """
+    Encode frames in-process with PyAV; same interface as FFmpegWriter.
+    Frames carry their own timestamps, so a held frame is encoded once and
+    lasts `count` frames instead of being repeated, and a keyframe is forced
+    every `keyint` seconds of video however few frames that spans.
+    """
+
+    def __init__(self, outfile, size, fps, crf=None, preset='medium', pix_fmt='rgb24', keyint=5):
+        if av is None:
+            raise RuntimeError('PyAV is not installed (pip install av)')
+        if pix_fmt not in ('rgb24', 'yuv420p', 'pal8'):
+            raise ValueError(f'unsupported input pix_fmt {pix_fmt!r}')
+        self.outfile = outfile
+        self.size = size
+        self.pix_fmt = pix_fmt
+        self.keyint = keyint * fps
+        self.frames = 0
+        self.unique = 0
+        self._last = None
+        self._key_at = None
+        self._palette = None
+        fmt, options, codec, codec_options, out_fmt = av_codec(outfile, pix_fmt, fps, crf, preset)
+        self.container = av.open(outfile, 'w', format=fmt, options=options)
+        self.stream = self.container.add_stream(codec, rate=fps, options=codec_options)
+        self.stream.width, self.stream.height = size
+        self.stream.pix_fmt = out_fmt
+        self.stream.codec_context.time_base = Fraction(1, fps)
+
+    def _frame(self, frame):
+        import numpy as np
+        if self.pix_fmt == 'yuv420p':
+            width, height = self.size
+            data = np.frombuffer(memoryview(frame).cast('B'), np.uint8)
+            if data.nbytes != width * height * 3 // 2:
+                raise ValueError(f'expected {width * height * 3 // 2} bytes of yuv420p, got {data.nbytes}')
+            vf = av.VideoFrame.from_ndarray(data.reshape(height * 3 // 2, width), format='yuv420p')
+            if self.stream.pix_fmt != 'pal8':
+                return vf
+            frame = vf.to_image()
+        else:
+            mode = 'RGB' if self.pix_fmt == 'rgb24' else 'P'
+            if frame.size != self.size or frame.mode != mode:
+                raise ValueError(f'expected {mode} frame of {self.size}, got {frame.mode} {frame.size}')
+            if self.stream.pix_fmt != 'pal8':
+                return av.VideoFrame.from_image(frame)
+        if frame.mode != 'P':
+            # No palettegen pass in-process: the first frame's palette is kept for the
+            # rest, so unchanged pixels keep their indices and GIF can skip them
+            from PIL import Image
+            if self._palette is None:
+                self._palette = frame.quantize(256, dither=Image.Dither.NONE)
+            frame = frame.quantize(palette=self._palette, dither=Image.Dither.NONE)
+        # Palette frames go in as they are, as ffmpeg's pal8 input does
+        argb = np.zeros((256, 4), np.uint8)
+        rgb = np.frombuffer(bytes(frame.getpalette('RGB')), np.uint8).reshape(-1, 3)[:256]
+        argb[:, 0] = 255
+        argb[:len(rgb), 1:] = rgb
+        return av.VideoFrame.from_ndarray((np.asarray(frame), argb), format='pal8')
+
+    def _encode(self, vf, pts, duration):
+        vf.pts = pts
+        vf.duration = duration
+        vf.time_base = self.stream.codec_context.time_base
+        if self._key_at is None or pts - self._key_at >= self.keyint:
+            vf.pict_type = av.video.frame.PictureType.I
+            self._key_at = pts
+        for packet in self.stream.encode(vf):
+            self.container.mux(packet)
+
+    def write(self, frame, count=1):
+        """frame as for FFmpegWriter.write(), shown for `count` frames"""
+        vf = self._frame(frame)
+        self._encode(vf, self.frames, count)
+        self._last = (vf, count)
+        self.frames += count
+        self.unique += 1
+
+    def close(self):
+        if self._last is not None and self._last[1] > 1:
+            # Not every muxer keeps the last frame's duration, so a held one is sent again at the end
+            self._last[0].pict_type = av.video.frame.PictureType.NONE
+            self._encode(self._last[0], self.frames - 1, 1)
+        for packet in self.stream.encode():
+            self.container.mux(packet)
+        self.container.close()
+
+    def abort(self):
+        self.container.close()
+        try:
+            os.remove(self.outfile)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def resolve_encoder(encoder='auto'):
+    """'pyav' or 'ffmpeg': which one `encoder` means here ('auto' prefers PyAV when it is installed)"""
+    if encoder not in ENCODERS:
+        raise ValueError(f'unknown encoder {encoder!r}')
+    if encoder == 'auto':
+        return 'ffmpeg' if av is None else 'pyav'
+    return encoder
+
+
+def open_writer(outfile, size, fps, encoder='auto', ffmpeg=None, **kwargs):
+    """
+    A frame writer for outfile: in-process PyAV, or an ffmpeg subprocess
+    using find_ffmpeg(ffmpeg); see resolve_encoder().
+    """
+    if resolve_encoder(encoder) == 'pyav':
+        return PyAVWriter(outfile, size, fps, **kwargs)
+    path = find_ffmpeg(ffmpeg)
+    if path is None:
+        raise RuntimeError('no video encoder: install PyAV (pip install av) or put ffmpeg on PATH')
+    return FFmpegWriter(outfile, size, fps, ffmpeg=path, **kwargs)
+
+
+def add_arguments(parser):
+    """--encoder / --ffmpeg options for a script; pass encoder_options(opts) on to open_writer()"""
+    parser.add_argument('--encoder', choices=ENCODERS, default='auto',
+        help='in-process PyAV, or an ffmpeg subprocess (default: PyAV if installed)')
+    parser.add_argument('--ffmpeg', metavar='PATH',
+        help='ffmpeg binary for the subprocess encoder (default: $FFMPEG, then PATH)')
+
+
+def encoder_options(opts):
+    return {'encoder': opts.encoder, 'ffmpeg': opts.ffmpeg}
+
+
+class QueuedWriter:
+    """
+    Feeds a writer from a background thread through a bounded queue, so
+    rendering overlaps the blocking pipe writes and at most `maxsize` frames
+    wait in memory. Same interface as FFmpegWriter.
+    """
+
+    def __init__(self, writer, maxsize=8):
+        self.writer = writer
+        self.frames = 0
+        self.unique = 0
+        self.error = None
+        self.queue = queue.Queue(maxsize)
+        self.thread = threading.Thread(target=self._drain, daemon=True)
+        self.thread.start()
+
+    def _drain(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            if self.error is None:
+                try:
+                    self.writer.write(*item)
+                except BaseException as e:
+                    self.error = e
+
+    def write(self, frame, count=1):
+        if self.error is not None:
+            raise self.error
+        self.queue.put((frame, count))
+        self.frames += count
+        self.unique += 1
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            self.writer.abort()
+            raise self.error
+        self.writer.close()
+
+    def abort(self):
+        # Kill the encoder first so a write blocked on its pipe fails fast
+        self.writer.abort()
+        self.error = self.error or RuntimeError('aborted')
+        self.queue.put(None)
+        self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def concat_segments(paths, outfile, encoder='auto', ffmpeg=None):
+    """Join encoded segments in order without re-encoding (in-process with PyAV, else ffmpeg's concat demuxer)."""
+    if resolve_encoder(encoder) == 'pyav':
+        return _remux(paths, outfile)
+    ffmpeg = find_ffmpeg(ffmpeg)
+    if ffmpeg is None:
+        raise RuntimeError('cannot join segments: install PyAV (pip install av) or put ffmpeg on PATH')
+    listfile = outfile + '.segments.txt'
+    with open(listfile, 'w', encoding='utf-8') as f:
+        for path in paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    try:
+        subprocess.run([
+            ffmpeg, '-y', '-hide_banner', '-loglevel', 'error',
+            '-f', 'concat', '-safe', '0',
+            '-i', listfile,
+            '-c', 'copy',
+            '-movflags', '+faststart',
+            outfile
+        ], check=True)
+    finally:
+        os.remove(listfile)
+
+
+def _remux(paths, outfile):
+    with av.open(outfile, 'w', options={'movflags': '+faststart'}) as out:
+        stream = None
+        offset = 0
+        for path in paths:
+            with av.open(path) as src:
+                source = src.streams.video[0]
+                if stream is None:
+                    stream = out.add_stream_from_template(source)
+                end = offset
+                for packet in src.demux(source):
+                    if packet.dts is None:  # the flush packet
+                        continue
+                    packet.pts += offset
+                    packet.dts += offset
+                    end = max(end, packet.pts + packet.duration)
+                    packet.stream = stream
+                    out.mux(packet)
+                offset = end
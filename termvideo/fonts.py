@@ -0,0 +1,20 @@
+"""
+Font loading shared by everything rendered in one process.
+"""
+from functools import lru_cache
+
+from PIL import ImageFont
+
+# Monospace fonts in order of preference
+FONT_NAMES = ['consola.ttf', 'Consolas', 'JetBrainsMono-Regular.ttf', 'cour.ttf']
+
+
+@lru_cache(maxsize=None)
+def get_font(size):
+    """First available monospace font at size — loaded once per process"""
+    for name in FONT_NAMES:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            pass
+    return ImageFont.load_default()
@@ -0,0 +1,74 @@
+"""
+Run-length frame collection. Consecutive frames whose terminal state is
+unchanged are rendered once and kept as a single (frame, count) run, so
+render and encode cost follow state changes rather than video length.
+
+Runs can be streamed instead of kept: coalesce() is a lazy generator, and
+FrameRuns takes a sink that receives each run as soon as it is complete, so
+only the run in progress is held in memory however long the video is.
+"""
+
+
+def coalesce(frames):
+    """
+    frames: iterable of (key, render, count) — see FrameRuns.add().
+    Yields (frame, count) runs, rendering each only when its key changes.
+    """
+    key = frame = None
+    total = 0
+    for k, render, n in frames:
+        if n <= 0:
+            continue
+        if total and k == key:
+            total += n
+            continue
+        if total:
+            yield frame, total
+        key, frame, total = k, render(), n
+    if total:
+        yield frame, total
+
+
+class FrameRuns:
+    """
+    List of (frame, count) runs; `total` is the frame count of the video.
+    With a sink(frame, count), finished runs go to the sink instead of the
+    list; call flush() after the last add() to hand over the final run.
+    """
+
+    def __init__(self, sink=None):
+        self.runs = []
+        self.total = 0
+        self.rendered = 0
+        self.sink = sink
+        self._key = None
+
+    def add(self, key, render, count=1):
+        """
+        key: hashable snapshot of everything that affects the image
+        render: callable producing the frame, only called when key changed
+        """
+        if count <= 0:
+            return
+        if self.runs and key == self._key:
+            frame, n = self.runs[-1]
+            self.runs[-1] = (frame, n + count)
+        else:
+            self.flush()
+            self.runs.append((render(), count))
+            self.rendered += 1
+            self._key = key
+        self.total += count
+
+    def flush(self):
+        """Pass every finished run to the sink"""
+        if self.sink is not None:
+            for frame, count in self.runs:
+                self.sink(frame, count)
+            self.runs = []
+
+    def __iter__(self):
+        return iter(self.runs)
+
+    def __len__(self):
+        return self.rendered
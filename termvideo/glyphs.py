@@ -0,0 +1,71 @@
+"""
+Glyph-atlas text rasterizer for the monospace terminal grid.
+Each (glyph, color) pair is rasterized once; lines are then composed by
+blitting cached cells instead of running ImageDraw.text() every frame.
+"""
+from PIL import Image, ImageDraw
+
+from .measure import measurer_for
+
+
+class GlyphAtlas:
+    """Cached glyph cells for one font at one size."""
+
+    def __init__(self, font, measure=None):
+        self.font = font
+        self.measure = measure or measurer_for(font)
+        self._masks = {}  # glyph -> (mask, (dx, dy)) or None for blank glyphs
+        self._tiles = {}  # (glyph, color) -> (tile, mask, (dx, dy)) or None
+
+    def advance(self, ch):
+        """Pen advance for one glyph — identical for every cell of a monospace font"""
+        return self.measure.advance(ch)
+
+    def text_width(self, text):
+        return self.measure.width(text)
+
+    def _mask(self, ch):
+        if ch in self._masks:
+            return self._masks[ch]
+        # Ink box relative to the same origin ImageDraw.text() uses
+        left, top, right, bottom = self.font.getbbox(ch)
+        if right <= left or bottom <= top:
+            entry = None
+        else:
+            mask = Image.new('L', (right - left, bottom - top), 0)
+            ImageDraw.Draw(mask).text((-left, -top), ch, fill=255, font=self.font)
+            entry = (mask, (left, top))
+        self._masks[ch] = entry
+        return entry
+
+    def glyph(self, ch, color):
+        """(tile, mask, offset) for ch in color, or None if it draws nothing"""
+        key = (ch, color)
+        if key in self._tiles:
+            return self._tiles[key]
+        entry = self._mask(ch)
+        if entry is not None:
+            mask, offset = entry
+            entry = (Image.new('RGB', mask.size, color), mask, offset)
+        self._tiles[key] = entry
+        return entry
+
+    def draw_text(self, img, xy, text, color):
+        """Blit text at xy (ImageDraw.text() origin); returns the pen x after it"""
+        x, y = xy
+        paste = img.paste
+        advance = self.measure.advance
+        for ch in text:
+            g = self.glyph(ch, color)
+            if g is not None:
+                tile, mask, (dx, dy) = g
+                paste(tile, (round(x) + dx, y + dy), mask)
+            x += advance(ch)
+        return x
+
+    def draw_segments(self, img, xy, segments):
+        """segments: list of (text, color); returns the pen x after the line"""
+        x, y = xy
+        for text, color in segments:
+            x = self.draw_text(img, (x, y), text, color)
+        return x
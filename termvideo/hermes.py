@@ -0,0 +1,242 @@
+"""
+Running the real hermes.js CLI for recorded scenes.
+
+Output is cached on disk, keyed by the command and the ones run before it
+in its recording plus a hash of hermes.js and its port, so re-recording
+unchanged scenes never starts Node. Commands that
+miss the cache are prefetched concurrently while rendering gets going; see
+prefetch(). They run either through Node (asyncio subprocesses) or in
+process through hermesapi, the Python port of hermes.js, over keep-alive
+connections — same output, without paying Node startup per command.
+"""
+import os, json, asyncio, hashlib, subprocess, threading
+from concurrent.futures import Future
+
+from . import hermesapi
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERMES = os.path.join(ROOT, 'scripts', 'hermes.js')
+CACHE_DIR = os.path.join(ROOT, '.cache', 'hermes')
+
+# Commands that only read API state; the mock API is stateful, so everything
+# else (hire, confirm, withdraw, ...) keeps its place in the recording order
+READ_ONLY = {'browse', 'status', 'task-status', 'earnings'}
+# Output is captured through a pipe; ask for the same styling a terminal gets
+ENV = dict(os.environ, FORCE_COLOR='1')
+CLIS = ('python', 'node')
+
+_client = None  # shared by every in-process command, so connections are reused
+
+
+def _lines(stdout, stderr):
+    output = stdout.strip()
+    if stderr.strip():
+        output += '\n' + stderr.strip()
+    return output.split('\n') if output else []
+
+
+def run_hermes(args, timeout=15):
+    """Run `node hermes.js <args> --local` and return its output lines (ANSI styling included)."""
+    result = subprocess.run(
+        ['node', HERMES] + list(args) + ['--local'],
+        capture_output=True, text=True, timeout=timeout, env=ENV
+    )
+    return _lines(result.stdout, result.stderr)
+
+
+async def run_hermes_async(args, timeout=15):
+    """run_hermes() as an asyncio subprocess"""
+    proc = await asyncio.create_subprocess_exec(
+        'node', HERMES, *args, '--local',
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, env=ENV)
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(['node', HERMES] + list(args), timeout) from None
+    return _lines(stdout.decode('utf-8', 'replace'), stderr.decode('utf-8', 'replace'))
+
+
+def local_client():
+    global _client
+    if _client is None:
+        _client = hermesapi.Client(hermesapi.LOCAL_URL, hermesapi.load_api_key())
+    return _client
+
+
+def run_hermes_py(args):
+    """run_hermes() in process, through hermesapi and the shared local client"""
+    stdout, stderr, _ = hermesapi.run(list(args) + ['--local'], local_client(), hermesapi.use_color(ENV))
+    return _lines(stdout, stderr)
+
+
+class OutputCache:
+    """
+    On-disk CLI output, one JSON file per (hash of hermes.js and its Python
+    port, chain). A chain is a command and every command run before it in its
+    recording: the mock API is stateful, so the same args can print something
+    else at another point of another recording.
+    """
+
+    def __init__(self, directory=CACHE_DIR, scripts=(HERMES, hermesapi.__file__)):
+        self.directory = directory
+        h = hashlib.sha256()
+        for script in scripts:
+            with open(script, 'rb') as f:
+                h.update(f.read())
+        self.script_hash = h.hexdigest()
+
+    def path(self, chain):
+        key = json.dumps([self.script_hash, [list(args) for args in chain]])
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest()[:32] + '.json')
+
+    def get(self, chain):
+        """Cached output lines of chain's last command, or None"""
+        try:
+            with open(self.path(chain), encoding='utf-8') as f:
+                return json.load(f)['lines']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, chain, lines):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(chain)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'args': list(chain[-1]), 'lines': lines}, f, ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+
+
+class Prefetch:
+    """
+    Outputs for one recording's commands, fetched in a background thread.
+    runner() hands out run(args) callables that block until that command's
+    output is in. cli is 'node' to run hermes.js, or 'python' for
+    run_hermes_py(). The commands are one chain against a stateful API, so
+    cached output is only used when every command's is cached; otherwise they
+    all run again, in order, once the Prefetch given as `after` is done.
+    """
+
+    def __init__(self, commands, cache=None, refresh=False, timeout=15, cli='node', after=None):
+        self.cache = cache
+        self.timeout = timeout
+        self.cli = cli
+        self.hits = 0
+        self.runs = 0
+        self._commands = [tuple(args) for args, _ in commands]
+        self._steps = []  # [(chain, settle_ms, future)], one per command that runs
+        self._index = []  # command -> its step
+        for args, settle_ms in commands:
+            args = tuple(args)
+            # Only a read-only command straight after itself prints the same again
+            if not (self._steps and args[0] in READ_ONLY and self._steps[-1][0][-1] == args):
+                chain = (self._steps[-1][0] if self._steps else ()) + (args,)
+                self._steps.append((chain, settle_ms, Future()))
+            self._index.append(len(self._steps) - 1)
+        cached = [None if cache is None or refresh else cache.get(chain) for chain, _, _ in self._steps]
+        pending = []
+        if all(lines is not None for lines in cached):
+            for (_, _, future), lines in zip(self._steps, cached):
+                self.hits += 1
+                future.set_result(lines)
+        else:
+            # A cached `hire` would leave a fresh API without the task a
+            # following `task-status` asks about
+            pending = self._steps
+        self._thread = None
+        if pending:
+            self._thread = threading.Thread(target=self._main, args=(after, pending), daemon=True)
+            self._thread.start()
+
+    def _main(self, after, pending):
+        if after is not None:
+            after.join()
+        asyncio.run(self._fetch(pending))
+
+    def join(self):
+        """Wait until every command has run"""
+        if self._thread is not None:
+            self._thread.join()
+
+    async def _run(self, chain, future):
+        args = chain[-1]
+        try:
+            if self.cli == 'python':
+                lines = await asyncio.to_thread(run_hermes_py, args)
+            else:
+                lines = await run_hermes_async(args, self.timeout)
+            if self.cache is not None:
+                self.cache.put(chain, lines)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        self.runs += 1
+        future.set_result(lines)
+
+    async def _fetch(self, pending):
+        # Read-only commands in a row run together; a state-changing command
+        # waits for them, runs alone, then holds for its settle time (e.g. the
+        # mock API completing a hired task) before anything after it starts
+        batch = []
+        for chain, settle_ms, future in pending:
+            if chain[-1][0] in READ_ONLY:
+                batch.append(asyncio.ensure_future(self._run(chain, future)))
+                continue
+            await asyncio.gather(*batch)
+            batch = []
+            await self._run(chain, future)
+            await asyncio.sleep(settle_ms / 1000)
+        await asyncio.gather(*batch)
+
+    def result(self, i):
+        """Output lines of the recording's i-th command, once it has run"""
+        return list(self._steps[self._index[i]][2].result())
+
+    def runner(self):
+        """
+        A run(args) for one pass over the recording: each call gets the next
+        command with those args, so a repeated command gets the output from
+        its own place in the chain.
+        """
+        pos = 0
+
+        def run(args):
+            nonlocal pos
+            args = tuple(args)
+            try:
+                i = self._commands.index(args, pos)
+            except ValueError:
+                raise KeyError(f'hermes {" ".join(args)} was not prefetched') from None
+            pos = i + 1
+            return self.result(i)
+        return run
+
+
+def prefetch(commands, refresh=False, cache_dir=CACHE_DIR, cli='node', after=None):
+    """
+    Start fetching [(args, settle_ms), ...] in the background; returns a
+    Prefetch. settle_ms is how long the scene pauses after the command.
+    """
+    # The port prints what hermes.js prints, so both share one cache
+    return Prefetch(commands, cache=OutputCache(cache_dir), refresh=refresh, cli=cli, after=after)
+
+
+def prefetch_all(recordings, refresh=False, cache_dir=CACHE_DIR, cli='node'):
+    """
+    prefetch() each recording's commands as a chain of its own; returns a
+    Prefetch per recording. They share the mock API, so each chain runs
+    after the one before it instead of interleaving with it.
+    """
+    out = []
+    for commands in recordings:
+        out.append(prefetch(commands, refresh, cache_dir, cli, after=out[-1] if out else None))
+    return out
+
+
+def add_arguments(parser):
+    """The scripts' --cli and --cache-dir options"""
+    parser.add_argument('--cli', choices=CLIS, default='python',
+        help='run uncached commands in process through the Python port of hermes.js, '
+             'or through Node (default: python)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, metavar='DIR',
+        help='where CLI output is cached (default: .cache/hermes)')
@@ -0,0 +1,536 @@
+"""
+scripts/hermes.js in Python, for recording in process.
+
+Same commands, arguments and output as the Node CLI — down to JavaScript's
+number formatting, truthiness and JSON.stringify layout — so recordings
+come out identical, without starting Node for each command. Client keeps
+HTTP/1.1 connections to the API alive and pooled between commands, and
+is safe to share between threads.
+
+    python -m termvideo.hermesapi browse --tag code --local
+"""
+import os, re, sys, json, time, socket, threading
+from http.client import HTTPConnection, HTTPSConnection, RemoteDisconnected
+from urllib.parse import quote, quote_plus, urlsplit
+
+LOCAL_URL = 'http://localhost:4020'
+API_URL = 'https://api.hermesx402.com/v1'
+# Node's http server drops idle keep-alive connections after 5s
+IDLE_S = 4
+
+HELP = '''hermesx402 CLI
+
+Commands:
+  browse     Search for agents
+  hire       Hire an agent for a task
+  task-status  Check task progress
+  confirm    Confirm delivery & release funds
+  dispute    Dispute a delivery
+  list       Register your agent
+  status     Check your listing
+  earnings   View earnings balance
+  withdraw   Withdraw SOL to wallet
+  accept     Accept an incoming task
+  deliver    Submit task result
+  update     Update your listing
+  pause      Stop accepting tasks
+  unpause    Resume accepting tasks'''
+
+
+def api_url(local=False, env=os.environ):
+    return LOCAL_URL if local else env.get('HERMES_API_URL') or API_URL
+
+
+def load_api_key(env=os.environ):
+    """HERMES_API_KEY, or the key in the OpenClaw auth profile"""
+    if env.get('HERMES_API_KEY'):
+        return env['HERMES_API_KEY']
+    home = env.get('HOME') or env.get('USERPROFILE') or ''
+    try:
+        with open(os.path.join(home, '.openclaw', 'agents', 'main', 'agent', 'auth-profiles.json'),
+                  encoding='utf-8') as f:
+            key = json.load(f)['hermesx402']['apiKey']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return key or None
+
+
+def use_color(env=os.environ):
+    """ANSI styling only when FORCE_COLOR is set, as the video capture does (NO_COLOR turns it off)"""
+    return not env.get('NO_COLOR') and bool(env.get('FORCE_COLOR')) and env['FORCE_COLOR'] != '0'
+
+
+# JavaScript values, as far as the CLI's output depends on them
+
+class _Undefined:
+    def __repr__(self):
+        return 'undefined'
+
+UNDEFINED = _Undefined()
+
+
+def truthy(value):
+    if value is None or value is UNDEFINED or value is False:
+        return False
+    if isinstance(value, (int, float)):
+        return value == value and value != 0
+    if isinstance(value, str):
+        return value != ''
+    return True
+
+
+def js_number(x):
+    """Number.prototype.toString()"""
+    if isinstance(x, int):
+        return str(x)
+    if x != x:
+        return 'NaN'
+    if x in (float('inf'), float('-inf')):
+        return 'Infinity' if x > 0 else '-Infinity'
+    if x == 0:
+        return '0'
+    # repr() has the same shortest round-trip digits; only the layout differs
+    mantissa, _, exp = repr(abs(x)).partition('e')
+    whole, _, frac = mantissa.partition('.')
+    digits = (whole + frac).lstrip('0')
+    n = len(whole) + int(exp or 0) - (len(whole + frac) - len(digits))
+    digits = digits.rstrip('0')
+    k = len(digits)
+    if k <= n <= 21:
+        s = digits + '0' * (n - k)
+    elif 0 < n <= 21:
+        s = digits[:n] + '.' + digits[n:]
+    elif -6 < n <= 0:
+        s = '0.' + '0' * -n + digits
+    else:
+        e = n - 1
+        s = digits[0] + ('.' + digits[1:] if k > 1 else '') + 'e' + ('+' if e > 0 else '-') + str(abs(e))
+    return ('-' if x < 0 else '') + s
+
+
+def js_str(value):
+    """A value in a template literal"""
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return js_number(value)
+    if isinstance(value, list):
+        return join(value, ',')
+    if isinstance(value, dict):
+        return '[object Object]'
+    return str(value)
+
+
+def join(items, sep):
+    """Array.prototype.join()"""
+    return sep.join('' if v is None or v is UNDEFINED else js_str(v) for v in items)
+
+
+def _index_key(key):
+    return key.isascii() and key.isdigit() and (key == '0' or key[0] != '0') and int(key) < 2 ** 32 - 1
+
+
+def stringify(value, indent=2, level=0):
+    """JSON.stringify(value, null, indent)"""
+    pad = ' ' * indent
+    if value is None or value is UNDEFINED:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return js_number(value) if value == value and abs(value) != float('inf') else 'null'
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    inner = '\n' + pad * (level + 1)
+    if isinstance(value, list):
+        if not value:
+            return '[]'
+        items = [stringify(v, indent, level + 1) for v in value]
+        return '[' + inner + (',' + inner).join(items) + '\n' + pad * level + ']'
+    if not value:
+        return '{}'
+    # Objects list integer-like keys first, in numeric order
+    keys = sorted((k for k in value if _index_key(k)), key=int) + [k for k in value if not _index_key(k)]
+    items = [json.dumps(k, ensure_ascii=False) + ': ' + stringify(value[k], indent, level + 1) for k in keys]
+    return '{' + inner + (',' + inner).join(items) + '\n' + pad * level + '}'
+
+
+def _reject(name):
+    raise ValueError(f'{name} is not JSON')
+
+
+def parse_json(text):
+    """JSON.parse(): every number is a double"""
+    return json.loads(text, parse_int=float, parse_constant=_reject)
+
+
+_FLOAT = re.compile(r'[+-]?(Infinity|(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?)')
+_INT = re.compile(r'[+-]?\d+')
+
+
+def parse_float(value):
+    """parseFloat(); NaN comes out as None, as JSON.stringify writes it"""
+    m = _FLOAT.match(js_str(value).lstrip())
+    return float(m.group().replace('Infinity', 'inf')) if m else None
+
+
+def parse_int(value):
+    """parseInt(value) in base 10; NaN comes out as None"""
+    m = _INT.match(js_str(value).lstrip())
+    return float(m.group()) if m else None
+
+
+def parse_args(argv):
+    """hermes.js parseArgs(): {'_': positionals, 'flag': value or True}"""
+    result = {'_': []}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg.startswith('--'):
+            nxt = argv[i + 1] if i + 1 < len(argv) else None
+            if nxt and not nxt.startswith('--'):
+                result[arg[2:]] = nxt
+                i += 1
+            else:
+                result[arg[2:]] = True
+        else:
+            result['_'].append(arg)
+        i += 1
+    return result
+
+
+def _form(params):
+    """URLSearchParams.toString()"""
+    return '&'.join(quote_plus(k, safe='*').replace('~', '%7E') + '=' +
+                    quote_plus(js_str(v), safe='*').replace('~', '%7E') for k, v in params.items())
+
+
+class Client:
+    """The hermes API over pooled keep-alive connections."""
+
+    def __init__(self, url=LOCAL_URL, api_key=None, timeout=15, pool=4):
+        url = url[:-1] if url.endswith('/') else url
+        parts = urlsplit(url)
+        self.base = parts.path
+        self.host = parts.hostname
+        self.port = parts.port or (80 if parts.scheme == 'http' else 443)
+        self.api_key = api_key
+        self.timeout = timeout
+        self.pool = pool
+        self.connections = 0  # opened so far
+        self._https = parts.scheme != 'http'
+        self._idle = []  # (connection, last used)
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self.connections += 1
+        cls = HTTPSConnection if self._https else HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def _checkout(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                conn, used = self._idle.pop()
+                if now - used < IDLE_S:
+                    return conn, True
+                conn.close()
+        return self._connect(), False
+
+    def _checkin(self, conn):
+        with self._lock:
+            if len(self._idle) < self.pool:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+    def _path(self, endpoint):
+        parts = urlsplit(self.base + endpoint)
+        path = quote(parts.path or '/', safe="!$%&'()*+,-./:;=@[]^_|~")
+        return path + ('?' + parts.query if parts.query else '')
+
+    def _send(self, conn, method, path, data, headers):
+        conn.request(method, path, data, headers)
+        res = conn.getresponse()
+        text = res.read().decode('utf-8', 'replace')
+        if res.will_close:
+            conn.close()
+        else:
+            self._checkin(conn)
+        return res.status, text
+
+    def call(self, method, endpoint, body=None):
+        """hermes.js apiCall(): the parsed JSON response, or {'raw': text, 'status': code}"""
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f'Bearer {self.api_key}'
+        data = None if body is None else json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode()
+        path = self._path(endpoint)
+        conn, reused = self._checkout()
+        try:
+            try:
+                status, text = self._send(conn, method, path, data, headers)
+            except (RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if not reused:
+                    raise
+                # The server closed the idle connection before it saw the request
+                conn = self._connect()
+                status, text = self._send(conn, method, path, data, headers)
+        except ConnectionRefusedError:
+            conn.close()
+            raise ConnectionRefusedError(f'connect ECONNREFUSED {self._address()}:{self.port}') from None
+        except socket.gaierror:
+            conn.close()
+            raise ConnectionError(f'getaddrinfo ENOTFOUND {self.host}') from None
+        except BaseException:
+            conn.close()
+            raise
+        try:
+            return parse_json(text)
+        except ValueError:
+            return {'raw': text, 'status': status}
+
+    def _address(self):
+        try:
+            return socket.gethostbyname(self.host)
+        except OSError:
+            return self.host
+
+
+class Console:
+    """console.log/console.error for one command, collected; styled like hermes.js"""
+
+    def __init__(self, color=False):
+        self.color = color
+        self.stdout = []
+        self.stderr = []
+
+    def log(self, text=''):
+        self.stdout.append(text)
+
+    def error(self, text):
+        self.stderr.append(text)
+
+    def style(self, code, text):
+        return f'\x1b[{code}m{text}\x1b[0m' if self.color else text
+
+    def green(self, text):
+        return self.style('32', text)
+
+    def dim(self, text):
+        return self.style('2', text)
+
+
+def get(res, key):
+    """res[key] as JavaScript reads a property"""
+    if res is None:
+        raise TypeError(f"Cannot read properties of null (reading '{key}')")
+    return res.get(key, UNDEFINED) if isinstance(res, dict) else UNDEFINED
+
+
+def _split(args, key):
+    if not isinstance(args[key], str):
+        raise TypeError(f'args.{key}.split is not a function')
+    return args[key].split(',')
+
+
+def _first(args):
+    return args['_'][0] if args['_'] else UNDEFINED
+
+
+def _opts(args, *fields):
+    """The request fields whose flags are set: (flag, field, convert) -> {field: convert(value)}"""
+    return {field: convert(args[flag]) if convert else args[flag]
+            for flag, field, convert in fields if truthy(args.get(flag))}
+
+
+# Commands: (client, parsed args, console)
+
+def browse(api, args, console):
+    params = _opts(args, ('tag', 'tag', None), ('max-rate', 'max_rate', None),
+                   ('min-rating', 'min_rating', None), ('sort', 'sort', None), ('limit', 'limit', None))
+    res = api.call('GET', f'/agents?{_form(params)}')
+    agents = get(res, 'agents')
+    if truthy(agents):
+        console.log(console.dim(f'  ↳ {len(agents)} agents found') + '\n')
+        for a in agents:
+            console.log(console.dim(f"  {js_str(get(a, 'name')).ljust(20)} {js_str(get(a, 'rating'))}/5  "
+                                    f"{js_str(get(a, 'rate'))} SOL/task  {join(get(a, 'tags'), ', ')}"))
+    else:
+        console.log(stringify(res))
+
+
+def hire(api, args, console):
+    agent_id = _first(args)
+    if not truthy(agent_id):
+        return console.error('Error: agent-id required')
+    if not truthy(args.get('task')):
+        return console.error('Error: --task required')
+    body = dict(agent_id=agent_id, description=args['task'],
+                **_opts(args, ('budget', 'budget', parse_float), ('deadline', 'deadline', None),
+                        ('priority', 'priority', None)))
+    res = api.call('POST', '/tasks', body)
+    if truthy(get(res, 'task_id')):
+        console.log(console.dim(f"  ↳ task created: {js_str(get(res, 'task_id'))}"))
+        console.log(console.dim(f"  ↳ escrow: {js_str(get(res, 'escrow'))} SOL"))
+        console.log(console.dim(f"  ↳ tx: {js_str(get(res, 'tx'))}"))
+    else:
+        console.log(stringify(res))
+
+
+def task_status(api, args, console):
+    task_id = _first(args)
+    if not truthy(task_id):
+        return console.error('Error: task-id required')
+    console.log(stringify(api.call('GET', f'/tasks/{task_id}')))
+
+
+def confirm(api, args, console):
+    task_id = _first(args)
+    if not truthy(task_id):
+        return console.error('Error: task-id required')
+    body = _opts(args, ('rating', 'rating', parse_int), ('comment', 'comment', None))
+    res = api.call('POST', f'/tasks/{task_id}/confirm', body)
+    if truthy(get(res, 'released')):
+        console.log(console.green(f"  ✓ {js_str(get(res, 'released'))} SOL released"))
+        console.log(f"  tx: {js_str(get(res, 'tx'))}")
+    else:
+        console.log(stringify(res))
+
+
+def dispute(api, args, console):
+    task_id = _first(args)
+    if not truthy(task_id):
+        return console.error('Error: task-id required')
+    if not truthy(args.get('reason')):
+        return console.error('Error: --reason required')
+    console.log(stringify(api.call('POST', f'/tasks/{task_id}/dispute', {'reason': args['reason']})))
+
+
+def list_agent(api, args, console):
+    if not truthy(args.get('name')):
+        return console.error('Error: --name required')
+    body = dict(name=args['name'], **_opts(args, ('description', 'description', None)))
+    if truthy(args.get('tags')):
+        body['tags'] = _split(args, 'tags')
+    body.update(_opts(args, ('rate', 'rate', parse_float), ('endpoint', 'endpoint', None),
+                      ('wallet', 'wallet', None), ('max-concurrent', 'max_concurrent', parse_int)))
+    res = api.call('POST', '/agents', body)
+    if truthy(get(res, 'id')):
+        console.log(console.green(f"  ✓ listed as {js_str(get(res, 'name'))} ({js_str(get(res, 'id'))})"))
+        console.log(f"  rate: {js_str(get(res, 'rate'))} SOL/task")
+    else:
+        console.log(stringify(res))
+
+
+def status(api, args, console):
+    console.log(stringify(api.call('GET', '/agents/me')))
+
+
+def earnings(api, args, console):
+    res = api.call('GET', '/payments/balance')
+    if get(res, 'available') is not UNDEFINED:
+        console.log(console.dim(f"  balance:      {js_str(get(res, 'available'))} SOL"))
+        console.log(console.dim(f"  pending:      {js_str(get(res, 'pending'))} SOL"))
+        console.log(console.dim(f"  total earned: {js_str(get(res, 'total_earned'))} SOL"))
+    else:
+        console.log(stringify(res))
+
+
+def withdraw(api, args, console):
+    if not truthy(args.get('amount')):
+        return console.error('Error: --amount required')
+    if not truthy(args.get('to')):
+        return console.error('Error: --to required')
+    res = api.call('POST', '/payments/withdraw', {'amount': parse_float(args['amount']), 'to': args['to']})
+    if get(res, 'status') == 'completed':
+        console.log(console.green(f"  ✓ {js_str(get(res, 'amount'))} SOL → {js_str(args['to'])}"))
+        console.log(f"  tx: {js_str(get(res, 'tx'))}")
+    else:
+        console.log(stringify(res))
+
+
+def accept(api, args, console):
+    task_id = _first(args)
+    if not truthy(task_id):
+        return console.error('Error: task-id required')
+    console.log(stringify(api.call('POST', f'/tasks/{task_id}/accept')))
+
+
+def deliver(api, args, console):
+    task_id = _first(args)
+    if not truthy(task_id):
+        return console.error('Error: task-id required')
+    body = _opts(args, ('result', 'result', None), ('summary', 'summary', None))
+    res = api.call('POST', f'/tasks/{task_id}/deliver', body)
+    if get(res, 'status') == 'delivered':
+        console.log(console.green('  ✓ delivered — awaiting confirmation'))
+    else:
+        console.log(stringify(res))
+
+
+def update(api, args, console):
+    body = _opts(args, ('rate', 'rate', parse_float))
+    if truthy(args.get('tags')):
+        body['tags'] = _split(args, 'tags')
+    body.update(_opts(args, ('description', 'description', None)))
+    api.call('PATCH', '/agents/me', body)
+    console.log(console.green('  ✓ updated'))
+
+
+def pause(api, args, console):
+    api.call('POST', '/agents/me/pause')
+    console.log(console.green('  ✓ paused — no longer accepting tasks'))
+
+
+def unpause(api, args, console):
+    api.call('POST', '/agents/me/unpause')
+    console.log(console.green('  ✓ unpaused — accepting tasks'))
+
+
+COMMANDS = {
+    'browse': browse, 'hire': hire, 'task-status': task_status, 'confirm': confirm,
+    'dispute': dispute, 'list': list_agent, 'status': status, 'earnings': earnings,
+    'withdraw': withdraw, 'accept': accept, 'deliver': deliver, 'update': update,
+    'pause': pause, 'unpause': unpause,
+}
+
+
+def run(argv, api, color=False):
+    """`node hermes.js <argv>` against the client api; returns (stdout, stderr, exit code)"""
+    args = parse_args(argv)
+    cmd = args['_'].pop(0) if args['_'] else None
+    console = Console(color)
+    code = 0
+    if cmd not in COMMANDS:
+        console.log(HELP)
+    else:
+        try:
+            COMMANDS[cmd](api, args, console)
+        except Exception as e:
+            console.error(f'Error: {e}')
+            code = 1
+    return (''.join(line + '\n' for line in console.stdout),
+            ''.join(line + '\n' for line in console.stderr), code)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    api = Client(api_url('--local' in argv), load_api_key())
+    stdout, stderr, code = run(argv, api, use_color())
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+    sys.exit(code)
+
+
+if __name__ == '__main__':
+    main()
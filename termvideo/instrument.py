@@ -0,0 +1,228 @@
+"""
+Per-stage profiling for the render pipeline (the scripts' --profile flag).
+
+Profiler.install() wraps the pipeline's hot spots in place — frame rendering,
+text drawing, font metrics, window chrome, the encoder, CLI output — and
+counts every subprocess started, so a slow render can be pinned on a stage
+without touching the scripts. Stages nest (text is drawn inside render), so
+their times overlap; 'actions' is main-thread time spent outside every
+stage, i.e. stepping through the scenes' actions and building frame state.
+"""
+import os, sys, json, time, atexit, asyncio, threading, subprocess
+
+from PIL import ImageFont
+
+from . import chrome, encode, glyphs, hermes, live, npraster, raster
+
+# stage -> [(owner, attribute)] wrapped for it
+STAGES = {
+    'render': [(raster.FrameRenderer, 'render'), (npraster.NumpyFrameRenderer, 'render')],
+    'draw_text': [(glyphs.GlyphAtlas, 'draw_text'), (npraster.NumpyFrameRenderer, '_draw_text')],
+    'font_metrics': [(ImageFont.FreeTypeFont, 'getbbox'), (ImageFont.FreeTypeFont, 'getlength')],
+    'chrome': [(chrome.ChromeCache, '_draw')],
+    'encode': [(encode.FFmpegWriter, 'write'), (encode.PyAVWriter, 'write')],
+    'encode_flush': [(encode.FFmpegWriter, 'close'), (encode.PyAVWriter, 'close')],
+    'queue_wait': [(encode.QueuedWriter, 'write'), (encode.QueuedWriter, 'close')],
+    'cli': [(hermes, 'run_hermes'), (hermes, 'run_hermes_async'), (hermes, 'run_hermes_py'),
+            (live.LiveSession, 'run')],
+    'cli_wait': [(hermes.Prefetch, 'result')],
+}
+
+
+def percentile(values, p):
+    """Linear-interpolated percentile of an unsorted list"""
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+class Profiler:
+    """Stage timings (one sample per call), frame/draw/spawn counts, optional event trace."""
+
+    def __init__(self, stages=None, events=False):
+        self.stages = list(stages or STAGES)
+        self.samples = {name: [] for name in self.stages}
+        self.frames = 0
+        self.spawns = {}
+        self.events = {} if events else None  # thread name -> speedscope open/close events
+        self.started = None
+        self.main_busy = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._undo = []
+
+    def install(self):
+        """Start timing; wraps every stage's methods until uninstall()"""
+        for name in self.stages:
+            for owner, attr in STAGES[name]:
+                self._patch(owner, attr, self._wrap(name, getattr(owner, attr)))
+        if 'encode' in self.stages:
+            for writer in (encode.FFmpegWriter, encode.PyAVWriter):
+                self._patch(writer, 'write', self._count_frames(writer.write))
+        self._patch(subprocess.Popen, '__init__', self._count_spawns(subprocess.Popen.__init__))
+        self.started = time.perf_counter()
+        return self
+
+    def uninstall(self):
+        for owner, attr, orig in reversed(self._undo):
+            setattr(owner, attr, orig)
+        self._undo = []
+
+    def _patch(self, owner, attr, func):
+        self._undo.append((owner, attr, getattr(owner, attr)))
+        setattr(owner, attr, func)
+
+    def _wrap(self, name, func):
+        samples = self.samples[name]
+        if asyncio.iscoroutinefunction(func):
+            # Concurrent coroutines interleave, so they are timed but not traced
+            async def stage(*args, **kwargs):
+                t = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    samples.append(time.perf_counter() - t)
+            return stage
+
+        local, main = self._local, threading.main_thread()
+
+        def stage(*args, **kwargs):
+            depth = getattr(local, 'depth', 0)
+            local.depth = depth + 1
+            t = time.perf_counter()
+            self._event('O', name, t)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                self._event('C', name, end)
+                local.depth = depth
+                samples.append(end - t)
+                if depth == 0 and threading.current_thread() is main:
+                    self.main_busy += end - t
+        return stage
+
+    def _event(self, kind, name, at):
+        if self.events is not None:
+            with self._lock:
+                self.events.setdefault(threading.current_thread().name, []).append((kind, name, at))
+
+    def _count_frames(self, func):
+        def write(writer, frame, count=1):
+            self.frames += count
+            return func(writer, frame, count)
+        return write
+
+    def _count_spawns(self, func):
+        def init(popen, *args, **kwargs):
+            program = args[0] if args else kwargs.get('args')
+            if not isinstance(program, (str, bytes, os.PathLike)):
+                program = program[0]
+            program = os.path.splitext(os.path.basename(os.fsdecode(program)))[0]
+            with self._lock:
+                self.spawns[program] = self.spawns.get(program, 0) + 1
+            return func(popen, *args, **kwargs)
+        return init
+
+    def report(self):
+        """Cumulative and per-frame timings per stage, plus counts, as a dict"""
+        wall = time.perf_counter() - self.started
+        frames = self.frames or len(self.samples.get('render', ()))
+        stages = {}
+        for name in self.stages:
+            samples = self.samples[name]
+            if not samples:
+                continue
+            total = sum(samples)
+            stages[name] = {
+                'calls': len(samples),
+                'total_s': round(total, 4),
+                'per_frame_ms': round(total / frames * 1000, 4) if frames else None,
+                'p50_ms': round(percentile(samples, 50) * 1000, 4),
+                'p95_ms': round(percentile(samples, 95) * 1000, 4),
+                'p99_ms': round(percentile(samples, 99) * 1000, 4),
+                'max_ms': round(max(samples) * 1000, 4),
+            }
+        actions = max(wall - self.main_busy, 0.0)
+        stages['actions'] = {
+            'total_s': round(actions, 4),
+            'per_frame_ms': round(actions / frames * 1000, 4) if frames else None,
+        }
+        return {
+            'wall_s': round(wall, 4),
+            'counts': {
+                'frames': frames,
+                'rendered': len(self.samples.get('render', ())),
+                'draw_calls': len(self.samples.get('draw_text', ())),
+                'subprocesses': dict(self.spawns),
+            },
+            'stages': stages,
+        }
+
+    def speedscope(self, name='termvideo'):
+        """The traced stage calls as a speedscope evented profile, one per thread"""
+        names = list(self.stages)
+        end = time.perf_counter()
+        profiles = []
+        for thread, events in self.events.items():
+            profiles.append({
+                'type': 'evented', 'name': thread, 'unit': 'milliseconds',
+                'startValue': 0, 'endValue': (end - self.started) * 1000,
+                'events': [{'type': kind, 'frame': names.index(stage), 'at': (at - self.started) * 1000}
+                           for kind, stage, at in events],
+            })
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name, 'exporter': 'termvideo', 'activeProfileIndex': 0,
+            'shared': {'frames': [{'name': n} for n in names]},
+            'profiles': profiles,
+        }
+
+
+def add_arguments(parser):
+    parser.add_argument('--profile', metavar='JSON',
+        help='write per-stage timings and frame/draw/subprocess counts to this JSON file')
+    parser.add_argument('--profile-dump', metavar='PATH',
+        help='also dump a cProfile of the main thread (*.prof) or a speedscope trace of the stages (*.json)')
+
+
+def start(opts, name=None):
+    """
+    Profile the rest of this run if --profile or --profile-dump was given;
+    the report is written when the interpreter exits, whichever way main() returns.
+    Only this process is instrumented, not --jobs worker processes.
+    """
+    if not (opts.profile or opts.profile_dump):
+        return None
+    dump = opts.profile_dump
+    cprofile = dump is not None and dump.endswith('.prof')
+    profiler = Profiler(events=dump is not None and not cprofile).install()
+    if cprofile:
+        import cProfile
+        stats = cProfile.Profile()
+        stats.enable()
+    name = name or os.path.basename(sys.argv[0])
+
+    def finish():
+        if cprofile:
+            stats.disable()
+            stats.dump_stats(dump)
+        elif dump:
+            with open(dump, 'w', encoding='utf-8') as f:
+                json.dump(profiler.speedscope(name), f)
+        report = profiler.report()
+        if opts.profile:
+            with open(opts.profile, 'w', encoding='utf-8') as f:
+                json.dump(dict(report, script=name), f, indent=2)
+                f.write('\n')
+        top = sorted(report['stages'].items(), key=lambda kv: -kv[1]['total_s'])[:4]
+        print(f"Profile: {report['wall_s']:.2f}s — " +
+              ', '.join(f"{stage} {s['total_s']:.2f}s" for stage, s in top) +
+              ''.join(f" -> {path}" for path in (opts.profile, dump) if path))
+
+    atexit.register(finish)
+    return profiler
@@ -0,0 +1,180 @@
+"""
+Live capture: real commands run on a pseudo-terminal while frames are drawn.
+
+A producer thread plays the session on the wall clock — typing, pauses, and
+real commands whose output is timestamped chunk by chunk as it arrives — and
+puts (time_ms, data) terminal output on a bounded queue. The consumer feeds
+it through the VT parser and yields each video frame once its time has come,
+so rendering and encoding run alongside the session and a recording takes
+about as long as the session itself. Where there is no pty module
+(Windows), commands run on pipes instead.
+"""
+import os, time, queue, codecs, struct, threading, subprocess
+
+try:
+    import pty, fcntl, termios
+except ImportError:
+    pty = None
+
+from .hermes import ENV, HERMES
+from .vt import sgr
+
+# Output up to this far past a frame's timestamp lands on that frame
+SNAP_MS = 0.01
+
+
+def spawn(argv, cols, rows, env=None):
+    """Start argv on a cols x rows pty (or pipes); returns (proc, fd its output is read from)"""
+    if pty is None:
+        proc = subprocess.Popen(argv, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, env=env)
+        return proc, proc.stdout.fileno()
+    master, slave = pty.openpty()
+    # Sized like the video's window, so programs wrap where the video does
+    fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack('HHHH', rows, cols, 0, 0))
+    try:
+        proc = subprocess.Popen(argv, stdin=slave, stdout=slave, stderr=slave, env=env,
+                                start_new_session=True)
+    except BaseException:
+        os.close(master)
+        raise
+    finally:
+        os.close(slave)
+    return proc, master
+
+
+def read_output(argv, cols, rows, env=None, timeout=15):
+    """Yield a command's terminal output as text, chunk by chunk as it arrives"""
+    proc, fd = spawn(argv, cols, rows, env)
+    expired = threading.Event()
+
+    def kill():
+        expired.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    decoder = codecs.getincrementaldecoder('utf-8')('replace')
+    try:
+        while True:
+            try:
+                data = os.read(fd, 4096)
+            except OSError:  # EIO: the pty closed when the command exited
+                data = b''
+            text = decoder.decode(data, final=not data)
+            if pty is None:
+                # A pipe has no line discipline to turn \n into \r\n
+                text = text.replace('\r\n', '\n').replace('\n', '\r\n')
+            if text:
+                yield text
+            if not data:
+                break
+    finally:
+        timer.cancel()
+        if pty is not None:
+            os.close(fd)
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+    if expired.is_set():
+        raise subprocess.TimeoutExpired(argv, timeout)
+
+
+class LiveSession:
+    """
+    Producer side of a live recording, on a cols x rows terminal. Every
+    method blocks for as long as it takes on screen and queues what the
+    terminal would have printed; call start(play) to run play(session) on
+    a background thread, then consume frames() on this one.
+    """
+
+    def __init__(self, cols, rows, fps, maxsize=256, env=ENV):
+        self.cols = cols
+        self.rows = rows
+        self.fps = fps
+        self.env = env
+        self.queue = queue.Queue(maxsize)
+        self.error = None
+        self._start = None
+        self._thread = None
+
+    def now(self):
+        return (time.monotonic() - self._start) * 1000
+
+    def emit(self, data, at=None):
+        self.queue.put((self.now() if at is None else at, data))
+
+    def wait(self, ms):
+        """Hold until `ms` from now, on the session clock"""
+        self.sleep_until(self.now() + ms)
+
+    def sleep_until(self, ms):
+        delay = ms - self.now()
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def title(self, text):
+        """New window title on a cleared screen"""
+        self.emit(f'\x1b]2;{text}\x07\x1b[0m\x1b[2J\x1b[H\x1b[?25l')
+
+    def clear(self):
+        self.emit('\x1b[2J\x1b[H')
+
+    def newline(self):
+        self.emit('\r\n')
+
+    def type(self, text, color, char_ms=None, prompt=''):
+        """Type text after a prompt, one character every char_ms (one frame by default)"""
+        char_ms = 1000 / self.fps if char_ms is None else char_ms
+        t = self.now()
+        self.emit('\x1b[?25h' + sgr(color) + prompt, at=t)
+        for ch in text:
+            self.emit(ch, at=t)
+            t += char_ms
+            self.sleep_until(t)
+        self.emit('\x1b[0m\x1b[?25l', at=t)
+
+    def run(self, argv, timeout=15):
+        """Run a real command on the pty, queueing its output as it arrives"""
+        self.newline()
+        for chunk in read_output(argv, self.cols, self.rows, self.env, timeout):
+            self.emit(chunk)
+
+    def hermes(self, args, timeout=15):
+        self.run(['node', HERMES] + list(args) + ['--local'], timeout)
+
+    def start(self, play):
+        self._start = time.monotonic()
+
+        def produce():
+            try:
+                play(self)
+            except BaseException as e:
+                self.error = e
+            finally:
+                self.queue.put((self.now(), None))
+
+        self._thread = threading.Thread(target=produce, daemon=True)
+        self._thread.start()
+
+    def frames(self, parser, record=None):
+        """
+        Consumer side: feed queued output to a vt.Parser and yield each frame
+        number once the parser holds that frame's state; record(ms, data)
+        sees the raw output too, and '' where the session ends. Ends with
+        the session, re-raising anything the producer raised.
+        """
+        frame = 0
+        while True:
+            ms, data = self.queue.get()
+            while frame * 1000 / self.fps + SNAP_MS < ms:
+                yield frame
+                frame += 1
+            if record is not None:
+                record(ms, data or '')
+            if data is None:
+                break
+            parser.feed(data)
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,59 @@
+"""
+Memoized text measurement. Advances come from a per-glyph table filled once
+per font; whole-string widths (cursor offsets, segment advances) go through
+a bounded LRU, since the same strings are measured thousands of times per video.
+"""
+from collections import OrderedDict
+
+
+class TextMeasurer:
+    """Pixel widths for one font, with hit/miss counters."""
+
+    def __init__(self, font, maxsize=4096):
+        self.font = font
+        self.maxsize = maxsize
+        self._advances = {}
+        self._widths = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def advance(self, ch):
+        """Pen advance of one glyph"""
+        adv = self._advances.get(ch)
+        if adv is None:
+            adv = self._advances[ch] = self.font.getlength(ch)
+        return adv
+
+    def width(self, text):
+        """Sum of glyph advances — the pen offset after drawing text"""
+        w = self._widths.get(text)
+        if w is not None:
+            self._widths.move_to_end(text)
+            self.hits += 1
+            return w
+        self.misses += 1
+        w = self._widths[text] = sum(self.advance(ch) for ch in text)
+        if len(self._widths) > self.maxsize:
+            self._widths.popitem(last=False)
+        return w
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'cached': len(self._widths),
+            'glyphs': len(self._advances),
+        }
+
+
+_measurers = {}
+
+
+def measurer_for(font):
+    """The shared TextMeasurer for a font object"""
+    m = _measurers.get(id(font))
+    if m is None or m.font is not font:
+        m = _measurers[id(font)] = TextMeasurer(font)
+    return m
@@ -0,0 +1,141 @@
+"""
+NumPy framebuffer backend for the terminal grid.
+Same damage tracking as raster.FrameRenderer, but the framebuffer is one
+(h, w, 3) uint8 array reused for the whole video, glyphs are composited with
+Pillow's own paste-with-mask arithmetic (so pixels match the Pillow backend),
+and each frame comes out as planar YUV420 ready for `-pix_fmt yuv420p` input.
+Only the rows touched since the previous frame are converted to YUV again.
+"""
+from .chrome import BG
+from .yuv import YUV420, np, require_numpy
+
+
+class NumpyFrameRenderer:
+    """Drop-in for FrameRenderer that returns I420 planes instead of PIL images."""
+
+    pix_fmt = 'yuv420p'
+
+    def __init__(self, size, chrome, atlas, top, left, line_h, cursor_size, cursor_color, bg=BG):
+        require_numpy()
+        self.size = size
+        self.chrome = chrome
+        self.atlas = atlas
+        self.top = top
+        self.left = left
+        self.line_h = line_h
+        self.cursor_size = cursor_size
+        self.cursor_color = np.array(cursor_color, np.uint8)
+        self.bg = np.array(bg, np.uint8)
+        width, height = size
+        self.fb = np.empty((height, width, 3), np.uint8)
+        self.yuv = YUV420(size)
+        self.title = None
+        self.rows = []
+        self.cursor = None
+        self.max_rows = max(-(-(size[1] - 1 - top) // line_h), 0)  # rows starting above the bottom border
+        self.repainted = 0
+        self._valid = False
+        self._span = None  # (top, bottom) rows touched this frame
+        self._chromes = {}
+        self._glyphs = {}  # (glyph, color) -> (inverse mask, premultiplied color, (dx, dy)) or None
+
+    def reset(self):
+        self._valid = False
+
+    def _chrome(self, title):
+        layer = self._chromes.get(title)
+        if layer is None:
+            if len(self._chromes) >= 32:
+                self._chromes.clear()
+            layer = self._chromes[title] = np.asarray(self.chrome.layer(self.size, title))
+        return layer
+
+    def _touch(self, top, bottom):
+        if self._span is None:
+            self._span = (top, bottom)
+        else:
+            self._span = (min(self._span[0], top), max(self._span[1], bottom))
+
+    def _glyph(self, ch, color):
+        key = (ch, color)
+        if key in self._glyphs:
+            return self._glyphs[key]
+        entry = self.atlas._mask(ch)
+        if entry is not None:
+            mask, offset = entry
+            m = np.asarray(mask, np.int32)[:, :, None]
+            entry = (255 - m, m * np.array(color, np.int32), offset)
+        self._glyphs[key] = entry
+        return entry
+
+    def _draw_text(self, x, y, text, color):
+        fb = self.fb
+        height, width = fb.shape[:2]
+        advance = self.atlas.advance
+        for ch in text:
+            g = self._glyph(ch, color)
+            if g is not None:
+                inv, premul, (dx, dy) = g
+                x0, y0 = round(x) + dx, y + dy
+                gh, gw = inv.shape[:2]
+                cx0, cy0 = max(x0, 0), max(y0, 0)
+                cx1, cy1 = min(x0 + gw, width), min(y0 + gh, height)
+                if cx0 < cx1 and cy0 < cy1:
+                    region = fb[cy0:cy1, cx0:cx1]
+                    sl = (slice(cy0 - y0, cy1 - y0), slice(cx0 - x0, cx1 - x0))
+                    # DIV255(dst * (255 - m) + src * m), as in Pillow's Paste.c
+                    v = region * inv[sl] + premul[sl] + 128
+                    region[...] = ((v >> 8) + v) >> 8
+                    self._touch(cy0, cy1)
+            x += advance(ch)
+        return x
+
+    def render(self, title, rows, cursor=None):
+        """Same arguments as FrameRenderer.render(); returns a copy of the YUV420 planes."""
+        if not self._valid or title != self.title:
+            np.copyto(self.fb, self._chrome(title))
+            self.title = title
+            self.rows = []
+            self.cursor = None
+            self._valid = True
+            self._touch(0, self.size[1])
+
+        # Rows starting below the window are never compared or drawn
+        rows = [tuple(r) for r in rows[:self.max_rows]]
+        prev = self.rows
+        dirty = set()
+        for i in range(max(len(rows), len(prev))):
+            if i >= len(rows) or i >= len(prev) or rows[i] != prev[i]:
+                dirty.add(i)
+        if cursor != self.cursor:
+            if self.cursor is not None:
+                dirty.add(self.cursor[0])
+            if cursor is not None:
+                dirty.add(cursor[0])
+
+        width, height = self.size
+        for i in sorted(dirty):
+            y = self.top + i * self.line_h
+            if y >= height - 1:
+                continue
+            self.fb[y:min(y + self.line_h, height - 1), 1:width - 1] = self.bg
+            self._touch(y, min(y + self.line_h, height - 1))
+            if i < len(rows):
+                x = self.left
+                for text, color in rows[i]:
+                    x = self._draw_text(x, y, text, color)
+        self.repainted += len(dirty)
+
+        if cursor is not None and cursor[0] in dirty:
+            row, x = cursor
+            y = self.top + row * self.line_h
+            w, h = self.cursor_size
+            self.fb[max(y, 0):y + h, max(x, 0):x + w] = self.cursor_color
+            self._touch(y, y + h)
+
+        self.rows = rows
+        self.cursor = cursor
+        if self._span is not None:
+            self.yuv.convert(self.fb, *self._span)
+            self._span = None
+        return self.yuv.planes.copy()
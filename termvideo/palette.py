@@ -0,0 +1,107 @@
+"""
+Indexed-color ('P' mode) frames with one fixed palette.
+
+Every frame is drawn from a handful of colors — the window chrome, the text
+palette and the 16 ANSI colors — plus the anti-aliasing shades between text
+and its background, so a precomputed 256-entry palette covers it exactly
+enough and a frame is one byte per pixel instead of three. Glyph tiles are
+composited over the background once and quantized; after that a frame is
+built by copying palette indices, and goes to ffmpeg as `pal8` (GIF and APNG
+use the palette as is).
+"""
+from PIL import Image
+
+from .chrome import BAR_BG, BG, BORDER, GREEN, MUTED, RED, YELLOW
+from .glyphs import GlyphAtlas
+from .raster import FrameRenderer
+from .scenefile import PALETTE
+from .vt import ANSI
+
+# Anti-aliasing shades between each text color and the background it sits on
+SHADES = 10
+
+
+def _ramp(bg, fg, n):
+    return [tuple(b + (f - b) * k // (n + 1) for b, f in zip(bg, fg)) for k in range(1, n + 1)]
+
+
+def default_colors(shades=SHADES):
+    """Chrome, text and ANSI colors, their shades over BG, and the title's over BAR_BG"""
+    text = list(dict.fromkeys([PALETTE['text'], MUTED, PALETTE['faint'], PALETTE['accent'],
+                               RED, YELLOW, GREEN] + ANSI))
+    colors = [BG, BAR_BG, BORDER] + text
+    for fg in text:
+        colors += _ramp(BG, fg, shades)
+    colors += _ramp(BAR_BG, MUTED, shades)
+    return list(dict.fromkeys(colors))
+
+
+class Palette:
+    """A fixed palette of at most 256 RGB colors."""
+
+    def __init__(self, colors=None):
+        self.colors = colors or default_colors()
+        if len(self.colors) > 256:
+            raise ValueError(f'{len(self.colors)} colors do not fit an 8-bit palette')
+        flat = [c for rgb in self.colors for c in rgb]
+        self.image = Image.new('P', (1, 1))
+        self.image.putpalette(flat + flat[:3] * (256 - len(self.colors)))
+        self._index = {}
+
+    def index(self, rgb):
+        """Palette index of the nearest color"""
+        i = self._index.get(rgb)
+        if i is None:
+            i = self._index[rgb] = min(range(len(self.colors)), key=lambda i: sum(
+                (a - b) ** 2 for a, b in zip(self.colors[i], rgb)))
+        return i
+
+    def quantize(self, img):
+        """RGB image -> 'P' image on this palette, nearest color, no dithering"""
+        return img.quantize(palette=self.image, dither=Image.Dither.NONE)
+
+
+class PaletteAtlas(GlyphAtlas):
+    """
+    GlyphAtlas whose tiles are 'P' images: each glyph is blended over `bg`
+    once, quantized, and pasted through a hard mask of its inked pixels.
+    """
+
+    def __init__(self, atlas, palette, bg=BG):
+        super().__init__(atlas.font, atlas.measure)
+        self._masks = atlas._masks  # rasterized glyphs are shared with the RGB atlas
+        self.palette = palette
+        self.bg = bg
+
+    def glyph(self, ch, color):
+        key = (ch, color)
+        if key in self._tiles:
+            return self._tiles[key]
+        entry = self._mask(ch)
+        if entry is not None:
+            mask, offset = entry
+            rgb = Image.composite(Image.new('RGB', mask.size, color), Image.new('RGB', mask.size, self.bg), mask)
+            entry = (self.palette.quantize(rgb), mask.point(lambda v: 255 if v else 0), offset)
+        self._tiles[key] = entry
+        return entry
+
+
+class PaletteFrameRenderer(FrameRenderer):
+    """FrameRenderer on a 'P' framebuffer; frames come out as palette images for `pal8` input."""
+
+    pix_fmt = 'pal8'
+
+    def __init__(self, size, chrome, atlas, top, left, line_h, cursor_size, cursor_color, bg=BG,
+                 palette=None):
+        self.palette = palette or Palette()
+        super().__init__(size, chrome, PaletteAtlas(atlas, self.palette, bg), top, left, line_h,
+                         cursor_size, self.palette.index(cursor_color), self.palette.index(bg))
+        self._chromes = {}
+
+    def _background(self, title):
+        layer = self._chromes.get(title)
+        if layer is None:
+            if len(self._chromes) >= 32:
+                self._chromes.clear()
+            layer = self._chromes[title] = self.palette.quantize(self.chrome.layer(self.size, title))
+        return layer.copy()
@@ -0,0 +1,44 @@
+"""
+Parallel scene rendering. Scenes start from a cleared terminal, so each one
+can be rendered and encoded in its own worker process; the encoded segments
+are then stitched together in order.
+"""
+import os, shutil, tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from .encode import concat_segments
+
+
+def render_parallel(worker, tasks, outfile, jobs, encoder='auto', ffmpeg=None, cache=None, keys=None):
+    """
+    worker(task, segment_path) -> frame count; must be a module-level function
+    so it can be sent to the pool. With a SegmentCache and one content key per
+    task, cached segments are reused and only the others are rendered.
+    Returns the total frame count.
+    """
+    tmp = tempfile.mkdtemp(prefix='termvideo-')
+    try:
+        paths = [os.path.join(tmp, f'segment_{i:03d}.mp4') for i in range(len(tasks))]
+        counts = [0] * len(tasks)
+        todo = []
+        for i in range(len(tasks)):
+            hit = cache.get(keys[i]) if cache is not None else None
+            if hit is not None:
+                paths[i], counts[i] = hit
+            else:
+                todo.append(i)
+
+        if jobs > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                done = list(pool.map(worker, [tasks[i] for i in todo], [paths[i] for i in todo]))
+        else:
+            done = [worker(tasks[i], paths[i]) for i in todo]
+        for i, count in zip(todo, done):
+            counts[i] = count
+            if cache is not None:
+                paths[i] = cache.put(keys[i], paths[i], count)
+
+        concat_segments(paths, outfile, encoder, ffmpeg)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return sum(counts)
@@ -0,0 +1,148 @@
+"""
+Quick looks at a scene edit (the scripts' --preview and --sheet flags).
+
+Encoding dominates a render, so a preview keeps the renderers as they are
+and cuts what reaches the encoder: runs are resampled to PREVIEW_FPS (a
+state shown for less than one preview frame is dropped), downscaled by
+SCALE, and encoded with the fastest settings. A contact sheet is one PNG
+grid of key moments — every state held on screen for HOLD_MS or more,
+plus each scene's last frame — with a row (or more, for long scenes)
+per scene.
+"""
+import os
+
+from PIL import Image
+
+from .chrome import BG
+from .encode import open_writer
+
+PREVIEW_FPS = 10
+SCALE = 0.5
+PRESET = 'ultrafast'
+CRF = 30
+HOLD_MS = 400
+
+
+def scaled(size, scale=SCALE):
+    """size times scale, rounded down to even dimensions for yuv420p"""
+    return tuple(max(2, int(n * scale) // 2 * 2) for n in size)
+
+
+def shrink(frame, size):
+    if frame.size == size:
+        return frame
+    # Palette indices can't be averaged
+    return frame.resize(size, Image.Resampling.NEAREST if frame.mode == 'P' else Image.Resampling.BOX)
+
+
+class PreviewWriter:
+    """Resamples and downscales (frame, count) runs at `fps` into a writer at its own frame rate."""
+
+    def __init__(self, writer, fps, preview_fps, size):
+        self.writer = writer
+        self.fps = fps
+        self.preview_fps = preview_fps
+        self.size = size
+        self.frames = 0
+        self.unique = 0
+        self._written = 0
+
+    def write(self, frame, count=1):
+        self.frames += count
+        self.unique += 1
+        # Preview frames whose timestamp falls within this run
+        end = -(-self.frames * self.preview_fps // self.fps)
+        if end > self._written:
+            self.writer.write(shrink(frame, self.size), end - self._written)
+            self._written = end
+
+    def close(self):
+        self.writer.close()
+
+    def abort(self):
+        self.writer.abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def open_preview(outfile, size, fps, pix_fmt='rgb24', encoder='auto', ffmpeg=None,
+                 preview_fps=PREVIEW_FPS, scale=SCALE):
+    """open_writer() for a preview: takes full-size frames at fps, encodes small, sparse and fast"""
+    if pix_fmt == 'yuv420p':
+        raise ValueError('previews take Pillow frames, not YUV buffers')
+    small = scaled(size, scale)
+    writer = open_writer(outfile, small, min(preview_fps, fps), encoder, ffmpeg,
+                         crf=CRF, preset=PRESET, pix_fmt=pix_fmt)
+    return PreviewWriter(writer, fps, min(preview_fps, fps), small)
+
+
+def preview_path(path):
+    """terminal.mp4 -> terminal-preview.mp4"""
+    base, ext = os.path.splitext(path)
+    return base + '-preview' + ext
+
+
+class ContactSheet:
+    """Thumbnails of each scene's key moments, saved as one grid image."""
+
+    def __init__(self, fps, hold_ms=HOLD_MS, width=240, gap=8, columns=8):
+        self.fps = fps
+        self.hold = hold_ms * fps / 1000
+        self.width = width
+        self.gap = gap
+        self.columns = columns  # longer scenes wrap onto more rows
+        self.rows = []
+        self._last = None  # the current scene's last frame, unless it is already on the sheet
+
+    def scene(self):
+        """Start a new row"""
+        self._end_row()
+        self.rows.append([])
+
+    def add(self, frame, count=1):
+        if not self.rows:
+            self.rows.append([])
+        if count >= self.hold:
+            self.rows[-1].append(self._thumb(frame))
+            self._last = None
+        else:
+            self._last = frame
+
+    def sink(self, write):
+        """write(frame, count), also adding each run to the sheet"""
+        def tee(frame, count=1):
+            self.add(frame, count)
+            write(frame, count)
+        return tee
+
+    def _thumb(self, frame):
+        w, h = frame.size
+        return frame.convert('RGB').resize((self.width, round(h * self.width / w)), Image.Resampling.BOX)
+
+    def _end_row(self):
+        if self._last is not None and self.rows:
+            self.rows[-1].append(self._thumb(self._last))
+        self._last = None
+
+    def save(self, path):
+        self._end_row()
+        scenes = [row for row in self.rows if row]
+        if not scenes:
+            raise ValueError('no frames for a contact sheet')
+        rows = [row[i:i + self.columns] for row in scenes for i in range(0, len(row), self.columns)]
+        th = max(t.height for row in rows for t in row)
+        cols = max(len(row) for row in rows)
+        g = self.gap
+        sheet = Image.new('RGB', (g + cols * (self.width + g), g + len(rows) * (th + g)), BG)
+        for r, row in enumerate(rows):
+            for c, thumb in enumerate(row):
+                sheet.paste(thumb, (g + c * (self.width + g), g + r * (th + g)))
+        sheet.save(path)
+        return len(scenes), sum(len(row) for row in rows)
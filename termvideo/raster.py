@@ -0,0 +1,82 @@
+"""
+Incremental frame rendering for the terminal grid.
+The previous framebuffer is kept between frames and only the line rows and
+cursor cell that changed are repainted.
+"""
+from .chrome import BG
+
+
+class FrameRenderer:
+    """Damage-tracked renderer: chrome + rows of (text, color) segments + cursor."""
+
+    pix_fmt = 'rgb24'  # what render() returns, for FFmpegWriter
+
+    def __init__(self, size, chrome, atlas, top, left, line_h, cursor_size, cursor_color, bg=BG):
+        self.size = size
+        self.chrome = chrome
+        self.atlas = atlas
+        self.top = top
+        self.left = left
+        self.line_h = line_h
+        self.cursor_size = cursor_size
+        self.cursor_color = cursor_color
+        self.bg = bg
+        self.fb = None
+        self.title = None
+        self.rows = []
+        self.cursor = None
+        self.max_rows = max(-(-(size[1] - 1 - top) // line_h), 0)  # rows starting above the bottom border
+        self.repainted = 0  # rows repainted since construction, for profiling
+
+    def reset(self):
+        """Forget the previous frame; the next render() repaints everything"""
+        self.fb = None
+
+    def _background(self, title):
+        return self.chrome.frame(self.size, title)
+
+    def render(self, title, rows, cursor=None):
+        """
+        rows: list of segment lists [(text, color), ...], top to bottom
+        cursor: None or (row, x) — x in pixels
+        Returns a copy of the framebuffer.
+        """
+        if self.fb is None or title != self.title:
+            self.fb = self._background(title)
+            self.title = title
+            self.rows = []
+            self.cursor = None
+
+        # Rows starting below the window are never compared or drawn
+        rows = [tuple(r) for r in rows[:self.max_rows]]
+        prev = self.rows
+        dirty = set()
+        for i in range(max(len(rows), len(prev))):
+            if i >= len(rows) or i >= len(prev) or rows[i] != prev[i]:
+                dirty.add(i)
+        if cursor != self.cursor:
+            if self.cursor is not None:
+                dirty.add(self.cursor[0])
+            if cursor is not None:
+                dirty.add(cursor[0])
+
+        width, height = self.size
+        for i in sorted(dirty):
+            y = self.top + i * self.line_h
+            if y >= height - 1:
+                continue
+            # Clear inside the 1px window border, then redraw the row
+            self.fb.paste(self.bg, (1, y, width - 1, min(y + self.line_h, height - 1)))
+            if i < len(rows):
+                self.atlas.draw_segments(self.fb, (self.left, y), rows[i])
+        self.repainted += len(dirty)
+
+        if cursor is not None and cursor[0] in dirty:
+            row, x = cursor
+            y = self.top + row * self.line_h
+            w, h = self.cursor_size
+            self.fb.paste(self.cursor_color, (x, y, x + w, y + h))
+
+        self.rows = rows
+        self.cursor = cursor
+        return self.fb.copy()
@@ -0,0 +1,152 @@
+"""
+Batch renderer for scene files. One process renders any number of scene
+files; fonts, window chrome, glyph atlases and text measurements are cached
+across all of them, so regenerating every video together costs little more
+than drawing their frames.
+"""
+import math
+
+from .chrome import BAR_H, PADDING, ChromeCache
+from .encode import QueuedWriter, open_writer, resolve_encoder
+from .fonts import get_font
+from .frames import coalesce
+from .glyphs import GlyphAtlas
+from .hermes import run_hermes
+from .palette import PaletteFrameRenderer
+from .parallel import render_parallel
+from .preview import open_preview
+from .raster import FrameRenderer
+from .scenefile import PALETTE, compile_scene
+from .screen import Screen
+from .scrollback import viewport_rows
+from .segcache import font_id, segment_key
+from .timeline import Timeline
+
+# Events up to this far past a frame's timestamp land on that frame, so
+# frame-based timings written as 266.667 ms don't slip by one frame
+SNAP_MS = 0.01
+
+
+class BatchRenderer:
+    """Renders scene-file specs, sharing caches between them."""
+
+    def __init__(self, encoder='auto', ffmpeg=None, run=run_hermes, paletted=False, preview=False):
+        self.encoder = encoder
+        self.ffmpeg = ffmpeg
+        self.run = run
+        self.paletted = paletted  # draw 8-bit palette frames (pal8) instead of RGB
+        self.preview = preview  # encode small, sparse and fast (see preview.py)
+        self._chromes = {}
+        self._atlases = {}
+        self._renderers = {}
+
+    def chrome(self, title_size):
+        if title_size not in self._chromes:
+            self._chromes[title_size] = ChromeCache(get_font(title_size), bar_h=BAR_H)
+        return self._chromes[title_size]
+
+    def atlas(self, font_size):
+        if font_size not in self._atlases:
+            self._atlases[font_size] = GlyphAtlas(get_font(font_size))
+        return self._atlases[font_size]
+
+    def renderer(self, spec):
+        """One damage-tracking renderer per window geometry"""
+        key = (spec['width'], spec['height'], spec['font_size'], spec['title_size'],
+               spec['line_height'], tuple(spec['cursor']))
+        if key not in self._renderers:
+            self._renderers[key] = (PaletteFrameRenderer if self.paletted else FrameRenderer)(
+                (spec['width'], spec['height']), self.chrome(spec['title_size']),
+                self.atlas(spec['font_size']), top=BAR_H + PADDING, left=PADDING,
+                line_h=spec['line_height'], cursor_size=tuple(spec['cursor']),
+                cursor_color=PALETTE['accent'])
+        return self._renderers[key]
+
+    def compile(self, spec, run=None):
+        """Compile every scene of a spec — runs its real CLI commands, in order"""
+        if 'compiled' in spec:
+            return spec['compiled']
+        run = run or self.run
+        return [compile_scene(spec, scene, run=run) for scene in spec['scenes']]
+
+    def scene_frames(self, spec, title, events, duration_ms, start_ms=0, end_ms=None):
+        """Lazy (frame, count) runs for one compiled scene, or its [start_ms, end_ms) slice"""
+        return coalesce(self._scene_states(spec, title, events, duration_ms, start_ms, end_ms))
+
+    def _scene_states(self, spec, title, events, duration_ms, start_ms, end_ms):
+        fps = spec['fps']
+        renderer = self.renderer(spec)
+        atlas = self.atlas(spec['font_size'])
+        total = int((duration_ms + SNAP_MS) * fps / 1000)
+        first = math.ceil(start_ms * fps / 1000)
+        last = total if end_ms is None else min(total, math.ceil(end_ms * fps / 1000))
+        if first >= last:
+            return
+
+        rows = viewport_rows(spec['height'], spec['line_height'], BAR_H + PADDING, PADDING)
+        timeline = Timeline(events, Screen(title, rows), Screen.apply, Screen.copy)
+        screen, idx = timeline.state_at(first * 1000 / fps + SNAP_MS)
+
+        def draw(frame):
+            # Only the window's rows are drawn, however much has scrolled past
+            lines, cursor = screen.view()
+            if cursor is not None and (frame // (fps // 2)) % 2 == 0:
+                row, col = cursor
+                text = ''.join(t for t, _ in lines[row]) if row < len(lines) else ''
+                cursor = (row, PADDING + round(atlas.text_width(text[:col].ljust(col))))
+            else:
+                cursor = None
+            return renderer.render(title, lines, cursor)
+
+        for frame in range(first, last):
+            now = frame * 1000 / fps + SNAP_MS
+            while idx < len(events) and events[idx][0] <= now:
+                screen.apply(events[idx])
+                idx += 1
+            blink = screen.cursor is not None and (frame // (fps // 2)) % 2 == 0
+            yield (idx, blink), lambda: draw(frame), 1
+
+    def scene_key(self, spec, scene):
+        """Content hash of one compiled scene as it renders under spec"""
+        geometry = tuple(spec[k] if k != 'cursor' else tuple(spec[k]) for k in
+                         ('width', 'height', 'fps', 'font_size', 'title_size', 'line_height', 'cursor'))
+        fonts = (font_id(get_font(spec['font_size'])), font_id(get_font(spec['title_size'])))
+        return segment_key(scene, geometry, fonts, sorted(PALETTE.items()), BAR_H, PADDING, self.paletted,
+                           resolve_encoder(self.encoder))
+
+    def render(self, spec, outfile=None, cache=None, sheet=None):
+        """
+        Render a whole spec to its output file; returns (frames, rendered).
+        With a SegmentCache each scene is its own segment and unchanged
+        scenes are reused instead of re-rendered; a preview.ContactSheet
+        gets every scene's frames (and so renders in one pass).
+        """
+        outfile = outfile or spec['output']
+        scenes = self.compile(spec)
+        size = (spec['width'], spec['height'])
+        pix_fmt = self.renderer(spec).pix_fmt
+        if cache is None or self.preview or sheet is not None:
+            opener = open_preview if self.preview else open_writer
+            with QueuedWriter(opener(outfile, size, spec['fps'], pix_fmt=pix_fmt, encoder=self.encoder,
+                                     ffmpeg=self.ffmpeg)) as writer:
+                write = sheet.sink(writer.write) if sheet is not None else writer.write
+                for title, events, duration in scenes:
+                    if sheet is not None:
+                        sheet.scene()
+                    for frame, count in self.scene_frames(spec, title, events, duration):
+                        write(frame, count)
+            return writer.frames, writer.unique
+
+        rendered = 0
+
+        def encode(scene, path):
+            nonlocal rendered
+            with QueuedWriter(open_writer(path, size, spec['fps'], self.encoder, self.ffmpeg, pix_fmt=pix_fmt)) as writer:
+                for frame, count in self.scene_frames(spec, *scene):
+                    writer.write(frame, count)
+            rendered += writer.unique
+            return writer.frames
+
+        keys = [self.scene_key(spec, scene) for scene in scenes]
+        frames = render_parallel(encode, scenes, outfile, 1, self.encoder, self.ffmpeg, cache=cache, keys=keys)
+        return frames, rendered
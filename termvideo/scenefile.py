@@ -0,0 +1,183 @@
+"""
+Declarative scene files for the terminal videos.
+
+A scene file is JSON:
+
+    {
+      "output": "../terminal.mp4",          relative to the scene file
+      "width": 720, "height": 420, "fps": 30,
+      "font_size": 14, "title_size": 10, "line_height": 22,
+      "cursor": [9, 17],                    cursor block width, height
+      "prompt_color": "accent",             color of the "$ " prompt
+      "scenes": [
+        {"title": "hermes — hire", "actions": [
+          {"type": "hermes browse --tag research", "char_ms": 35, "space_ms": 15, "after_ms": 400},
+          {"line": "  ↳ scanning marketplace...", "color": "faint", "after_ms": 600},
+          {"line": [["  status: ", "faint"], ["● online", "accent"]]},
+          {"blank": true, "after_ms": 200},
+          {"run": ["browse", "--tag", "code"], "line_ms": 133},
+          {"pause": 2500},
+          {"clear": true}
+        ]}
+      ]
+    }
+
+`type` types a command on a new line with a blinking cursor, one character
+every `char_ms` (default one frame) plus `space_ms` after spaces. `run` types
+`hermes <args>` (or its own "text"), waits `wait_ms` (default 8 frames), then
+runs the real hermes.js and prints its output one line every `line_ms`
+(default 4 frames). Every action except `pause` accepts "after_ms", a hold
+before the next action. Colors are palette names or "#rrggbb".
+"""
+import json, os
+
+from .hermes import run_hermes
+from .vt import styled
+
+PALETTE = {
+    'bg': (8, 8, 10),
+    'text': (232, 232, 232),
+    'muted': (136, 136, 136),
+    'faint': (68, 68, 68),
+    'accent': (52, 211, 153),
+    'red': (255, 95, 87),
+    'yellow': (255, 189, 46),
+    'green': (40, 200, 64),
+}
+
+DEFAULTS = {
+    'output': None,
+    'width': 720,
+    'height': 420,
+    'fps': 30,
+    'font_size': 14,
+    'title_size': 10,
+    'line_height': 22,
+    'cursor': [9, 17],
+    'prompt_color': 'accent',
+}
+
+ACTIONS = ('type', 'run', 'line', 'blank', 'pause', 'clear')
+
+
+def color(value):
+    """Palette name or #rrggbb -> RGB tuple"""
+    if isinstance(value, str) and value.startswith('#') and len(value) == 7:
+        return tuple(int(value[i:i+2], 16) for i in (1, 3, 5))
+    try:
+        return PALETTE[value]
+    except (KeyError, TypeError):
+        raise ValueError(f'unknown color {value!r}') from None
+
+
+def load(path):
+    """Read and validate a scene file; returns the spec with defaults filled in"""
+    with open(path, encoding='utf-8') as f:
+        return parse(json.load(f), path)
+
+
+def parse(data, path):
+    """Validate scene-file data read from (or standing in for) path"""
+    spec = dict(DEFAULTS)
+    spec.update(data)
+    spec['path'] = os.path.abspath(path)
+    if spec['output'] is None:
+        spec['output'] = os.path.splitext(os.path.basename(path))[0] + '.mp4'
+    spec['output'] = os.path.join(os.path.dirname(spec['path']), spec['output'])
+
+    if not spec.get('scenes'):
+        raise ValueError(f'{path}: no scenes')
+    for n, scene in enumerate(spec['scenes'], 1):
+        if 'title' not in scene:
+            raise ValueError(f'{path}: scene {n} has no title')
+        for i, action in enumerate(scene.get('actions', []), 1):
+            kinds = [k for k in ACTIONS if k in action]
+            if len(kinds) != 1:
+                raise ValueError(f'{path}: scene {n} action {i} needs exactly one of {", ".join(ACTIONS)}')
+    return spec
+
+
+def segments(value, default='muted'):
+    """line value (str or [[text, color], ...]) -> tuple of (text, rgb)"""
+    if isinstance(value, str):
+        return ((value, color(default)),)
+    return tuple((text, color(c)) for text, c in value)
+
+
+def commands(spec):
+    """[(args, settle_ms), ...] for every `run` action, settle_ms being the hold after it"""
+    out = []
+    for scene in spec['scenes']:
+        actions = scene.get('actions', [])
+        for i, action in enumerate(actions):
+            if 'run' not in action:
+                continue
+            settle = action.get('after_ms', 0)
+            for after in actions[i+1:]:
+                if 'pause' not in after:
+                    break
+                settle += after['pause']
+            out.append((action['run'], settle))
+    return out
+
+
+def compile_scene(spec, scene, run=run_hermes):
+    """
+    Turn a scene into (title, events, duration_ms). Events are
+    (time_ms, op, data) for Screen.apply(); `run` resolves real CLI output,
+    whose ANSI styling is kept (plain text is muted, dim text faint).
+    """
+    frame_ms = 1000 / spec['fps']
+    prompt = color(spec['prompt_color'])
+    text_color = PALETTE['text']
+    events = []
+    t = 0
+    rows = 0
+
+    def emit(op, data=None):
+        events.append((t, op, data))
+
+    def type_line(text, char_ms, space_ms):
+        nonlocal t, rows
+        row = rows
+        rows += 1
+        for i, ch in enumerate(text):
+            line = (('$ ', prompt), (text[:i+1], text_color))
+            if i == 0:
+                emit('append', line)
+            else:
+                emit('set', (row, line))
+            emit('cursor', (row, 2 + i + 1))
+            t += char_ms + (space_ms if ch == ' ' else 0)
+        emit('cursor', None)
+
+    for action in scene.get('actions', []):
+        if 'pause' in action:
+            t += action['pause']
+            continue
+
+        if 'type' in action or 'run' in action:
+            text = action.get('text') or action.get('type')
+            if text is None:
+                text = 'hermes ' + ' '.join(f'"{a}"' if ' ' in a else a for a in action['run'])
+            type_line(text, action.get('char_ms', frame_ms), action.get('space_ms', 0))
+        if 'run' in action:
+            t += action.get('wait_ms', 8 * frame_ms)
+            for line in styled(run(action['run']), PALETTE['muted'], PALETTE['faint']):
+                if any(text.strip() for text, _ in line):
+                    emit('append', line)
+                    rows += 1
+                    t += action.get('line_ms', 4 * frame_ms)
+        elif 'line' in action:
+            emit('append', segments(action['line'], action.get('color', 'muted')))
+            rows += 1
+        elif 'blank' in action:
+            emit('append', ())
+            rows += 1
+        elif 'clear' in action:
+            emit('clear')
+            rows = 0
+
+        t += action.get('after_ms', 0)
+
+    return scene['title'], events, t
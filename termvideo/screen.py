@@ -0,0 +1,47 @@
+"""
+Line-based terminal screen model for compiled scenes.
+"""
+from .scrollback import Scrollback
+
+
+class Screen:
+    """
+    A window `rows` lines tall over a scrollback of (text, color) segment rows,
+    plus an optional (line, col) cursor. Events address lines by their index
+    in the scrollback; view() maps them to window rows.
+    """
+
+    def __init__(self, title='', rows=24):
+        self.title = title
+        self.lines = Scrollback(rows)
+        self.cursor = None
+
+    def copy(self):
+        other = Screen(self.title)
+        other.lines = self.lines.copy()
+        other.cursor = self.cursor
+        return other
+
+    def apply(self, event):
+        """event: (time_ms, op, data)"""
+        _, op, data = event
+        if op == 'clear':
+            self.lines.clear()
+            self.cursor = None
+        elif op == 'append':
+            self.lines.append(data)
+        elif op == 'set':
+            row, segments = data
+            self.lines[row] = segments
+        elif op == 'cursor':
+            self.cursor = data
+        else:
+            raise ValueError(f'unknown screen op: {op!r}')
+
+    def view(self):
+        """(visible rows, cursor as (window row, col) or None if it is off screen)"""
+        cursor = self.cursor
+        if cursor is not None:
+            row = self.lines.screen_row(cursor[0])
+            cursor = None if row is None else (row, cursor[1])
+        return self.lines.view(), cursor
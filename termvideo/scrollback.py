@@ -0,0 +1,78 @@
+"""
+Fixed-height terminal screen over a ring-buffer scrollback.
+Lines are appended as output arrives; once there are more than fit in the
+window, the view scrolls like a real terminal and older lines fall into a
+bounded history. Renderers only ever see the visible rows, so per-frame
+cost stays the same however long a command's output is.
+"""
+
+
+def viewport_rows(height, line_h, top, bottom):
+    """Whole text rows that fit between the top offset and the bottom padding"""
+    return max((height - top - bottom) // line_h, 1)
+
+
+class Scrollback:
+    """
+    Lines with absolute indices: 0 is the first line since the last clear()
+    and len() is one past the newest, so a row being typed into stays
+    addressable while output scrolls it up. Only the newest `history` lines
+    are kept; indexing an older one raises IndexError.
+    """
+
+    def __init__(self, rows, history=1000):
+        self.rows = rows
+        self.history = max(history, rows)
+        self.clear()
+
+    def clear(self):
+        self._ring = []
+        self.start = 0  # oldest line still kept
+        self.end = 0
+
+    def copy(self):
+        other = Scrollback.__new__(Scrollback)
+        other.rows, other.history = self.rows, self.history
+        other._ring = list(self._ring)
+        other.start, other.end = self.start, self.end
+        return other
+
+    def __len__(self):
+        return self.end
+
+    def _slot(self, i):
+        if i < 0:
+            i += self.end
+        if not self.start <= i < self.end:
+            raise IndexError(f'line {i} is not in the scrollback')
+        return i % self.history
+
+    def __getitem__(self, i):
+        return self._ring[self._slot(i)]
+
+    def __setitem__(self, i, line):
+        self._ring[self._slot(i)] = line
+
+    def append(self, line):
+        slot = self.end % self.history
+        if slot < len(self._ring):
+            self._ring[slot] = line  # overwrite the oldest line
+            self.start += 1
+        else:
+            self._ring.append(line)
+        self.end += 1
+
+    @property
+    def top(self):
+        """Index of the first visible line (the view is always scrolled to the bottom)"""
+        return max(self.end - self.rows, self.start)
+
+    def view(self):
+        """The visible rows, top to bottom"""
+        ring, n = self._ring, self.history
+        return [ring[i % n] for i in range(self.top, self.end)]
+
+    def screen_row(self, i):
+        """Window row of line i, or None once it has scrolled out of view"""
+        row = i - self.top
+        return row if 0 <= row < self.rows else None
@@ -0,0 +1,102 @@
+"""
+Content-addressed cache of encoded video segments.
+A segment's key hashes everything that decides its pixels — the scene's
+actions, window size, fonts, palette, encoder settings and the renderer's own
+source — so an edit re-renders only the scenes it touched; unchanged segments
+are reused from disk and concatenated without re-encoding.
+"""
+import os, glob, json, shutil, hashlib, functools
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(ROOT, '.cache', 'segments')
+
+
+def _source_hash():
+    h = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py'))):
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+SOURCE_HASH = _source_hash()
+
+
+@functools.lru_cache(maxsize=None)
+def _file_hash(path, mtime):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def font_id(font):
+    """Identity of a loaded font: family, style, size and a hash of its bytes"""
+    name = font.getname() if hasattr(font, 'getname') else type(font).__name__
+    path = getattr(font, 'path', None)
+    if isinstance(path, str) and os.path.exists(path):
+        digest = _file_hash(path, os.path.getmtime(path))
+    elif hasattr(path, 'getvalue'):
+        # load_default() fonts are read from memory; never key on a repr
+        # that carries the buffer's address
+        digest = hashlib.sha256(path.getvalue()).hexdigest()
+    else:
+        digest = None
+    return (name, getattr(font, 'size', None), digest)
+
+
+def segment_key(*parts):
+    """Hash of repr()-able parts plus the termvideo sources"""
+    h = hashlib.sha256(SOURCE_HASH.encode())
+    for part in parts:
+        h.update(repr(part).encode())
+        h.update(b'\0')
+    return h.hexdigest()[:32]
+
+
+class SegmentCache:
+    """Encoded segments on disk, evicting the least recently used past maxsize."""
+
+    def __init__(self, directory=CACHE_DIR, maxsize=64):
+        self.directory = directory
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + '.mp4', base + '.json'
+
+    def get(self, key):
+        """(segment path, frame count) or None"""
+        video, meta = self._paths(key)
+        try:
+            with open(meta, encoding='utf-8') as f:
+                frames = json.load(f)['frames']
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        if not os.path.exists(video):
+            self.misses += 1
+            return None
+        os.utime(meta)
+        self.hits += 1
+        return video, frames
+
+    def put(self, key, path, frames):
+        """Move a freshly encoded segment into the cache; returns its new path"""
+        os.makedirs(self.directory, exist_ok=True)
+        video, meta = self._paths(key)
+        shutil.move(path, video)
+        with open(meta + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'frames': frames}, f)
+        os.replace(meta + '.tmp', meta)
+        self.prune()
+        return video
+
+    def prune(self):
+        metas = sorted(glob.glob(os.path.join(self.directory, '*.json')), key=os.path.getmtime)
+        for meta in metas[:max(0, len(metas) - self.maxsize)]:
+            for path in (meta, meta[:-5] + '.mp4'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -0,0 +1,45 @@
+"""
+Random-access timelines for scene action lists.
+The actions are replayed once at compile time, keeping a state snapshot
+(keyframe) every `interval` actions. The state at any millisecond is then a
+bisect over action times plus at most `interval` replayed actions, so a
+time range can be rendered without replaying the scene from zero.
+"""
+from bisect import bisect_right
+
+
+class Timeline:
+    """
+    actions: list of (time_ms, ...) tuples sorted by time
+    initial: state before the first action
+    apply(state, action): mutate state by one action
+    copy(state): independent copy of a state
+    """
+
+    def __init__(self, actions, initial, apply, copy, interval=16):
+        self.actions = actions
+        self.apply = apply
+        self.copy = copy
+        self.interval = interval
+        self.times = [a[0] for a in actions]
+
+        # Keyframe k is the state after the first k * interval actions
+        state = copy(initial)
+        self.keyframes = [copy(state)]
+        for i, action in enumerate(actions, 1):
+            apply(state, action)
+            if i % interval == 0:
+                self.keyframes.append(copy(state))
+
+    def index_at(self, ms):
+        """Number of actions that have fired at time ms"""
+        return bisect_right(self.times, ms)
+
+    def state_at(self, ms):
+        """(state, action_index) at time ms; the state is a fresh copy"""
+        n = self.index_at(ms)
+        k = n // self.interval
+        state = self.copy(self.keyframes[k])
+        for action in self.actions[k * self.interval:n]:
+            self.apply(state, action)
+        return state, n
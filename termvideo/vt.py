@@ -0,0 +1,307 @@
+"""
+Terminal emulator core: an incremental ANSI/VT100 parser writing into a
+fixed-size cell grid.
+
+Cells live in flat arrays — codepoints in an array('I'), colors as one
+attribute byte per cell indexing the grid's color table — instead of lists
+of tuples. Each row's (text, color) segments are built only after the row
+changes and are otherwise handed out as the same cached tuple, so the
+renderer's row diff is cheap for everything that stayed put.
+
+Used for real CLI output (hermes.js styles its output with SGR codes when
+FORCE_COLOR is set, see styled()) and for reading asciicast recordings.
+"""
+import re
+from array import array
+
+DEFAULT_FG = (232, 232, 232)
+# The 16 ANSI colors, leaning on the video palette (red, accent, yellow) where one fits
+ANSI = [
+    (0, 0, 0), (255, 95, 87), (52, 211, 153), (255, 189, 46),
+    (97, 175, 239), (198, 120, 221), (86, 182, 194), (204, 204, 204),
+    (102, 102, 102), (255, 123, 114), (110, 231, 183), (255, 214, 102),
+    (130, 196, 255), (222, 158, 238), (128, 216, 228), (255, 255, 255),
+]
+BLANK = ord(' ')
+
+# Complete sequences first; an escape cut off by the end of a chunk is kept for the next feed()
+TOKEN = re.compile(
+    r'\x1b\[([?0-9;]*)([@-~])|\x1b\](.*?)(?:\x07|\x1b\\)'
+    r'|(\x1b(?:\[[?0-9;]*|\].*)?\Z)'
+    r'|\x1b[@-_]|[\x00-\x1f]|[^\x00-\x1f\x1b]+', re.S)
+
+
+def xterm256(n):
+    """xterm 256-color index -> RGB"""
+    if n < 16:
+        return ANSI[n]
+    if n < 232:
+        n -= 16
+        steps = [0, 95, 135, 175, 215, 255]
+        return (steps[n // 36], steps[n // 6 % 6], steps[n % 6])
+    gray = 8 + (n - 232) * 10
+    return (gray, gray, gray)
+
+
+def sgr(color):
+    """SGR sequence selecting an RGB foreground"""
+    return '\x1b[38;2;%d;%d;%dm' % color
+
+
+class Grid:
+    """
+    cols x rows cells. `used` is how many rows from the top have been written
+    to (rows below it are not part of the output yet); `scrolled` counts the
+    lines that have scrolled off the top since the last clear, and with a
+    `scrollback` list their segments are appended to it as they go.
+    """
+
+    def __init__(self, cols, rows, fg=DEFAULT_FG, scrollback=None):
+        self.cols = cols
+        self.rows = rows
+        self.chars = array('I', [BLANK]) * (cols * rows)
+        self.attrs = bytearray(cols * rows)
+        self.colors = [fg]  # attribute byte -> RGB; 0 is the default foreground
+        self._color_ids = {fg: 0}
+        self.scrollback = scrollback
+        self.used = 0
+        self.scrolled = 0
+        self.clears = 0
+        self._segments = [()] * rows  # per-row cache, None once the row changed
+
+    def attr(self, rgb):
+        """Attribute byte for a color, adding it to the table if it is new"""
+        a = self._color_ids.get(rgb)
+        if a is None:
+            if len(self.colors) == 256:
+                raise ValueError('a grid holds at most 256 colors')
+            a = self._color_ids[rgb] = len(self.colors)
+            self.colors.append(rgb)
+        return a
+
+    def touch(self, row):
+        if row >= self.used:
+            self.used = row + 1
+
+    def put(self, row, col, ch, attr):
+        i = row * self.cols + col
+        self.chars[i] = ord(ch)
+        self.attrs[i] = attr
+        self._segments[row] = None
+        self.touch(row)
+
+    def erase(self, row, start=0, end=None):
+        """Blank cells [start, end) of a row"""
+        base = row * self.cols
+        end = self.cols if end is None else min(end, self.cols)
+        if start >= end:
+            return
+        self.chars[base + start:base + end] = array('I', [BLANK]) * (end - start)
+        self.attrs[base + start:base + end] = bytes(end - start)
+        self._segments[row] = None
+
+    def truncate(self, rows):
+        """Blank every row from `rows` down; the output now ends there"""
+        for row in range(rows, self.used):
+            self.erase(row)
+        self.used = min(self.used, rows)
+
+    def clear(self):
+        self.truncate(0)
+        self.scrolled = 0
+        self.clears += 1
+        if self.scrollback is not None:
+            self.scrollback.clear()
+
+    def scroll(self):
+        """Move everything up a line; the top row goes to the scrollback"""
+        if self.scrollback is not None:
+            self.scrollback.append(self.segments(0))
+        n, cols = len(self.chars), self.cols
+        self.chars[:n - cols] = self.chars[cols:]
+        self.attrs[:n - cols] = self.attrs[cols:]
+        self._segments[:-1] = self._segments[1:]
+        self._segments[-1] = None
+        self.erase(self.rows - 1)
+        self.scrolled += 1
+
+    def segments(self, row):
+        """Row as a tuple of (text, color) runs, trailing default-colored blanks dropped"""
+        segs = self._segments[row]
+        if segs is not None:
+            return segs
+        base = row * self.cols
+        chars, attrs = self.chars, self.attrs
+        end = base + self.cols
+        while end > base and chars[end - 1] == BLANK and attrs[end - 1] == 0:
+            end -= 1
+        out = []
+        i = base
+        while i < end:
+            a = attrs[i]
+            j = i + 1
+            while j < end and attrs[j] == a:
+                j += 1
+            out.append((''.join(map(chr, chars[i:j])), self.colors[a]))
+            i = j
+        segs = self._segments[row] = tuple(out)
+        return segs
+
+    def lines(self):
+        """Segments of every used row, top to bottom"""
+        return [self.segments(row) for row in range(self.used)]
+
+
+class Parser:
+    """
+    Incremental ANSI/VT100 interpreter over a Grid: printing with autowrap,
+    CR/LF/BS/TAB, scrolling, CUP/CUU/CUD/CUF/CUB/CHA, ED, EL, SGR colors
+    (16, 256 and 24-bit, plus dim), cursor show/hide and OSC titles.
+    Escape sequences may be split across feed() calls.
+    """
+
+    def __init__(self, grid, dim=None, title=''):
+        self.grid = grid
+        self.dim_color = dim  # default-colored dim text; other dim colors are darkened
+        self.title = title
+        self.row = self.col = 0
+        self.fg = None  # None: the grid's default
+        self.dim = False
+        self.attr = 0
+        self.visible = True
+        self._pending = ''
+
+    def _set_attr(self):
+        if self.fg is None and not self.dim:
+            self.attr = 0
+            return
+        fg = self.fg or self.grid.colors[0]
+        if self.dim:
+            fg = self.dim_color if self.fg is None and self.dim_color else tuple(c // 2 for c in fg)
+        self.attr = self.grid.attr(fg)
+
+    def _down(self):
+        if self.row == self.grid.rows - 1:
+            self.grid.scroll()
+        else:
+            self.row += 1
+
+    def _print(self, text):
+        grid, cols = self.grid, self.grid.cols
+        for ch in text:
+            if self.col >= cols:
+                self._down()
+                self.col = 0
+            grid.put(self.row, self.col, ch, self.attr)
+            self.col += 1
+
+    def _sgr(self, params):
+        codes = [int(p) if p else 0 for p in params.split(';')] if params else [0]
+        i = 0
+        while i < len(codes):
+            c = codes[i]
+            if c == 0:
+                self.fg, self.dim = None, False
+            elif c == 2:
+                self.dim = True
+            elif c == 22:
+                self.dim = False
+            elif c == 39:
+                self.fg = None
+            elif 30 <= c <= 37:
+                self.fg = ANSI[c - 30]
+            elif 90 <= c <= 97:
+                self.fg = ANSI[c - 90 + 8]
+            elif c == 38 and i + 1 < len(codes):
+                if codes[i + 1] == 2 and i + 4 < len(codes):
+                    self.fg = tuple(codes[i + 2:i + 5])
+                    i += 4
+                elif codes[i + 1] == 5 and i + 2 < len(codes):
+                    self.fg = xterm256(codes[i + 2])
+                    i += 2
+            i += 1
+        self._set_attr()
+
+    def _csi(self, params, final):
+        grid = self.grid
+        private = params.startswith('?')
+        nums = [int(p) if p else 0 for p in params.lstrip('?').split(';')] if params.lstrip('?') else []
+        n = nums[0] if nums else 0
+        if private:
+            if n == 25 and final in 'hl':
+                self.visible = final == 'h'
+        elif final == 'm':
+            self._sgr(params)
+        elif final in 'Hf':
+            self.row = min(max((nums[0] if nums else 1) - 1, 0), grid.rows - 1)
+            self.col = min(max((nums[1] if len(nums) > 1 else 1) - 1, 0), grid.cols - 1)
+        elif final == 'A':
+            self.row = max(self.row - max(n, 1), 0)
+        elif final == 'B':
+            self.row = min(self.row + max(n, 1), grid.rows - 1)
+        elif final == 'C':
+            self.col = min(self.col + max(n, 1), grid.cols - 1)
+        elif final == 'D':
+            self.col = max(self.col - max(n, 1), 0)
+        elif final == 'G':
+            self.col = min(max(n - 1, 0), grid.cols - 1)
+        elif final == 'J':
+            if n in (2, 3):
+                grid.clear()
+            elif n == 0:
+                grid.truncate(self.row + 1)
+                grid.erase(self.row, self.col)
+                grid.touch(self.row)
+        elif final == 'K':
+            if n == 0:
+                grid.erase(self.row, self.col)
+            elif n == 1:
+                grid.erase(self.row, 0, self.col + 1)
+            else:
+                grid.erase(self.row)
+            grid.touch(self.row)
+
+    def feed(self, data):
+        """Interpret output; returns a new window title if an OSC set one"""
+        title = None
+        data, self._pending = self._pending + data, ''
+        for m in TOKEN.finditer(data):
+            tok = m.group(0)
+            if m.group(2) is not None:
+                self._csi(m.group(1), m.group(2))
+            elif m.group(3) is not None:
+                code, _, text = m.group(3).partition(';')
+                if code in ('0', '2'):
+                    title = self.title = text
+            elif m.group(4) is not None:
+                self._pending = tok
+            elif tok[0] == '\x1b':
+                continue
+            elif tok == '\n':
+                self._down()
+                self.grid.touch(self.row)
+            elif tok == '\r':
+                self.col = 0
+            elif tok == '\b':
+                self.col = max(self.col - 1, 0)
+            elif tok == '\t':
+                self.col = min((self.col // 8 + 1) * 8, self.grid.cols - 1)
+            elif tok >= ' ':
+                self._print(tok)
+        return title
+
+    def cursor(self):
+        """(row, col) in the window, or None while hidden"""
+        return (self.row, self.col) if self.visible else None
+
+
+def styled(lines, fg, dim=None):
+    """
+    Lines of CLI output, which may carry ANSI styling, as one (text, color)
+    segments tuple per line; unstyled text gets fg and dim default text `dim`.
+    """
+    if not lines:
+        return []
+    grid = Grid(max(len(line) for line in lines) + 1, len(lines), fg)
+    Parser(grid, dim).feed('\r\n'.join(lines))
+    return [grid.segments(row) for row in range(len(lines))]
@@ -0,0 +1,100 @@
+"""
+Web timelines: compiled scenes as compact JSON for termplayer.js.
+
+A page replays the terminal as live text instead of playing an MP4 — a few
+KB, crisp at any DPI, and nothing is rasterized or encoded. The timeline is
+the same screen events the renderers draw (see screen.py), with colors
+numbered, times as millisecond deltas and typing sent as the text it adds:
+
+    {"v": 1, "width": 720, ..., "rows": 17, "colors": ["#08080a", ...],
+     "chrome": {"bg": 0, ...}, "scenes": [{"title": "...", "duration": 7930,
+     "events": [[dt, "a", [["$ ", 3], ["h", 4]]], [dt, "x", 0, [["e", 4]]], ...]}]}
+
+Ops: "c" clear, "a" append a line, "s" set line `row`, "x" extend line `row`
+with more segments, "k" cursor to (row, col), or hidden with no arguments.
+Rows count from the last clear; the player shows the last `rows` of them.
+"""
+import json
+
+from .chrome import BAR_BG, BAR_H, BG, BORDER, GREEN, MUTED, PADDING, RED, YELLOW
+from .scenefile import PALETTE
+from .scrollback import viewport_rows
+
+VERSION = 1
+
+
+def _tail(old, new):
+    """Segments `new` adds to the end of `old`, or None if it is not an extension"""
+    if not old:
+        return list(new)
+    n = len(old)
+    if len(new) < n or tuple(new[:n - 1]) != tuple(old[:n - 1]):
+        return None
+    (old_text, old_color), (text, color) = old[-1], new[n - 1]
+    if color != old_color or not text.startswith(old_text):
+        return None
+    head = [(text[len(old_text):], color)] if len(text) > len(old_text) else []
+    return head + list(new[n:])
+
+
+class _Colors:
+    def __init__(self):
+        self.table = {}
+
+    def __call__(self, rgb):
+        return self.table.setdefault(tuple(rgb), len(self.table))
+
+    def hex(self):
+        return ['#%02x%02x%02x' % rgb for rgb in self.table]
+
+
+def export(spec, scenes):
+    """Compiled scenes [(title, events, duration_ms), ...] as a timeline dict"""
+    color = _Colors()
+    chrome = {'bg': color(BG), 'bar': color(BAR_BG), 'border': color(BORDER), 'title': color(MUTED),
+              'lights': [color(RED), color(YELLOW), color(GREEN)], 'cursor': color(PALETTE['accent'])}
+
+    def segs(segments):
+        return [[text, color(rgb)] for text, rgb in segments if text]
+
+    out = []
+    for title, events, duration in scenes:
+        lines = []
+        encoded = []
+        last = 0
+        for t, op, data in events:
+            if op == 'clear':
+                lines = []
+                ev = ['c']
+            elif op == 'append':
+                lines.append(data)
+                ev = ['a', segs(data)]
+            elif op == 'set':
+                row, segments = data
+                tail = _tail(lines[row], segments) if row < len(lines) else None
+                lines[row] = segments
+                ev = ['x', row, segs(tail)] if tail is not None else ['s', row, segs(segments)]
+            elif op == 'cursor':
+                ev = ['k'] + (list(data) if data is not None else [])
+            else:
+                raise ValueError(f'unknown screen op: {op!r}')
+            t = round(t)
+            encoded.append([t - last] + ev)
+            last = t
+        out.append({'title': title, 'duration': round(duration), 'events': encoded})
+
+    return {
+        'v': VERSION,
+        'width': spec['width'], 'height': spec['height'],
+        'font_size': spec['font_size'], 'title_size': spec['title_size'],
+        'line_height': spec['line_height'], 'cursor': list(spec['cursor']),
+        'bar_h': BAR_H, 'padding': PADDING,
+        'rows': viewport_rows(spec['height'], spec['line_height'], BAR_H + PADDING, PADDING),
+        'colors': color.hex(), 'chrome': chrome, 'scenes': out,
+    }
+
+
+def save(path, spec, scenes):
+    """Write a timeline as minified JSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(export(spec, scenes), f, ensure_ascii=False, separators=(',', ':'))
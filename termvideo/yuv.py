@@ -0,0 +1,88 @@
+"""
+Vectorized RGB -> planar YUV420 (BT.601, limited range — what ffmpeg's
+rgb24 -> yuv420p conversion produces), so frames can be handed to the encoder
+already in its input format. Every intermediate lives in buffers allocated
+once per frame size, and a frame can be converted one row band at a time so
+only what changed since the previous frame is redone. Requires NumPy.
+"""
+try:
+    import numpy as np
+except ImportError:  # optional: only the NumPy backend needs it
+    np = None
+
+# 8-bit fixed point BT.601 coefficients, rows Y, U, V
+COEFFS = ((66, 129, 25), (-38, -74, 112), (112, -94, -18))
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError('the numpy backend needs NumPy (pip install numpy)')
+
+
+def _fixed(values, offset):
+    """(v + 128) >> 8, plus offset, in place — exact, as every value is an integer below 2**24"""
+    values += 128
+    values *= 1 / 256
+    np.floor(values, out=values)
+    values += offset
+
+
+class YUV420:
+    """Converts (h, w, 3) uint8 RGB arrays into one reused I420 buffer."""
+
+    def __init__(self, size):
+        require_numpy()
+        width, height = size
+        if width % 2 or height % 2:
+            raise ValueError(f'YUV420 needs even dimensions, got {width}x{height}')
+        self.size = size
+        w2, h2 = width // 2, height // 2
+        # Y plane, then U, then V — the layout ffmpeg expects for -pix_fmt yuv420p
+        self.planes = np.empty(width * height + 2 * w2 * h2, np.uint8)
+        self.y = self.planes[:width * height].reshape(height, width)
+        self.u = self.planes[width * height:width * height + w2 * h2].reshape(h2, w2)
+        self.v = self.planes[width * height + w2 * h2:].reshape(h2, w2)
+
+        # float32 matmul is the fastest vectorized path here and exact for these ranges
+        coeffs = np.array(COEFFS, np.float32)
+        self._y_coeffs = coeffs[:1].T.copy()
+        self._uv_coeffs = coeffs[1:].T.copy()
+        self._rgb = np.empty((height, width, 3), np.float32)
+        self._luma = np.empty((height * width, 1), np.float32)
+        self._sub = np.empty((h2, w2, 3), np.float32)
+        self._chroma = np.empty((h2 * w2, 2), np.float32)
+
+    def convert(self, rgb, top=0, bottom=None):
+        """
+        rgb: (h, w, 3) uint8 array. Reconverts rows [top, bottom), widened to
+        whole chroma rows; the rest of the planes keep their last contents.
+        Returns self.planes, which is overwritten by the next call.
+        """
+        width, height = self.size
+        bottom = height if bottom is None else min(bottom, height)
+        top = max(top, 0) & ~1
+        bottom += bottom & 1
+        if top >= bottom:
+            return self.planes
+        src = self._rgb[top:bottom]
+        np.copyto(src, rgb[top:bottom])
+
+        luma = self._luma[:(bottom - top) * width]
+        np.matmul(src.reshape(-1, 3), self._y_coeffs, out=luma)
+        _fixed(luma, 16)
+        np.copyto(self.y[top:bottom].reshape(-1, 1), luma, casting='unsafe')
+
+        # Chroma from the rounded mean of each 2x2 block
+        sub = self._sub[top // 2:bottom // 2]
+        np.add(src[0::2, 0::2], src[0::2, 1::2], out=sub)
+        sub += src[1::2, 0::2]
+        sub += src[1::2, 1::2]
+        sub += 2
+        sub *= 0.25
+        np.floor(sub, out=sub)
+        chroma = self._chroma[:sub.shape[0] * sub.shape[1]]
+        np.matmul(sub.reshape(-1, 3), self._uv_coeffs, out=chroma)
+        _fixed(chroma, 128)
+        np.copyto(self.u[top // 2:bottom // 2].reshape(-1), chroma[:, 0], casting='unsafe')
+        np.copyto(self.v[top // 2:bottom // 2].reshape(-1), chroma[:, 1], casting='unsafe')
+        return self.planes
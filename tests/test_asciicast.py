@@ -0,0 +1,77 @@
+"""asciicast.save() then load() gives back the screens it was given."""
+import glob, os
+
+import pytest
+
+from termvideo import asciicast, scenefile
+from termvideo.hermes import ROOT
+from termvideo.render import SNAP_MS
+from termvideo.screen import Screen
+
+# Stand-in CLI output, styled the way hermes.js styles it under FORCE_COLOR
+DIM = '\x1b[2m%s\x1b[0m'
+OUTPUT = {
+    'browse': [DIM % '  ↳ 2 agents found', '', DIM % '  code-auditor         4.9/5  0.12 SOL/task  code, review'],
+    'hire': [DIM % '  ↳ task created: task-0x0001', DIM % '  ↳ escrow: 0.12 SOL'],
+    'task-status': ['{', '  "task_id": "task-0x0001",', '  "status": "delivered"', '}'],
+    'confirm': ['\x1b[32m  ✓ 0.12 SOL released\x1b[0m', '  tx: abc123...wxyz'],
+    'earnings': [DIM % '  balance:      0.12 SOL', DIM % '  total earned: 0.12 SOL'],
+    'withdraw': ['\x1b[32m  ✓ 0.12 SOL → phantom\x1b[0m', '  tx: def456...uvwx'],
+}
+SCENES = sorted(glob.glob(os.path.join(ROOT, 'scenes', '*.json')))
+
+
+def run(args):
+    return list(OUTPUT[args[0]])
+
+
+def drawn(row):
+    """A row as the cells that draw something: trailing blanks never do"""
+    cells = [(ch, color) for text, color in row for ch in text]
+    while cells and cells[-1][0] == ' ':
+        cells.pop()
+    return cells
+
+
+def frames(spec, events, duration):
+    """The screen at every frame of a scene, as (rows, cursor)"""
+    fps = spec['fps']
+    screen = Screen('', asciicast.screen_rows(spec))
+    out, i = [], 0
+    for frame in range(int((duration + SNAP_MS) * fps / 1000)):
+        now = frame * 1000 / fps + SNAP_MS
+        while i < len(events) and events[i][0] <= now:
+            screen.apply(events[i])
+            i += 1
+        rows, cursor = screen.view()
+        out.append(([drawn(row) for row in rows], cursor))
+    return out
+
+
+def assert_round_trip(spec, tmp_path):
+    scenes = [scenefile.compile_scene(spec, scene, run=run) for scene in spec['scenes']]
+    cast = str(tmp_path / 'session.cast')
+    asciicast.save(cast, spec, scenes)
+    loaded = asciicast.load(cast)
+
+    assert {k: loaded[k] for k in asciicast.GEOMETRY} == {k: spec[k] for k in asciicast.GEOMETRY}
+    assert [title for title, _, _ in loaded['compiled']] == [title for title, _, _ in scenes]
+    for (_, events, duration), (title, got, got_duration) in zip(scenes, loaded['compiled']):
+        assert got_duration == pytest.approx(duration, abs=1e-3), title
+        assert frames(spec, got, got_duration) == frames(spec, events, duration), title
+
+
+@pytest.mark.parametrize('path', SCENES, ids=os.path.basename)
+def test_round_trip(path, tmp_path):
+    assert_round_trip(scenefile.load(path), tmp_path)
+
+
+def test_round_trip_scrolling(tmp_path):
+    # Twice the window's rows of output, then a cleared screen in the next scene
+    lines = [{'line': f'  line {i}', 'color': 'faint' if i % 2 else 'text', 'after_ms': 40} for i in range(30)]
+    actions = [{'type': 'hermes browse', 'char_ms': 30, 'after_ms': 100}, {'run': ['browse'], 'after_ms': 100}]
+    spec = scenefile.parse({'scenes': [
+        {'title': 'scroll', 'actions': actions + lines + actions + [{'pause': 500}]},
+        {'title': 'after', 'actions': lines[:3] + [{'clear': True, 'after_ms': 100}] + actions},
+    ]}, str(tmp_path / 'scroll.json'))
+    assert_round_trip(spec, tmp_path)
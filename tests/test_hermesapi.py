@@ -0,0 +1,113 @@
+"""hermesapi against scripts/hermes.js: same commands, same output."""
+import os, re, json, socket, shutil, subprocess, time
+
+import pytest
+
+from termvideo import hermesapi
+from termvideo.hermes import HERMES, ROOT
+
+node = pytest.mark.skipif(shutil.which('node') is None, reason='needs node')
+
+NUMBERS = [0, 42, -7, 2 ** 53, 0.0, -0.0, 2.5, -0.12, 0.1 + 0.2, 0.12 * 3, 1 / 3, 100.0, 1e20, 1e21,
+           123456789012345680000.0, 1.5e300, 0.000001, 1e-7, 1.5e-7, 5e-324, float('nan'),
+           float('inf'), float('-inf')]
+
+# The parity run, in order against one fresh mock API
+COMMANDS = [
+    [], ['nope'], ['browse'], ['browse', '--tag', 'code', '--sort', 'price'],
+    ['browse', '--max-rate', '0.1', '--tag', 'a b~'], ['browse', '--tag', 'zzz'],
+    ['hire'], ['hire', 'code-auditor'],
+    ['hire', 'code-auditor', '--task', 'review contracts', '--budget', '0.2x', '--deadline', '48h'],
+    ['hire', 'nobody', '--task', '--budget'],
+    ['task-status'], ['task-status', 'task-0x0001'], ['task-status', 'task 0x0009'],
+    ['confirm', 'task-0x0001', '--rating', '4.5', '--comment', 'ok'], ['confirm', 'task-0x0099'],
+    ['dispute', 'task-0x0001'], ['dispute', 'task-0x0001', '--reason', 'bad'],
+    ['status'], ['list'], ['list', '--name', 'me', '--tags', 'a,b', '--rate', '0.3', '--max-concurrent', '2'],
+    ['status'], ['earnings'], ['withdraw', '--amount', '0.05'],
+    ['withdraw', '--amount', '0.05', '--to', 'phantom'], ['withdraw', '--amount', 'abc', '--to', 'phantom'],
+    ['earnings'], ['accept', 'task-0x0002'], ['deliver', 'task-0x0002', '--summary', 'done'],
+    ['update', '--tags'], ['update', '--rate', '0.2', '--tags', 'x,y'], ['pause'], ['unpause'],
+]
+# What the mock API makes up with Math.random()
+RANDOM = [(re.compile(r'[0-9a-z]{6}\.\.\.[0-9a-z]{4}'), 'TX'), (re.compile(r'agent-0x[0-9a-f]+'), 'AGENT')]
+
+
+def masked(text):
+    for pattern, repl in RANDOM:
+        text = pattern.sub(repl, text)
+    return text
+
+
+@node
+def test_js_number_matches_node():
+    script = 'for (const x of JSON.parse(process.argv[1])) console.log(String(x))'
+    values = [None if x != x or abs(x) == float('inf') else x for x in NUMBERS]
+    out = subprocess.run(['node', '-e', script, json.dumps(values)], capture_output=True, text=True, check=True)
+    expected = out.stdout.split('\n')[:len(NUMBERS)]
+    for i, x in enumerate(NUMBERS):
+        if values[i] is None:
+            continue
+        assert hermesapi.js_number(x) == expected[i], x
+
+
+def test_js_number():
+    assert hermesapi.js_number(0.1 + 0.2) == '0.30000000000000004'
+    assert hermesapi.js_number(1e21) == '1e+21'
+    assert hermesapi.js_number(1e20) == '100000000000000000000'
+    assert hermesapi.js_number(1.5e-7) == '1.5e-7'
+    assert hermesapi.js_number(0.000001) == '0.000001'
+    assert hermesapi.js_number(-0.0) == '0'
+    assert hermesapi.js_number(100.0) == '100'
+    assert hermesapi.js_number(2 ** 53) == '9007199254740992'
+    assert [hermesapi.js_number(x) for x in NUMBERS[-3:]] == ['NaN', 'Infinity', '-Infinity']
+
+
+def _port_open(port):
+    with socket.socket() as s:
+        return s.connect_ex(('localhost', port)) == 0
+
+
+@pytest.fixture
+def mock_api():
+    """A fresh mock-api.js per call; hermes.js --local always talks to port 4020"""
+    if _port_open(4020):
+        pytest.skip('port 4020 is in use')
+    procs = []
+
+    def start():
+        for proc in procs:
+            proc.terminate()
+            proc.wait()
+        procs.append(subprocess.Popen(['node', os.path.join(ROOT, 'mock-api.js')], stdout=subprocess.DEVNULL))
+        for _ in range(100):
+            if _port_open(4020):
+                return
+            time.sleep(0.05)
+        raise RuntimeError('mock-api.js did not start')
+    yield start
+    for proc in procs:
+        proc.terminate()
+        proc.wait()
+
+
+@node
+def test_same_output_as_hermes_js(mock_api, tmp_path):
+    env = dict(os.environ, HOME=str(tmp_path), FORCE_COLOR='1')
+    env.pop('HERMES_API_KEY', None)
+    env.pop('NO_COLOR', None)
+
+    mock_api()
+    expected = []
+    for argv in COMMANDS:
+        result = subprocess.run(['node', HERMES] + argv + ['--local'], capture_output=True, text=True, env=env)
+        expected.append((masked(result.stdout), masked(result.stderr), result.returncode))
+
+    mock_api()
+    api = hermesapi.Client(hermesapi.LOCAL_URL, None)
+    got = []
+    for argv in COMMANDS:
+        stdout, stderr, code = hermesapi.run(argv + ['--local'], api, color=True)
+        got.append((masked(stdout), masked(stderr), code))
+
+    for argv, want, have in zip(COMMANDS, expected, got):
+        assert have == want, argv
@@ -0,0 +1,96 @@
+"""vt.Parser over a Grid: feed bytes, check the cells."""
+from termvideo.vt import ANSI, DEFAULT_FG, Grid, Parser, styled, xterm256
+
+
+def feed(data, cols=10, rows=3, **kw):
+    grid = Grid(cols, rows, scrollback=kw.pop('scrollback', None))
+    parser = Parser(grid, **kw)
+    parser.feed(data)
+    return grid, parser
+
+
+def text(grid):
+    return [''.join(t for t, _ in segs) for segs in grid.lines()]
+
+
+def test_print_and_newlines():
+    grid, parser = feed('ab\r\ncd')
+    assert text(grid) == ['ab', 'cd']
+    assert parser.cursor() == (1, 2)
+
+
+def test_sgr_colors():
+    grid, _ = feed('\x1b[32mok\x1b[0m \x1b[91mno\x1b[39m!', cols=12)
+    assert grid.segments(0) == (('ok', ANSI[2]), (' ', DEFAULT_FG), ('no', ANSI[9]), ('!', DEFAULT_FG))
+    grid, _ = feed('\x1b[38;5;196ma\x1b[38;2;1;2;3mb')
+    assert grid.segments(0) == (('a', xterm256(196)), ('b', (1, 2, 3)))
+
+
+def test_sgr_dim():
+    grid, _ = feed('\x1b[2ma\x1b[22mb\x1b[2;32mc', dim=(50, 50, 50))
+    assert grid.segments(0) == (('a', (50, 50, 50)), ('b', DEFAULT_FG), ('c', tuple(c // 2 for c in ANSI[2])))
+
+
+def test_cursor_moves():
+    grid, parser = feed('\x1b[2;3Hx\x1b[Ay\x1b[2Dz\x1b[Bw\x1b[9Gv\x1b[Cu')
+    assert text(grid) == ['  zy', '  xw    vu']
+    assert parser.cursor() == (1, 10)
+    grid, parser = feed('\x1b[99;99Hx')
+    assert parser.cursor() == (2, 10)  # clamped to the window, then past the last column
+
+
+def test_erase_line():
+    grid, _ = feed('abcdef\r\x1b[2C\x1b[K')
+    assert text(grid) == ['ab']
+    grid, _ = feed('abcdef\r\x1b[2C\x1b[1K')
+    assert text(grid) == ['   def']
+    grid, _ = feed('abcdef\x1b[2K')
+    assert text(grid) == ['']
+
+
+def test_erase_display():
+    grid, _ = feed('one\r\ntwo\r\nthree\x1b[2;2H\x1b[J')
+    assert text(grid) == ['one', 't']
+    scrollback = []
+    grid, parser = feed('one\r\ntwo\x1b[2J', scrollback=scrollback)
+    assert text(grid) == [] and grid.clears == 1
+    assert parser.cursor() == (1, 3)  # ED 2 leaves the cursor where it was
+
+
+def test_autowrap():
+    grid, parser = feed('abcdefghijkl')
+    assert text(grid) == ['abcdefghij', 'kl']
+    assert parser.cursor() == (1, 2)
+    grid, parser = feed('abcdefghij')
+    assert text(grid) == ['abcdefghij']  # the wrap waits for the next character
+    assert parser.cursor() == (0, 10)
+
+
+def test_scroll():
+    scrollback = []
+    grid, _ = feed('1\r\n2\r\n3\r\n4\r\n5', scrollback=scrollback)
+    assert text(grid) == ['3', '4', '5']
+    assert grid.scrolled == 2
+    assert scrollback == [(('1', DEFAULT_FG),), (('2', DEFAULT_FG),)]
+
+
+def test_split_escapes():
+    grid = Grid(10, 2)
+    parser = Parser(grid)
+    for chunk in ['a\x1b', '[3', '2mb\x1b]0;ti', 'tle\x07c']:
+        parser.feed(chunk)
+    assert grid.segments(0) == (('a', DEFAULT_FG), ('bc', ANSI[2]))
+    assert parser.title == 'title'
+
+
+def test_cursor_visibility():
+    _, parser = feed('ab\x1b[?25l')
+    assert parser.cursor() is None
+    parser.feed('\x1b[?25h')
+    assert parser.cursor() == (0, 2)
+
+
+def test_styled():
+    assert styled(['plain', '\x1b[2mdim\x1b[0m', ''], (1, 1, 1), (2, 2, 2)) == [
+        (('plain', (1, 1, 1)),), (('dim', (2, 2, 2)),), ()]
+    assert styled([], (1, 1, 1)) == []